@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Destination tables for every piece type and square, built once at
+import. Used to generate candidate moves without trying offsets which
+would leave the board or pass through another piece.
+"""
+from utils import pos_to_square, square_to_pos, WRONG_ENTRY_POINT_MSG
+
+SQUARES = range(64)
+SQUARE_BITS = [1 << square for square in SQUARES]
+
+KNIGHT_OFFSETS = [[i, j] for i in range(-2, 3) for j in range(-2, 3) if abs(i) + abs(j) == 3]
+KING_OFFSETS = [[i, j] for i in range(-1, 2) for j in range(-1, 2) if i != 0 or j != 0]
+ORTHOGONAL_STEPS = [[1, 0], [-1, 0], [0, 1], [0, -1]]
+DIAGONAL_STEPS = [[1, 1], [1, -1], [-1, 1], [-1, -1]]
+FORWARD = {'white': 1, 'black': -1}
+
+
+def __on_board(row, col_no):
+    return 1 <= row <= 8 and 1 <= col_no <= 8
+
+
+def __jumps(offsets):
+    """
+    List of destination squares for each square, given one space offsets.
+    """
+    destinations = []
+    for square in SQUARES:
+        row, col_no = square_to_pos(square)
+        destinations.append([pos_to_square([row + up, col_no + right]) for up, right in offsets
+                             if __on_board(row + up, col_no + right)])
+    return destinations
+
+
+def __rays(steps):
+    """
+    For each square a list of rays (one per step direction that stays
+    on the board), each ray listing squares in order moving outwards.
+    """
+    rays = []
+    for square in SQUARES:
+        row, col_no = square_to_pos(square)
+        square_rays = []
+        for up, right in steps:
+            ray, tmp_row, tmp_col_no = [], row + up, col_no + right
+            while __on_board(tmp_row, tmp_col_no):
+                ray.append(pos_to_square([tmp_row, tmp_col_no]))
+                tmp_row, tmp_col_no = tmp_row + up, tmp_col_no + right
+            if ray:
+                square_rays.append(ray)
+        rays.append(square_rays)
+    return rays
+
+
+def __pawn_pushes(team):
+    """
+    One and two space forward moves, in order, for a pawn on each square.
+    """
+    pushes = []
+    for square in SQUARES:
+        row, col_no = square_to_pos(square)
+        pushes.append([pos_to_square([row + up, col_no]) for up in [FORWARD[team], 2 * FORWARD[team]]
+                       if __on_board(row + up, col_no)])
+    return pushes
+
+
+def __to_bitboards(destinations):
+    bitboards = []
+    for square_destinations in destinations:
+        bitboard = 0
+        for square in square_destinations:
+            bitboard |= SQUARE_BITS[square]
+        bitboards.append(bitboard)
+    return bitboards
+
+
+def __between_and_lines(rook_rays, bishop_rays):
+    """
+    For every pair of squares on a shared row, column or diagonal get
+    the squares strictly between them and whether the line between
+    them is orthogonal (rook like) or diagonal (bishop like).
+    """
+    between = [[0] * 64 for _ in SQUARES]
+    orthogonal = [[False] * 64 for _ in SQUARES]
+    diagonal = [[False] * 64 for _ in SQUARES]
+    for rays, lines in [[rook_rays, orthogonal], [bishop_rays, diagonal]]:
+        for square in SQUARES:
+            for ray in rays[square]:
+                path = 0
+                for target in ray:
+                    between[square][target] = path
+                    lines[square][target] = True
+                    path |= SQUARE_BITS[target]
+    return between, orthogonal, diagonal
+
+
+KNIGHT_DESTINATIONS = __jumps(KNIGHT_OFFSETS)
+KING_DESTINATIONS = __jumps(KING_OFFSETS)
+ROOK_RAYS = __rays(ORTHOGONAL_STEPS)
+BISHOP_RAYS = __rays(DIAGONAL_STEPS)
+QUEEN_RAYS = [ROOK_RAYS[square] + BISHOP_RAYS[square] for square in SQUARES]
+SLIDING_RAYS = {'rook': ROOK_RAYS, 'bishop': BISHOP_RAYS, 'queen': QUEEN_RAYS}
+PAWN_PUSHES = {team: __pawn_pushes(team) for team in FORWARD}
+PAWN_CAPTURES = {team: __jumps([[FORWARD[team], -1], [FORWARD[team], 1]]) for team in FORWARD}
+
+# the same tables as bitboards, for attack queries
+KNIGHT_ATTACKS = __to_bitboards(KNIGHT_DESTINATIONS)
+KING_ATTACKS = __to_bitboards(KING_DESTINATIONS)
+PAWN_ATTACKS = {team: __to_bitboards(PAWN_CAPTURES[team]) for team in FORWARD}
+BETWEEN, ORTHOGONAL_LINE, DIAGONAL_LINE = __between_and_lines(ROOK_RAYS, BISHOP_RAYS)
+
+
+def destinations(name, team, square, own, occupied, first_move=False):
+    """
+    Squares a piece could move to from square, given bitboards for its
+    own team and all occupied squares. Moves onto its own team, through
+    another piece or off the board are left out, the remaining rules
+    (conditions, king safety) are left to move validation.
+    """
+    if name == 'knight':
+        return [target for target in KNIGHT_DESTINATIONS[square] if not own & SQUARE_BITS[target]]
+    elif name == 'king':
+        return [target for target in KING_DESTINATIONS[square] if not own & SQUARE_BITS[target]]
+    elif name == 'pawn':
+        targets = []
+        for target in PAWN_PUSHES[team][square][:2 if first_move else 1]:
+            if occupied & SQUARE_BITS[target]:
+                break
+            targets.append(target)
+        return targets + [target for target in PAWN_CAPTURES[team][square]
+                          if not own & SQUARE_BITS[target]]
+
+    targets = []
+    for ray in SLIDING_RAYS[name][square]:
+        for target in ray:
+            bit = SQUARE_BITS[target]
+            if own & bit:
+                break
+            targets.append(target)
+            if occupied & bit:
+                break
+    return targets
+
+
+if __name__ == '__main__':
+    print(WRONG_ENTRY_POINT_MSG)
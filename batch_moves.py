@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Legal moves, attack maps and check flags for a batch of positions at
+once using NumPy array operations, for scoring many positions without
+the cost of a Game (and a Python loop) per position. Positions are rows
+of an N x 64 int8 array (squares 0 for A1 to 63 for H8) holding 0 for an
+empty square, 1 to 6 for a white pawn, knight, bishop, rook, queen or
+king and minus those for black, see boards_from_games.
+Each piece in the batch is one element of the arrays worked on, moves
+are found as in legal_moves (attack tables, then the pieces giving check
+and the pins on the king) with the rules as implemented there (no
+castling or promotion), except that pawns on the row they start on are
+taken to be unmoved. NumPy (1.17 or later) is only needed for this
+module. Run as a script for a benchmark, e.g.
+python3 batch_moves.py 10
+"""
+import sys
+from collections import namedtuple
+from time import perf_counter
+from attack_tables import (KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN, SQUARE_BITS,
+                           ORTHOGONAL_STEPS, DIAGONAL_STEPS)
+from literals import PIECE_CODES
+from move_validation.validate_conditions import en_passant_failure
+from utils import pos_to_square, square_to_pos
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+PIECE_NUMBERS = {'pawn': PAWN, 'knight': KNIGHT, 'bishop': BISHOP, 'rook': ROOK,
+                 'queen': QUEEN, 'king': KING}
+NO_EN_PASSANT = -1
+NO_SQUARE = 64  # index of the empty entry at the end of each lookup table
+
+# moves: N x 64 uint64, bitboard of the squares the piece on each square can move to
+# attacks: N x 2 uint64, bitboards of the squares attacked by white and by black
+# check: N bool, whether the team to move is in check, counts: N legal moves
+BatchMoves = namedtuple('BatchMoves', ['moves', 'attacks', 'check', 'counts'])
+
+
+def __table(bitboards):
+    """
+    uint64 array of a bitboard for each square, plus 0 for NO_SQUARE.
+    """
+    return np.array(list(bitboards) + [0], dtype=np.uint64)
+
+
+def __rays(steps):
+    """
+    For each step direction (squares going up or down) the bitboard
+    of the squares along the ray out from each square.
+    """
+    found = []
+    for up, right in steps:
+        rays = []
+        for square in range(64):
+            row, col_no, ray = square_to_pos(square) + [0]
+            while 1 <= row + up <= 8 and 1 <= col_no + right <= 8:
+                row, col_no = row + up, col_no + right
+                ray |= SQUARE_BITS[pos_to_square([row, col_no])]
+            rays.append(ray)
+        found.append((up * 8 + right > 0, __table(rays)))
+    return found
+
+
+if np is not None:
+    ONE, ALL_SQUARES = np.uint64(1), np.uint64((1 << 64) - 1)
+    SQUARE_NUMBERS = np.arange(64)
+    MIRROR = SQUARE_NUMBERS ^ 56  # square seen from the other side of the board
+    BIT_TABLE = __table(SQUARE_BITS)
+    KNIGHT_TABLE = __table(KNIGHT_ATTACKS)
+    KING_TABLE = __table(KING_ATTACKS)
+    PAWN_TAKE_TABLES = {team: __table(PAWN_ATTACKS[team]) for team in PAWN_ATTACKS}
+    PAWN_PUSH_TABLE = __table(SQUARE_BITS[square + 8] if square < 56 else 0 for square in range(64))
+    START_ROW = np.uint64(0xff00)
+    ORTHOGONAL_RAYS = __rays(ORTHOGONAL_STEPS)
+    DIAGONAL_RAYS = __rays(DIAGONAL_STEPS)
+    BETWEEN_TABLE = np.array([row + [0] for row in BETWEEN] + [[0] * 65], dtype=np.uint64)
+
+
+def __require_numpy():
+    if np is None:
+        raise ImportError('batch_moves needs NumPy, install it with: pip install numpy')
+
+
+def boards_from_games(games):
+    """
+    (N x 64 int8 boards, N bool white to move, N int en passant square)
+    for the games' current positions, as taken by batch_moves. The en
+    passant square is the one a pawn taking en passant moves to (-1 for
+    none), as in FEN.
+    """
+    __require_numpy()
+    boards = np.zeros((len(games), 64), dtype=np.int8)
+    en_passant = np.full(len(games), NO_EN_PASSANT, dtype=np.intp)
+    for i, game in enumerate(games):
+        for ref, square in game.piece_squares.items():
+            number = PIECE_NUMBERS[PIECE_CODES[ref[1]]]
+            boards[i, square] = number if ref[0] == 'w' else -number
+        last_piece = game.get_piece(game.last_piece_to_move)
+        if (last_piece and last_piece.name == 'pawn' and not last_piece.taken and
+                en_passant_failure(last_piece) is None):
+            en_passant[i] = pos_to_square([last_piece.row - last_piece.forward, last_piece.col_no])
+    white_to_move = np.array([game.team_to_move == 'white' for game in games], dtype=bool)
+    return boards, white_to_move, en_passant
+
+
+def __bitboards(squares):
+    """
+    N uint64 bitboards from N x 64 bool arrays.
+    """
+    return np.packbits(squares, axis=1, bitorder='little').view('<u8')[:, 0]
+
+
+def __bit_counts(bitboards):
+    """
+    Number of squares set in each of an array of uint64 bitboards.
+    NumPy before 2.0 has no bitwise_count, so the bits are unpacked
+    and summed there instead.
+    """
+    bitwise_count = getattr(np, 'bitwise_count', None)
+    if bitwise_count is not None:
+        return bitwise_count(bitboards)
+    as_bytes = np.ascontiguousarray(bitboards).view(np.uint8)
+    return np.unpackbits(as_bytes, axis=-1).reshape(bitboards.shape + (64,)).sum(axis=-1)
+
+
+def __first_square(bitboards, upwards):
+    """
+    The lowest (for upwards) or highest square set in each bitboard,
+    NO_SQUARE for empty bitboards.
+    """
+    if upwards:
+        found = bitboards & (~bitboards + ONE)
+    else:
+        found = bitboards.copy()
+        for shift in (1, 2, 4, 8, 16, 32):
+            found |= found >> np.uint64(shift)
+        found ^= found >> ONE
+    # powers of two convert to floats exactly
+    squares = np.log2(np.maximum(found, ONE).astype(np.float64)).astype(np.intp)
+    squares[bitboards == 0] = NO_SQUARE
+    return squares
+
+
+def __slider_attacks(squares, occupied, rays):
+    """
+    Attacks along the rays from squares (an array) given the occupied
+    bitboard for each, up to and including the first piece in the way.
+    """
+    attacks = np.zeros(len(squares), dtype=np.uint64)
+    for upwards, table in rays:
+        ray = table[squares]
+        blocker = __first_square(ray & occupied, upwards)
+        attacks |= ray ^ table[blocker]
+    return attacks
+
+
+def __attacks(pieces, squares, occupied, pawn_takes):
+    """
+    Attack bitboard for each piece (numbered as on the boards, positive)
+    on its square, with the occupied bitboard for the piece's position.
+    """
+    attacks = np.where(pieces == KNIGHT, KNIGHT_TABLE[squares], np.uint64(0))
+    attacks |= np.where(pieces == KING, KING_TABLE[squares], np.uint64(0))
+    attacks |= np.where(pieces == PAWN, pawn_takes[squares], np.uint64(0))
+    for sliders, rays in [[(ROOK, QUEEN), ORTHOGONAL_RAYS], [(BISHOP, QUEEN), DIAGONAL_RAYS]]:
+        moving = np.flatnonzero(np.isin(pieces, sliders))
+        attacks[moving] |= __slider_attacks(squares[moving], occupied[moving], rays)
+    return attacks
+
+
+def __attack_maps(count, positions, attacks):
+    found = np.zeros(count, dtype=np.uint64)
+    np.bitwise_or.at(found, positions, attacks)
+    return found
+
+
+def __pins(king_square, occupied, own, straight, diagonal):
+    """
+    N x 64 uint64 of the squares the piece on each square may move to
+    without leaving its king in check along a line (all squares unless
+    pinned), given their rooks / queens and bishops / queens.
+    """
+    count = len(king_square)
+    allowed = np.full((count, 64), ALL_SQUARES, dtype=np.uint64)
+    for sliders, ray_tables in [[straight, ORTHOGONAL_RAYS], [diagonal, DIAGONAL_RAYS]]:
+        for upwards, table in ray_tables:
+            ray = table[king_square]
+            blockers = ray & occupied
+            first = __first_square(blockers, upwards)
+            second = __first_square(blockers & ~BIT_TABLE[first], upwards)
+            # ours then one of their sliders for this direction
+            pinned = np.flatnonzero((own & BIT_TABLE[first] != 0) &
+                                    (sliders & BIT_TABLE[second] != 0))
+            allowed[pinned, first[pinned]] = ray[pinned] ^ table[second[pinned]]
+    return allowed
+
+
+def __white_moves(boards, en_passant):
+    """
+    (N x 64 moves, white attacks, black attacks, check flags) for boards
+    with white to move.
+    """
+    count = len(boards)
+    positions, squares = np.nonzero(boards)
+    pieces = boards[positions, squares]
+    ours = pieces > 0
+    our_positions, our_squares, our_pieces = positions[ours], squares[ours], pieces[ours]
+    their_positions, their_squares, their_pieces = (positions[~ours], squares[~ours],
+                                                    -pieces[~ours])
+
+    own, theirs = __bitboards(boards > 0), __bitboards(boards < 0)
+    occupied = own | theirs
+    kings = __bitboards(boards == KING)
+    has_king = kings != 0
+    king_square = np.where(has_king, (boards == KING).argmax(axis=1), NO_SQUARE)
+    king = BIT_TABLE[king_square]
+
+    our_attacks = __attacks(our_pieces, our_squares, occupied[our_positions],
+                            PAWN_TAKE_TABLES['white'])
+    their_attacks = __attacks(their_pieces, their_squares, occupied[their_positions],
+                              PAWN_TAKE_TABLES['black'])
+    # looking through our king, so it cannot step back along a line of attack
+    through_king = __attacks(their_pieces, their_squares, (occupied & ~king)[their_positions],
+                             PAWN_TAKE_TABLES['black'])
+    attacked = __attack_maps(count, their_positions, through_king)
+
+    gives_check = (their_attacks & king[their_positions]) != 0
+    checker_cnt = np.bincount(their_positions[gives_check], minlength=count)
+    check_mask = np.full(count, ALL_SQUARES, dtype=np.uint64)
+    checking = their_positions[gives_check]
+    checker = their_squares[gives_check]
+    check_mask[checking] = BETWEEN_TABLE[checker, king_square[checking]] | BIT_TABLE[checker]
+    check_mask[checker_cnt > 1] = 0  # double check, only the king can move
+
+    straight = __bitboards(np.isin(-boards, (ROOK, QUEEN)))
+    diagonal = __bitboards(np.isin(-boards, (BISHOP, QUEEN)))
+    pins = __pins(king_square, occupied, own, straight, diagonal)
+
+    # pawns take diagonally onto their pieces or the en passant square, and move forward
+    takeable = theirs | BIT_TABLE[np.where(en_passant >= 0, en_passant, NO_SQUARE)]
+    empty = ~occupied[our_positions]
+    push = PAWN_PUSH_TABLE[our_squares] & empty
+    jump = (push << np.uint64(8)) & empty & np.where(
+        (START_ROW & BIT_TABLE[our_squares]) != 0, ALL_SQUARES, np.uint64(0))
+    targets = np.where(our_pieces == PAWN, our_attacks & takeable[our_positions] | push | jump,
+                       our_attacks)
+    targets &= ~own[our_positions] & check_mask[our_positions] & pins[our_positions, our_squares]
+    is_king = our_pieces == KING
+    targets[is_king] = (our_attacks[is_king] & ~own[our_positions[is_king]] &
+                        ~attacked[our_positions[is_king]])
+
+    moves = np.zeros((count, 64), dtype=np.uint64)
+    moves[our_positions, our_squares] = targets
+    white = __attack_maps(count, our_positions, our_attacks)
+    black = __attack_maps(count, their_positions, their_attacks)
+    return moves, white, black, checker_cnt > 0
+
+
+def batch_moves(boards, white_to_move, en_passant=None):
+    """
+    BatchMoves (see above) for N positions given as N x 64 boards, N
+    flags for white to move and N en passant squares (see
+    boards_from_games). Boards with black to move are turned around so
+    the work is the same for both teams.
+    """
+    __require_numpy()
+    boards = np.asarray(boards, dtype=np.int8)
+    white_to_move = np.asarray(white_to_move, dtype=bool)
+    if en_passant is None:
+        en_passant = np.full(len(boards), NO_EN_PASSANT, dtype=np.intp)
+    en_passant = np.asarray(en_passant, dtype=np.intp)
+
+    black = ~white_to_move
+    boards = boards.copy()
+    boards[black] = -boards[black][:, MIRROR]
+    en_passant = np.where(black & (en_passant >= 0), en_passant ^ 56, en_passant)
+
+    moves, white_attacks, black_attacks, check = __white_moves(boards, en_passant)
+    # turning the board around is reversing the order of the bytes
+    moves[black] = moves[black][:, MIRROR].byteswap()
+    white_attacks[black], black_attacks[black] = (black_attacks[black].byteswap(),
+                                                  white_attacks[black].byteswap())
+    counts = __bit_counts(moves).sum(axis=1)
+    return BatchMoves(moves, np.stack([white_attacks, black_attacks], axis=1), check, counts)
+
+
+def move_list(moves):
+    """
+    (from square, to square) pairs for the moves in one row of
+    BatchMoves.moves, in order of square.
+    """
+    return [(int(square), int(target)) for square in np.flatnonzero(moves)
+            for target in np.flatnonzero(np.unpackbits(
+                moves[square:square + 1].view(np.uint8), bitorder='little'))]
+
+
+def positions_ahead(game, depth, team='white'):
+    """
+    (boards, white to move, en passant) as from boards_from_games for
+    every position depth moves on from game's with team to move.
+    """
+    found = []
+
+    def walk(depth, team):
+        if depth <= 0:
+            found.append(boards_from_games([game]))
+            return
+        for move_obj in game.generate_moves(team):
+            game.make_move(move_obj)
+            walk(depth - 1, game.current_team)
+            game.unmake_move()
+
+    __require_numpy()
+    walk(depth, team)
+    return tuple(np.concatenate(arrays) for arrays in zip(*found))
+
+
+def benchmark(depth=2, repeats=10, print_func=print):
+    """
+    Time batch_moves over the positions depth moves on from each of the
+    perft positions (repeated to make a bigger batch), against finding
+    the moves for the same positions one Game at a time with perft.
+    """
+    from perft import POSITIONS, position, perft
+    batches, one_at_a_time, positions = [], 0.0, 0
+    for name in sorted(POSITIONS):
+        game, team = position(name)
+        batches.append(positions_ahead(game, depth, team))
+        start = perf_counter()
+        perft(game, depth + 1, team)
+        one_at_a_time += perf_counter() - start
+        positions += len(batches[-1][0])
+    args = [np.tile(np.concatenate(arrays), repeats) if arrays[0].ndim == 1 else
+            np.tile(np.concatenate(arrays), (repeats, 1)) for arrays in zip(*batches)]
+
+    start = perf_counter()
+    found = batch_moves(*args)
+    batched = perf_counter() - start
+    print_func('one game at a time: {0:>7} positions {1:>8.3f}s {2:>9.0f} positions/s'.format(
+        positions, one_at_a_time, positions / one_at_a_time))
+    print_func('batch_moves:        {0:>7} positions {1:>8.3f}s {2:>9.0f} positions/s'.format(
+        len(found.counts), batched, len(found.counts) / batched))
+    return len(found.counts) / batched
+
+
+if __name__ == '__main__':
+    benchmark(repeats=int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Bitboard representation of the pieces on the board, one 64 bit integer
+per team and piece type. Squares are numbered from 0 (A1) to 63 (H8),
+working along each row from the bottom up.
+"""
+from literals import PIECE_CODES, TEAMS
+from utils import pos_to_square, square_to_pos, col_letter_to_no, WRONG_ENTRY_POINT_MSG
+from attack_tables import (SQUARE_BITS, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN,
+                           ORTHOGONAL_LINE, DIAGONAL_LINE)
+
+
+def iter_squares(bitboard):
+    """
+    Yields the index of each set bit in a bitboard, lowest first.
+    """
+    while bitboard:
+        lowest_bit = bitboard & -bitboard
+        yield lowest_bit.bit_length() - 1
+        bitboard ^= lowest_bit
+
+
+def lowest_square(bitboard):
+    """
+    Index of the lowest set bit in a bitboard (-1 if empty).
+    """
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+class Bitboards(object):
+    """
+    Occupancy of the board held as integers so that occupancy, path
+    and attack questions can be answered with a few bitwise operations
+    rather than by scanning lists of positions. Kept in step with
+    Board.positions by Board.update_board.
+    """
+
+
+    def __init__(self, positions=None, squares=None):
+        """
+        Set up empty bitboards, populated from a positions dict (in the
+        format of DEFAULT_START_POSITIONS) or the piece_ref (or False) on
+        each square (as Board.squares) when one is supplied.
+        """
+        self.pieces = {team: {name: 0 for name in PIECE_CODES.values()}
+                       for team in TEAMS.values()}
+        self.teams = {team: 0 for team in TEAMS.values()}
+        self.occupied = 0
+
+        if squares:
+            for square, piece_ref in enumerate(squares):
+                if piece_ref:
+                    self.add_piece(piece_ref, square)
+        elif positions:
+            for row, row_content in positions.items():
+                for col, piece_ref in row_content.items():
+                    if piece_ref:
+                        self.add_piece(piece_ref, pos_to_square([row, col_letter_to_no(col)]))
+
+
+    @staticmethod
+    def describe_ref(piece_ref):
+        """
+        Team and piece name for a piece_ref e.g. 'wp1' => ('white', 'pawn').
+        """
+        return TEAMS[piece_ref[0]], PIECE_CODES[piece_ref[1]]
+
+
+    def add_piece(self, piece_ref, square):
+        team, name = self.describe_ref(piece_ref)
+        bit = SQUARE_BITS[square]
+        self.pieces[team][name] |= bit
+        self.teams[team] |= bit
+        self.occupied |= bit
+
+
+    def remove_piece(self, piece_ref, square):
+        team, name = self.describe_ref(piece_ref)
+        mask = ~SQUARE_BITS[square]
+        self.pieces[team][name] &= mask
+        self.teams[team] &= mask
+        self.occupied &= mask
+
+
+    def move_piece(self, piece_ref, old_square, new_square):
+        team, name = self.describe_ref(piece_ref)
+        change = SQUARE_BITS[old_square] | SQUARE_BITS[new_square]
+        self.pieces[team][name] ^= change
+        self.teams[team] ^= change
+        self.occupied ^= change
+
+
+    def is_occupied(self, pos):
+        return bool(self.occupied & SQUARE_BITS[pos_to_square(pos)])
+
+
+    def team_occupies(self, team, pos):
+        return bool(self.teams[team] & SQUARE_BITS[pos_to_square(pos)])
+
+
+    def king_square(self, team):
+        return lowest_square(self.pieces[team]['king'])
+
+
+    def first_blocker(self, old_square, new_square, occupied=None):
+        """
+        The occupied square nearest to old_square strictly between the
+        two squares (None if the path is clear or not a straight line).
+        """
+        occupied = self.occupied if occupied is None else occupied
+        blockers = BETWEEN[old_square][new_square] & occupied
+        if not blockers:
+            return None
+        if new_square > old_square:
+            return lowest_square(blockers)
+        return blockers.bit_length() - 1
+
+
+    def attackers(self, square, team, occupied=None, excluded=0):
+        """
+        Bitboard of the pieces in team which attack square, given the
+        occupied bitboard (defaults to current occupancy). Any pieces in
+        the excluded bitboard are ignored (e.g. a piece about to be taken).
+        """
+        occupied = self.occupied if occupied is None else occupied
+        pieces = self.pieces[team]
+        keep = ~excluded
+        other_team = 'black' if team == 'white' else 'white'
+
+        attackers = (KNIGHT_ATTACKS[square] & pieces['knight'] |
+                     KING_ATTACKS[square] & pieces['king'] |
+                     PAWN_ATTACKS[other_team][square] & pieces['pawn']) & keep
+
+        straight = (pieces['rook'] | pieces['queen']) & keep
+        for attacker in iter_squares(straight):
+            if ORTHOGONAL_LINE[attacker][square] and not BETWEEN[attacker][square] & occupied:
+                attackers |= SQUARE_BITS[attacker]
+
+        diagonal = (pieces['bishop'] | pieces['queen']) & keep
+        for attacker in iter_squares(diagonal):
+            if DIAGONAL_LINE[attacker][square] and not BETWEEN[attacker][square] & occupied:
+                attackers |= SQUARE_BITS[attacker]
+
+        return attackers
+
+
+    def is_attacked(self, square, team, occupied=None, excluded=0):
+        return bool(self.attackers(square, team, occupied, excluded))
+
+
+if __name__ == '__main__':
+    print(WRONG_ENTRY_POINT_MSG)
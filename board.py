@@ -2,7 +2,9 @@
 """
 Called from python_chess.game. This version is used for ASCII mode.
 """
-from utils import col_no_to_letter, WRONG_ENTRY_POINT_MSG, shout, debug
+from utils import col_no_to_letter, COL_LETTERS, WRONG_ENTRY_POINT_MSG, shout, debug
+import utils
+from bitboard import Bitboards, pos_to_square
 from pprint import pprint
 
 
@@ -13,80 +15,125 @@ class Board(object):
     intended to be logically separate from the rest of the game so 
     that the user interface can be replaced as required.
     """
+    ROW_HEIGHT, COL_WIDTH, HEAD_WIDTH = 4, 9, 5  # display sizes in characters
 
 
-    def __init__(self, pos):
+    def __init__(self, pos, use_bitboards=True):
         """
         Create board display based on game.positions passed in.
         """
         self.positions = pos
+        # piece_ref (or False) for each square 0 (A1) to 63 (H8)
+        self.squares = [pos[row][col] for row in range(1, 9) for col in COL_LETTERS]
+        self.bitboards = Bitboards(squares=self.squares) if use_bitboards else None
         self.printable_positions = []
-        header_row = [' '] + [col_head.ljust(3) for col_head in sorted(pos[1].keys())]
+        header_row = [' '] + [col_head.ljust(3) for col_head in COL_LETTERS]
         self.printable_positions.append(header_row)
-        for row in sorted(pos.keys(), reverse=True):
-            self.printable_positions.append([str(row)] +
-                                            [pos[row][col] for col in sorted(pos[row].keys())])
+        for row in range(8, 0, -1):
+            self.printable_positions.append([str(row)] + [pos[row][col] for col in COL_LETTERS])
+        # display lines, built on the first draw then patched as pieces move
+        self._lines, self._display = None, None
+        # the display changes with each cell redrawn, _line_versions has the
+        # version each line last changed at (for drawing only the changes)
+        self._version, self._line_versions, self._drawn_version = 0, [], 0
 
 
-    def draw_board(self):
+    def draw_board(self, diff=False):
         """
-        ASCII display showing the current state of the game.
+        ASCII display showing the current state of the game. The display
+        is built once then only the cells changed by moves are redrawn.
+        With diff only the lines changed since the last call are given,
+        each with the ANSI escape to move the cursor to it, to bring a
+        terminal still showing the last display up to date.
+        """
+        if self._lines is None:
+            self.__build_display()
+        if diff:
+            since, self._drawn_version = self._drawn_version, self._version
+            return ''.join('\x1b[{0};1H{1}\x1b[K'.format(line_no + 3, self._lines[line_no])
+                           for line_no, version in enumerate(self._line_versions)
+                           if version > since)
+        self._drawn_version = self._version
+        if self._display is None:
+            self._display = '\n' * 2 + '\n'.join(self._lines) + '\n'
+        return self._display
+
+
+    def __build_display(self):
+        """
+        Lines of the display for the current positions.
         """
         rows = cols = range(9)
-        row_height, col_width, head_width = 4, 9, 5
-        width = (len(cols[1:]) * col_width) + head_width + 1  # +1 for boarders
-        lines = range((len(rows) * row_height) + 1)
+        width = (len(cols[1:]) * Board.COL_WIDTH) + Board.HEAD_WIDTH + 1  # +1 for boarders
+        lines = range((len(rows) * Board.ROW_HEIGHT) + 1)
 
-        display = "\n" * 2
+        self._lines = []
         for i in lines:
-            row = int(i / 4)  # cell down (0-8)
+            row = i // Board.ROW_HEIGHT  # cell down (0-8)
             sep = "|" if row > 0 else " "
 
             # if at row boundary...
-            if i % row_height == 0:
+            if i % Board.ROW_HEIGHT == 0:
                 # if last row or first row after headings
                 if i == max(lines) or row == 1:
-                    line = " " * head_width + "-" * (width - head_width)
+                    line = " " * Board.HEAD_WIDTH + "-" * (width - Board.HEAD_WIDTH)
                 # if first row
                 elif row == 0:
-                    line = None
+                    continue
                 else:
-                    line = " " * head_width + sep
-                    for _ in cols[1:]:
-                        line = line + "-" * (col_width - 1) + sep
+                    line = " " * Board.HEAD_WIDTH + sep + ("-" * (Board.COL_WIDTH - 1) + sep) * 8
 
             # if line where a pieces could go
-            elif i % row_height == 2:
-                line = "  {0}  {1}".format(self.printable_positions[row][0][0], sep)
-                for col in cols[1:]:
-                    if self.printable_positions[row][col]:
-                        piece = self.printable_positions[row][col][:2]
-                        pad1 = " " * (int((col_width - 1) / 2) - 1)
-                        pad2 = " " * ((col_width - (len(pad1) + len(piece))) - 1)
-                        line = line + pad1 + piece + pad2 + sep
-                    else:
-                        line = line + " " * (col_width - 1) + sep
+            elif i % Board.ROW_HEIGHT == 2:
+                line = "  {0}  {1}".format(self.printable_positions[row][0][0], sep) + ''.join(
+                    self.__cell_text(self.printable_positions[row][col]) + sep
+                    for col in cols[1:])
 
             # normal row
             else:
-                line = " " * head_width + sep
-                for _ in cols[1:]:
-                    line = line + " " * (col_width - 1) + sep
+                line = " " * Board.HEAD_WIDTH + sep + (" " * (Board.COL_WIDTH - 1) + sep) * 8
+
+            self._lines.append(line)
+        self._line_versions = [0] * len(self._lines)
+        self._display = None
 
-            if line:
-                display = display + line + "\n"
 
-        return display
+    @staticmethod
+    def __cell_text(piece_ref):
+        if not piece_ref:
+            return " " * (Board.COL_WIDTH - 1)
+        piece = piece_ref[:2]
+        pad1 = " " * ((Board.COL_WIDTH - 1) // 2 - 1)
+        return pad1 + piece + " " * (Board.COL_WIDTH - len(pad1) - len(piece) - 1)
+
+
+    def __set_cell(self, row, col_no, piece_ref):
+        """
+        Put piece_ref (or False) in a cell of printable_positions, and
+        redraw that cell of the display if it has been built.
+        """
+        self.printable_positions[9 - row][col_no] = piece_ref
+        if self._lines is None:
+            return
+        # the display has no line for the top border, so is one line short
+        line_no = (9 - row) * Board.ROW_HEIGHT + 1
+        start = Board.HEAD_WIDTH + 1 + (col_no - 1) * Board.COL_WIDTH
+        line = self._lines[line_no]
+        self._lines[line_no] = line[:start] + self.__cell_text(piece_ref) + \
+            line[start + Board.COL_WIDTH - 1:]
+        self._version += 1
+        self._line_versions[line_no] = self._version
+        self._display = None
 
 
     def get_piece_ref(self, row, col_no):
         """
         Get a piece object from the positions list.
         """
-        col = col_no_to_letter(col_no)
-        debug("in board.get_piece_ref() self.positions[row][col] set to {0}".format(
-            self.positions[row][col]))
-        return self.positions[row][col]   
+        piece_ref = self.squares[(row - 1) * 8 + col_no - 1]
+        if __debug__ and utils.debugging:
+            debug("in board.get_piece_ref() self.positions[row][col] set to {0}", args=(piece_ref,))
+        return piece_ref
 
 
     def update_board(self, old_pos, new_pos, piece_ref):
@@ -96,13 +143,30 @@ class Board(object):
         old_row, new_row = old_pos[0], new_pos[0]
         old_col_no, new_col_no = old_pos[1], new_pos[1]
         old_col, new_col = col_no_to_letter(old_col_no), col_no_to_letter(new_col_no)
+        old_square, new_square = pos_to_square(old_pos), pos_to_square(new_pos)
+        if self.bitboards:
+            taken_piece_ref = self.squares[new_square]
+            if taken_piece_ref:
+                self.bitboards.remove_piece(taken_piece_ref, new_square)
+            self.bitboards.move_piece(piece_ref, old_square, new_square)
+        self.squares[old_square], self.squares[new_square] = False, piece_ref
         self.positions[old_row][old_col] = False
         self.positions[new_row][new_col] = piece_ref
-        self.printable_positions[9 - old_row][old_col_no] = False
-        self.printable_positions[9 - new_row][new_col_no] = piece_ref
+        self.__set_cell(old_row, old_col_no, False)
+        self.__set_cell(new_row, new_col_no, piece_ref)
+
+
+    def restore_piece(self, pos, piece_ref):
+        """
+        Put a piece back on an empty cell (e.g. when a take is undone).
+        """
+        row, col_no = pos
+        self.positions[row][col_no_to_letter(col_no)] = piece_ref
+        self.squares[pos_to_square(pos)] = piece_ref
+        self.__set_cell(row, col_no, piece_ref)
+        if self.bitboards:
+            self.bitboards.add_piece(piece_ref, pos_to_square(pos))
 
-        # todo cleanup:
-        # - this is messed up, need to think of a better solution than printable_pos...
 
     def print_state(self):
         shout("\nboard positions", suffix="\n---------------")
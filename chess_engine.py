@@ -1,16 +1,25 @@
 #!/usr/bin/env python3
 """
-Unit test for chess.py - an automated game. As AI is not yet built
-these will be purely random moves with no intelligence, but will serve
-as a good test it will cover a broad array of pieces / moves.
+Chess engine for one player games. Level 0 picks purely random moves,
+higher levels search that many moves ahead (negamax with alpha-beta
+pruning and iterative deepening) within a time / node budget, optionally
+sharing the moves at the root between several processes.
 """
-# from game import Game
+from game import Game
+from evaluation import PIECE_VALUES
+from opening_book import open_book
+from tablebase import shared_tablebase
 from utils import WRONG_ENTRY_POINT_MSG
 from random import random as rnd
-from copy import deepcopy
+from collections import defaultdict
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
 
-PIECE_VALS = {'queen': 9, 'rook': 5, 'bishop': 3.5,
-              'knight': 3.2, 'pawn': 1, 'check': 3, 'checkmate': 1000}
+PIECE_VALS = dict(PIECE_VALUES, check=3, checkmate=1000)
+
+DEFAULT_TIME_LIMIT = 10.0  # seconds per move for levels above 0
+NODES_PER_TIME_CHECK = 256
 
 
 def __pick_rnd(lst, cnt=None):
@@ -35,55 +44,305 @@ def __random_move(game, team):
     return __pick_rnd(obj_list, cnt)
 
 
-def __game_state(game, team):
+def game_state(game, team):
     """
     Asses the values of pieces on the current team relative to the
-    the value of pieces on the other team.
+    the value of pieces on the other team (including where they stand).
+    """
+    return game.evaluation.score(team)
+
+
+class SearchLimitReached(Exception):
+    """
+    Raised inside the search when the time or node budget runs out.
+    """
+
+
+class Search(object):
+    """
+    Negamax search with alpha-beta pruning, run to increasing depths
+    (iterative deepening) until the depth, time or node limit is reached.
+    Moves are tried in order of: the best move found for the position on
+    an earlier pass, takes (most valuable piece taken by least valuable
+    piece first), killer moves (which caused a cut-off at the same
+    depth) then by history (how often the move has caused cut-offs).
+    Positions covered by the endgame tables are scored from them rather
+    than searched. Lines are explored with make_move / unmake_move on the game itself.
+    If root_ids is given only those (piece_ref, new_cell_ref) moves are
+    searched at the root. The search also stops once stop (a
+    threading.Event) is set, e.g. when pondering in another thread.
+    """
+
+
+    def __init__(self, game, time_limit=None, node_limit=None, root_ids=None, stop=None):
+        self.game = game
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.stop = stop
+        self.root_ids = None if root_ids is None else set(root_ids)
+        self.results = []  # (best move id, score) for each depth completed
+        self.deadline = None
+        self.nodes = 0
+        self.depth_reached = 0
+        self.best_moves = {}  # zobrist key => (piece_ref, new_cell_ref)
+        self.killers = defaultdict(list)  # ply => [(piece_ref, new_cell_ref), ...]
+        self.history = defaultdict(int)  # (piece_ref, new_cell_ref) => score
+        self.tablebase = shared_tablebase()
+
+
+    def run(self, team, max_depth):
+        """
+        Returns (best move, score) from the deepest search completed, the
+        move as a MoveRecord.
+        """
+        self.deadline = None if self.time_limit is None else perf_counter() + self.time_limit
+        root_moves = self.root_moves(team)
+        if not root_moves:
+            return None, None
+        best_move, best_score = root_moves[0], None
+        undo_depth = len(self.game.undo_stack)
+
+        for depth in range(1, max_depth + 1):
+            try:
+                move, score = self.search_root(team, depth)
+            except SearchLimitReached:
+                # unwind any moves still made on the game
+                while len(self.game.undo_stack) > undo_depth:
+                    self.game.unmake_move()
+                break
+            best_move, best_score, self.depth_reached = move, score, depth
+            self.results.append((self.move_id(move), score))
+            if is_mate_score(score, max_depth):
+                break  # found a forced checkmate (for either side)
+        return best_move, best_score
+
+
+    def root_moves(self, team):
+        moves = self.ordered_moves(team, 0)
+        if self.root_ids is None:
+            return moves
+        return [move_obj for move_obj in moves if self.move_id(move_obj) in self.root_ids]
+
+
+    def search_root(self, team, depth):
+        alpha, beta = -float("inf"), float("inf")
+        best_move = None
+        for move_obj in self.root_moves(team):
+            self.game.make_move(move_obj)
+            score = -self.negamax(self.game.current_team, depth - 1, -beta, -alpha, 1)
+            self.game.unmake_move()
+            if best_move is None or score > alpha:
+                alpha, best_move = score, move_obj
+        self.best_moves[self.game.zobrist_key] = self.move_id(best_move)
+        return best_move, alpha
+
+
+    def negamax(self, team, depth, alpha, beta, ply):
+        self.count_node()
+        if self.tablebase and len(self.game.piece_squares) <= 3:
+            found = self.tablebase.probe(self.game)
+            if found:
+                return self.tablebase_score(found, ply)
+        if depth <= 0:
+            return self.quiescence(team, alpha, beta, ply)
+
+        moves = self.ordered_moves(team, ply)
+        if not moves:
+            return -PIECE_VALS['checkmate'] + ply if self.game.is_in_check(team) else 0
+
+        best_id = None
+        for move_obj in moves:
+            self.game.make_move(move_obj)
+            score = -self.negamax(self.game.current_team, depth - 1, -beta, -alpha, ply + 1)
+            self.game.unmake_move()
+            if score >= beta:
+                self.note_cut_off(move_obj, depth, ply)
+                self.best_moves[self.game.zobrist_key] = self.move_id(move_obj)
+                return beta
+            if score > alpha:
+                alpha, best_id = score, self.move_id(move_obj)
+
+        if best_id:
+            self.best_moves[self.game.zobrist_key] = best_id
+        return alpha
+
+
+    def quiescence(self, team, alpha, beta, ply):
+        """
+        Only follow takes beyond the search depth, so the position is
+        not scored part way through an exchange of pieces.
+        """
+        stand_pat = self.evaluate(team)
+        if stand_pat >= beta:
+            return beta
+        alpha = max(alpha, stand_pat)
+
+        for move_obj in self.ordered_moves(team, ply, takes_only=True):
+            self.count_node()
+            self.game.make_move(move_obj)
+            score = -self.quiescence(self.game.current_team, -beta, -alpha, ply + 1)
+            self.game.unmake_move()
+            if score >= beta:
+                return beta
+            alpha = max(alpha, score)
+        return alpha
+
+
+    def evaluate(self, team):
+        return self.game.evaluation.score(team)
+
+
+    def ordered_moves(self, team, ply, takes_only=False):
+        moves = [move_obj for move_obj in self.game.generate_moves(team)
+                 if move_obj.take or not takes_only]
+        best_id = self.best_moves.get(self.game.zobrist_key)
+        killers = self.killers[ply]
+        positions = self.game.board.positions
+
+        def order(move_obj):
+            move_id = self.move_id(move_obj)
+            if move_id == best_id:
+                return 0, 0
+            if move_obj.take:
+                taken_ref = positions[move_obj.new_row][move_obj.new_col]
+                return 1, (self.piece_value(taken_ref[1]) * -10 +
+                           self.piece_value(move_obj.piece.ref[1]))
+            if move_id in killers:
+                return 2, killers.index(move_id)
+            return 3, -self.history[move_id]
+
+        return sorted(moves, key=order)
+
+
+    def note_cut_off(self, move_obj, depth, ply):
+        if move_obj.take:
+            return
+        move_id = self.move_id(move_obj)
+        killers = self.killers[ply]
+        if move_id not in killers:
+            killers.insert(0, move_id)
+            del killers[2:]
+        self.history[move_id] += depth * depth
+
+
+    def count_node(self):
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchLimitReached()
+        if (self.deadline is not None and self.nodes % NODES_PER_TIME_CHECK == 0 and
+                perf_counter() > self.deadline):
+            raise SearchLimitReached()
+        if self.stop is not None and self.nodes % NODES_PER_TIME_CHECK == 0 and self.stop.is_set():
+            raise SearchLimitReached()
+
+
+    @staticmethod
+    def tablebase_score(found, ply):
+        """
+        Score for a tablebase ('win' / 'loss' / 'draw', plies to mate)
+        result, on the same scale as a checkmate found by the search.
+        """
+        result, plies = found
+        if result == 'draw':
+            return 0
+        score = PIECE_VALS['checkmate'] - ply - plies
+        return score if result == 'win' else -score
+
+
+    @staticmethod
+    def move_id(move_obj):
+        return move_obj.piece.ref, move_obj.new_cell_ref
+
+
+    @staticmethod
+    def piece_value(piece_code):
+        return PIECE_VALUES_BY_CODE.get(piece_code, PIECE_VALS['checkmate'])
+
+
+PIECE_VALUES_BY_CODE = {'Q': PIECE_VALS['queen'], 'R': PIECE_VALS['rook'],
+                        'B': PIECE_VALS['bishop'], 'N': PIECE_VALS['knight'],
+                        'p': PIECE_VALS['pawn']}
+
+
+def is_mate_score(score, max_depth):
+    return abs(score) >= PIECE_VALS['checkmate'] - max_depth
+
+
+def __search_worker(snapshot, team, root_ids, max_depth, time_limit, node_limit):
+    """
+    Search some of the root moves in a process of its own, returning the
+    best of them (and its score) for each depth completed.
     """
-    pass  # to follow
+    search = Search(Game.from_snapshot(snapshot), time_limit, node_limit, root_ids)
+    search.run(team, max_depth)
+    return search.results
 
 
-def __next_move(game_branch, team):
+def parallel_search(game, team, max_depth, time_limit=None, node_limit=None, workers=None):
     """
-    Find all possible moves, select one resulting in the
-    best take available (if one is available).
+    Share the root moves between worker processes, each searching its
+    share in a copy of the game built from game.snapshot() (with its own
+    time / node budget). The best move is taken from the deepest search
+    all of the workers completed, ties going to the move ordered first,
+    so the result does not depend on which worker finished first.
     """
-    raise Exception("Not implemented yet")
-    # obj_list.append(move_obj)
-    # if move_obj.take:
-    #     take_ref = \
-    #        game_branch.board.positions[move_obj.new_row][move_obj.new_col]
-    #     points = piece_vals[game_branch.pieces[take_ref].name]
-    #     if points > max_points:
-    #         max_points, selected_move = points, move_obj
+    root_moves = Search(game).root_moves(team)
+    if not root_moves:
+        return None
+    root_ids = [Search.move_id(move_obj) for move_obj in root_moves]
+    workers = min(workers or cpu_count() or 1, len(root_ids))
+    shares = [root_ids[i::workers] for i in range(workers)]
+
+    snapshot = game.snapshot()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(__search_worker, snapshot, team, share, max_depth,
+                                   time_limit, node_limit) for share in shares]
+        results = [future.result() for future in futures]
 
-    # if max_points == 0:
-    #     selected_move = __pick_rnd(obj_list, cnt)
-    # return selected_move
+    # workers that found a checkmate stop early, their last result stands
+    depth = min([len(result) for result in results
+                 if result and not is_mate_score(result[-1][1], max_depth)] or [max_depth])
+    best_id, best_score = root_ids[0], None
+    for result in results:
+        if not result:
+            continue
+        move_id, score = result[min(depth, len(result)) - 1]
+        if (best_score is None or score > best_score or
+                (score == best_score and root_ids.index(move_id) < root_ids.index(best_id))):
+            best_id, best_score = move_id, score
+    return root_moves[root_ids.index(best_id)].to_move(game)
 
 
-def pick_move(game, team, level):
+def pick_move(game, team, level, time_limit=DEFAULT_TIME_LIMIT, node_limit=None, workers=1,
+              book=None, stop=None):
     """
     Create a data structure representing the state of the game for
-    each branch of moves (a game object) with a points score for the 
-    branch. Points should be added for the best selectable move for 
+    each branch of moves (a game object) with a points score for the
+    branch. Points should be added for the best selectable move for
     your team and taken off for the best possible opponents move.
+    Level 0 moves randomly, higher levels search up to level moves
+    ahead, stopping early once time_limit (seconds) or node_limit is
+    used up (None for no limit). With more than one worker the search is
+    shared between that many processes (None for one per CPU), each with
+    the full time / node budget. Levels above 0 play from the opening
+    book at path book (see opening_book) while the position is in it,
+    and straight from the endgame tables (see tablebase) once they cover
+    the position. A search in this process gives up early (returning
+    the best move found so far) once stop, a threading.Event, is set.
     """
     if level == 0:
         return __random_move(game, team)
-    max_points, obj_list = 0, []
-
-    for l in range(1, level+1):
-        if l == 1:
-            branch = deepcopy(game)
-        
-        move_dict, cnt = branch.get_all_possible_moves(team=team)
-        for piece_ref, moves in move_dict.items():
-            for move_obj in moves:
-                ##
-                pass
-
-        move_branches = {}
+    move = shared_tablebase().best_move(game, team)
+    if move:
+        return move.to_move(game)
+    if book:
+        move = open_book(book).pick(game, team)
+        if move:
+            return move.to_move(game)
+    if workers is None or workers > 1:
+        return parallel_search(game, team, level, time_limit, node_limit, workers)
+    move = Search(game, time_limit, node_limit, stop=stop).run(team, level)[0]
+    return move.to_move(game) if move else None
 
 
 if __name__ == '__main__':
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Static evaluation of a game: the value of each team's pieces plus a
+bonus / penalty for the square each piece stands on (piece-square
+tables). Totals are kept per team and updated as pieces move, are taken
+or are put back, so scoring a position does not need to look at every
+piece.
+"""
+from literals import TEAMS
+from utils import pos_to_square, WRONG_ENTRY_POINT_MSG
+
+PIECE_VALUES = {'queen': 9, 'rook': 5, 'bishop': 3.5, 'knight': 3.2, 'pawn': 1}
+
+# bonus in hundredths of a pawn for a white piece on each square, laid out
+# as the board is printed (row 8 first), black uses the mirror image
+PIECE_SQUARE_TABLES = {
+    'pawn': [0,   0,   0,   0,   0,   0,   0,   0,
+             50,  50,  50,  50,  50,  50,  50,  50,
+             10,  10,  20,  30,  30,  20,  10,  10,
+             5,   5,   10,  25,  25,  10,  5,   5,
+             0,   0,   0,   20,  20,  0,   0,   0,
+             5,   -5,  -10, 0,   0,   -10, -5,  5,
+             5,   10,  10,  -20, -20, 10,  10,  5,
+             0,   0,   0,   0,   0,   0,   0,   0],
+    'knight': [-50, -40, -30, -30, -30, -30, -40, -50,
+               -40, -20, 0,   0,   0,   0,   -20, -40,
+               -30, 0,   10,  15,  15,  10,  0,   -30,
+               -30, 5,   15,  20,  20,  15,  5,   -30,
+               -30, 0,   15,  20,  20,  15,  0,   -30,
+               -30, 5,   10,  15,  15,  10,  5,   -30,
+               -40, -20, 0,   5,   5,   0,   -20, -40,
+               -50, -40, -30, -30, -30, -30, -40, -50],
+    'bishop': [-20, -10, -10, -10, -10, -10, -10, -20,
+               -10, 0,   0,   0,   0,   0,   0,   -10,
+               -10, 0,   5,   10,  10,  5,   0,   -10,
+               -10, 5,   5,   10,  10,  5,   5,   -10,
+               -10, 0,   10,  10,  10,  10,  0,   -10,
+               -10, 10,  10,  10,  10,  10,  10,  -10,
+               -10, 5,   0,   0,   0,   0,   5,   -10,
+               -20, -10, -10, -10, -10, -10, -10, -20],
+    'rook': [0,  0,  0,  0,  0,  0,  0,  0,
+             5,  10, 10, 10, 10, 10, 10, 5,
+             -5, 0,  0,  0,  0,  0,  0,  -5,
+             -5, 0,  0,  0,  0,  0,  0,  -5,
+             -5, 0,  0,  0,  0,  0,  0,  -5,
+             -5, 0,  0,  0,  0,  0,  0,  -5,
+             -5, 0,  0,  0,  0,  0,  0,  -5,
+             0,  0,  0,  5,  5,  0,  0,  0],
+    'queen': [-20, -10, -10, -5, -5, -10, -10, -20,
+              -10, 0,   0,   0,  0,  0,   0,   -10,
+              -10, 0,   5,   5,  5,  5,   0,   -10,
+              -5,  0,   5,   5,  5,  5,   0,   -5,
+              0,   0,   5,   5,  5,  5,   0,   -5,
+              -10, 5,   5,   5,  5,  5,   0,   -10,
+              -10, 0,   5,   0,  0,  0,   0,   -10,
+              -20, -10, -10, -5, -5, -10, -10, -20],
+    'king': [-30, -40, -40, -50, -50, -40, -40, -30,
+             -30, -40, -40, -50, -50, -40, -40, -30,
+             -30, -40, -40, -50, -50, -40, -40, -30,
+             -30, -40, -40, -50, -50, -40, -40, -30,
+             -20, -30, -30, -40, -40, -30, -30, -20,
+             -10, -20, -20, -20, -20, -20, -20, -10,
+             20,  20,  0,   0,   0,   0,   20,  20,
+             20,  30,  10,  0,   0,   10,  30,  20]}
+
+
+def piece_score(piece, square):
+    """
+    Value (in hundredths of a pawn) of piece standing on square, as a
+    (material, positional) pair.
+    """
+    # square 0 is A1, index 0 of the tables is A8
+    index = square ^ 56 if piece.team == 'white' else square
+    return (int(round(PIECE_VALUES.get(piece.name, 0) * 100)),
+            PIECE_SQUARE_TABLES[piece.name][index])
+
+
+class Evaluation(object):
+    """
+    Running material and piece-square totals for each team.
+    """
+
+
+    def __init__(self, pieces):
+        self.material = {team: 0 for team in TEAMS.values()}
+        self.positional = {team: 0 for team in TEAMS.values()}
+        for piece in pieces.values():
+            if not piece.taken:
+                self.add_piece(piece, pos_to_square(piece.pos))
+
+
+    def add_piece(self, piece, square):
+        material, positional = piece_score(piece, square)
+        self.material[piece.team] += material
+        self.positional[piece.team] += positional
+
+
+    def remove_piece(self, piece, square):
+        material, positional = piece_score(piece, square)
+        self.material[piece.team] -= material
+        self.positional[piece.team] -= positional
+
+
+    def move_piece(self, piece, old_square, new_square):
+        self.positional[piece.team] += (piece_score(piece, new_square)[1] -
+                                        piece_score(piece, old_square)[1])
+
+
+    def score(self, team):
+        """
+        Score (in pawns) for team, positive if team is ahead.
+        """
+        other = 'black' if team == 'white' else 'white'
+        return (self.material[team] + self.positional[team] -
+                self.material[other] - self.positional[other]) / 100
+
+
+if __name__ == '__main__':
+    print(WRONG_ENTRY_POINT_MSG)
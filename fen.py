@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Read and write positions in Forsyth-Edwards Notation (FEN) e.g. the
+start position is:
+rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1
+Castling is not part of this game, so the castling field is read but
+ignored and always written as '-'.
+"""
+from literals import DEFAULT_START_POSITIONS
+from move_validation.validate_conditions import en_passant_failure
+from utils import cell_ref_to_pos, pos_to_cell_ref, col_no_to_letter, col_letter_to_no
+from utils import pos_to_square, square_to_pos
+
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'
+
+FEN_CODES = {'k': 'K', 'q': 'Q', 'r': 'R', 'b': 'B', 'n': 'N', 'p': 'p'}
+PIECE_FEN = {code: letter for letter, code in FEN_CODES.items()}
+
+# square => ref and e.g. 'wR' => ['wR1', 'wR2'] from the default start positions
+DEFAULT_REFS = {pos_to_square([row, col_letter_to_no(col)]): ref
+                for row, row_content in DEFAULT_START_POSITIONS.items()
+                for col, ref in row_content.items() if ref}
+DEFAULT_REFS_BY_KIND = {kind: [ref for ref in sorted(DEFAULT_REFS.values()) if ref[:2] == kind]
+                        for kind in set(ref[:2] for ref in DEFAULT_REFS.values())}
+
+
+def read_fen(fen):
+    """
+    Split a FEN string into ([(piece_ref, square), ...] in square order,
+    team to move, piece_ref of a pawn that can be taken en passant or
+    None, halfmove clock, fullmove number), as Game.from_fen places the
+    pieces from. Piece refs are chosen to match DEFAULT_START_POSITIONS
+    where they can, so pieces on their starting cell count as not having
+    moved.
+    """
+    fields = fen.split()
+    if len(fields) < 2 or len(fields) > 6:
+        raise ValueError("FEN needs 2 to 6 fields: {0}".format(fen))
+    placement, side = fields[0], fields[1]
+    en_passant = fields[3] if len(fields) > 3 else '-'
+    halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+    fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+    if side not in ('w', 'b'):
+        raise ValueError("FEN side to move must be w or b: {0}".format(fen))
+
+    rows = placement.split('/')
+    if len(rows) != 8:
+        raise ValueError("FEN placement needs 8 rows: {0}".format(fen))
+    found = []  # (square, team char, piece code)
+    for row, row_text in zip(range(8, 0, -1), rows):
+        col_no = 1
+        for char in row_text:
+            if char.isdigit():
+                col_no += int(char)
+            elif char.lower() in FEN_CODES:
+                found.append(((row - 1) * 8 + col_no - 1, 'w' if char.isupper() else 'b',
+                              FEN_CODES[char.lower()]))
+                col_no += 1
+            else:
+                raise ValueError("Unknown piece '{0}' in FEN: {1}".format(char, fen))
+        if col_no != 9:
+            raise ValueError("FEN row {0} does not have 8 cells: {1}".format(row, fen))
+
+    # the pawn that can be taken en passant is just past the en passant cell
+    passed_pawn_square = None
+    if en_passant != '-':
+        ep_row, ep_col_no = cell_ref_to_pos(en_passant.upper())
+        passed_pawn_square = pos_to_square([ep_row + 1 if ep_row == 3 else ep_row - 1, ep_col_no])
+
+    placed = sorted(zip(__piece_refs(found, passed_pawn_square), (square for square, _, _ in found)),
+                    key=lambda placed_piece: placed_piece[1])
+    passed_pawn = next((ref for ref, square in placed if square == passed_pawn_square), None)
+    return placed, 'white' if side == 'w' else 'black', passed_pawn, \
+        halfmove_clock, fullmove_number
+
+
+def parse_fen(fen):
+    """
+    As read_fen but with the pieces as start positions in the format
+    Game takes as custom_start_positions.
+    """
+    placed, team_to_move, passed_pawn, halfmove_clock, fullmove_number = read_fen(fen)
+    start_pos = {row: {col_no_to_letter(col_no): False for col_no in range(1, 9)}
+                 for row in range(1, 9)}
+    for ref, square in placed:
+        row, col_no = square_to_pos(square)
+        start_pos[row][col_no_to_letter(col_no)] = ref
+    return start_pos, team_to_move, passed_pawn, halfmove_clock, fullmove_number
+
+
+def __piece_refs(found, passed_pawn_square):
+    """
+    A piece_ref for each (square, team char, piece code), preferring the
+    ref the default start positions have on that square, then (for
+    pawns) the ref of the pawn starting in that column, then the first
+    unused ref for that kind of piece.
+    """
+    used, refs, others = set(), [None] * len(found), []
+    # most pieces are usually on their default square, which settles their ref
+    for i, (square, team_char, code) in enumerate(found):
+        default_ref = DEFAULT_REFS.get(square)
+        if default_ref and default_ref[0] == team_char and default_ref[1] == code:
+            refs[i] = default_ref
+            used.add(default_ref)
+        elif square == passed_pawn_square:
+            others.insert(0, i)
+        else:
+            others.append(i)
+
+    for i in others:
+        square, team_char, code = found[i]
+        kind = team_char + code
+        candidates = [DEFAULT_REFS.get(square)]
+        if code == 'p':
+            candidates.append('{0}{1}'.format(kind, square % 8 + 1))
+        candidates += DEFAULT_REFS_BY_KIND.get(kind, [])
+        ref = next((ref for ref in candidates if ref and ref[:2] == kind and ref not in used), None)
+        if ref is None:
+            number = 2
+            while '{0}{1}'.format(kind, number) in used:
+                number += 1
+            ref = '{0}{1}'.format(kind, number)
+        used.add(ref)
+        refs[i] = ref
+    return refs
+
+
+def game_fen(game):
+    """
+    FEN string for the current position of a game.
+    """
+    # the cell passed over by a pawn that can be taken en passant
+    en_passant_cell = '-'
+    last_piece = game.get_piece(game.last_piece_to_move)
+    if last_piece and last_piece.name == 'pawn' and en_passant_failure(last_piece) is None:
+        en_passant_cell = pos_to_cell_ref([last_piece.row - last_piece.forward, last_piece.col_no])
+
+    rows = []
+    for row in range(8, 0, -1):
+        row_text, empty = '', 0
+        for col_no in range(1, 9):
+            ref = game.board.squares[(row - 1) * 8 + col_no - 1]
+            if not ref:
+                empty += 1
+                continue
+            letter = PIECE_FEN[ref[1]]
+            row_text += (str(empty) if empty else '') + (letter.upper() if ref[0] == 'w' else letter)
+            empty = 0
+        rows.append(row_text + (str(empty) if empty else ''))
+    return '{0} {1} - {2} {3} {4}'.format('/'.join(rows), game.team_to_move[0],
+                                          en_passant_cell.lower(),
+                                          game.halfmove_clock, game.fullmove_number)
+
+
+def benchmark(repeats=2000, print_func=print):
+    """
+    Time loading each of the perft positions with Game.from_fen, which
+    places the pieces straight from the FEN, against going through
+    custom_start_positions (parse_fen then Game, as from_fen used to)
+    and against Game() for the start position. Returns the time per
+    position for each.
+    """
+    from time import perf_counter
+    from game import Game
+    import perft
+    import zobrist
+    fen_strings = [perft.position(name)[0].to_fen() for name in sorted(perft.POSITIONS)]
+
+    def through_start_positions(fen_string):
+        start_pos, team_to_move, passed_pawn, halfmove_clock, fullmove_number = parse_fen(fen_string)
+        game = Game(custom_start_positions=start_pos, default_logging=False)
+        for piece in game.pieces.values():
+            if piece.name == 'pawn':
+                piece.move_cnt = 0 if piece.row == (2 if piece.team == 'white' else 7) else 1
+        if passed_pawn:
+            game.pieces[passed_pawn].move_cnt = 1
+            game.pieces[passed_pawn].last_to_move = True
+            game.last_piece_to_move = passed_pawn
+        game.team_to_move = team_to_move
+        game.halfmove_clock, game.fullmove_number = halfmove_clock, fullmove_number
+        game.zobrist_key = zobrist.position_key(game, team_to_move == 'black')
+        game.key_history = [game.zobrist_key]
+        game.start_fen = game.to_fen()
+        return game
+
+    timings = []
+    for label, load, loaded in [
+            ('Game.from_fen', lambda fen_string: Game.from_fen(fen_string, default_logging=False),
+             fen_strings),
+            ('custom_start_positions', through_start_positions, fen_strings),
+            ('Game() start position', lambda _: Game(default_logging=False), [START_FEN])]:
+        start = perf_counter()
+        for _ in range(repeats):
+            for fen_string in loaded:
+                load(fen_string)
+        per_position = (perf_counter() - start) / (repeats * len(loaded))
+        timings.append(per_position)
+        print_func('{0:<24} {1:>8.1f} us per position'.format(label, per_position * 1e6))
+    print_func('speed up: {0:.2f}x'.format(timings[1] / timings[0]))
+    return timings
+
+
+if __name__ == '__main__':
+    import sys
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -2,16 +2,33 @@
 """
 Python implementation of chess, main entry point.
 """
-import json
 from board import Board
 from piece import Piece
-from move import Move
+from move import Move, MoveRecord
 from literals import PIECE_CODES, DEFAULT_START_POSITIONS, TEAMS, LOGGING, MOVE_INSTRUCTIONS
 # from chess_engine import pick_move
-from utils import shout, write_log, cell_ref_to_pos, pos_to_cell_ref, debug, DebugLevel, set_debugging_level
+from attack_tables import destinations
+from utils import shout, cell_ref_to_pos, pos_to_cell_ref, debug, DebugLevel, set_debugging_level
+from utils import pos_to_square, square_to_pos, col_no_to_letter, COL_LETTERS
+import utils
+from legal_moves import legal_moves, in_check
+import zobrist
+import fen
+import game_log
+import tablebase
+import instrumentation
+from position_cache import PositionCache, DEFAULT_CACHE_SIZE
+from evaluation import Evaluation
+from bitboard import Bitboards
 from copy import deepcopy
+import sys
+from collections import namedtuple
 
-LOG = ''
+# what make_move needs to remember for unmake_move to take a move back
+UndoRecord = namedtuple('UndoRecord', ['piece', 'old_pos', 'taken_piece', 'move_cnt',
+                                       'last_to_move', 'last_piece_to_move', 'current_team',
+                                       'check', 'checkmate', 'zobrist_key', 'team_to_move',
+                                       'halfmove_clock', 'fullmove_number'])
 
 
 class Game(object):
@@ -31,33 +48,78 @@ class Game(object):
                  }
     move_dict['queen'] = move_dict['rook'] + move_dict['bishop']
 
-    def __init__(self, turn_limit=200, custom_start_positions=None, default_logging=False):
+    # ways get_all_possible_moves can find moves
+    VALIDATE_EACH_MOVE = 'validate'  # run every candidate through move validation
+    PIN_AWARE = 'pin_aware'  # find checks and pins once, then filter with ray tests
+
+    def __init__(self, turn_limit=200, custom_start_positions=None, default_logging=LOGGING,
+                 use_bitboards=True, cache_size=DEFAULT_CACHE_SIZE):
         """
-        Initialise game object and create required member objects
+        Initialise game object and create required member objects, with
+        use_bitboards the board also keeps a bitboard representation
+        which moves are then validated against. Up to cache_size
+        results (e.g. possible moves) are cached against the position.
         """
         start_pos = custom_start_positions or deepcopy(DEFAULT_START_POSITIONS)
         # need a copy here otherwise DEFAULT_START_POSITIONS gets changes and reused in next game
-        self.logging = default_logging if default_logging else LOGGING
+        self.__set_up(Board(start_pos, use_bitboards=use_bitboards),
+                      self.__create_pieces(Game.move_dict, start_pos),
+                      turn_limit, default_logging, cache_size,
+                      start_fen=fen.START_FEN if custom_start_positions is None else None)
+
+
+    def __set_up(self, board, pieces, turn_limit, default_logging, cache_size,
+                 team_to_move='white', halfmove_clock=0, fullmove_number=1,
+                 last_piece_to_move=None, start_fen=None):
+        """
+        Set up the game state around the board and pieces given, shared
+        by __init__ and from_fen (which places its pieces directly).
+        The zobrist key and start_fen (unless given) are worked out once
+        everything else is in place.
+        """
+        self.logging = default_logging
 
-        self.board = Board(start_pos)
-        self.pieces = self.__create_pieces(Game.move_dict, start_pos)
+        self.board = board
+        self.pieces = pieces
+        # square (0 to 63) of each piece on the board, the reverse of board.squares
+        self.piece_squares = {ref: pos_to_square(piece.pos) for ref, piece in self.pieces.items()}
 
         # initialise variables that will be needed later
         self.check = False
         self.checkmate = False
         self.draw = False
+        self.winner = None  # set if the endgame tables decide the game early
         self.turns = 0
         self.current_team = None
-        self.last_piece_to_move = None
+        self.last_piece_to_move = last_piece_to_move
         self.turn_limit = turn_limit
+        self.undo_stack = []
+        # as in FEN: moves since a pawn moved or a piece was taken, and
+        # the move number (going up after each black move)
+        self.team_to_move = team_to_move
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_number = fullmove_number
+
+        # 64 bit key for the position (updated as moves are made) and its
+        # value after each move so far, for caches and spotting repetition
+        self.zobrist_key = zobrist.position_key(self, team_to_move == 'black')
+        self.key_history = [self.zobrist_key]
+        self.cache = PositionCache(cache_size)
+        # material / piece-square totals, kept up to date as pieces move
+        self.evaluation = Evaluation(self.pieces)
+        # (from, to) squares of each move made since the position in start_fen
+        self.move_history = []
+        self.start_fen = start_fen or self.to_fen()
+        self.log_id = None  # id of the game in the game log, once logging has started
+        # thinks ahead while at the prompt against the engine (see ponder.Ponderer)
+        self.ponderer = None
+
+
+    @property
+    def bitboards(self):
+        return self.board.bitboards
 
 
-    def __to_json(self):
-        """
-        Output entire object contents as json.
-        """
-        return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True, indent=4)
-
     @staticmethod
     def __create_pieces(move_dict, start_pos):
         """
@@ -94,8 +156,6 @@ class Game(object):
         automatically or a move object (for interface from external
         scripts).
         """
-        global LOG
-
         self.turns += 1
         self.current_team = team
         occupied, our_team, their_team = self.get_occupied()
@@ -116,14 +176,25 @@ class Game(object):
                     print(self.board.draw_board())
                     if user_feedback:
                         print(user_feedback + '\n')
-                    prompt = input("[" + team + " move] >> ")
+                    if self.ponderer:
+                        self.ponderer.start(self, team)
+                    try:
+                        prompt = input("[" + team + " move] >> ")
+                    finally:
+                        if self.ponderer:
+                            self.ponderer.stop()
 
                 piece, up, right, hold_move, user_feedback = \
                     self.__parse_prompt(prompt, our_team)
 
                 if not hold_move:
+                    # already known to be legal if found while pondering...
+                    move = self.__pondered_move(piece, up, right, occupied, our_team, their_team)
+                if not hold_move and not move:
                     # create object for move, this evaluates potential issues etc.
-                    move = Move(piece, up, right, occupied, our_team, their_team)
+                    move = Move(piece, up, right, occupied, our_team, their_team,
+                                bitboards=self.bitboards, squares=self.board.squares,
+                                position_key=self.zobrist_key)
 
             if move:
                 if move.possible:
@@ -137,9 +208,13 @@ class Game(object):
         # noinspection PyUnboundLocalVariable
         self.__process_move(piece, move, up, right, occupied, our_team, their_team)
 
-        # log state of game
+        # log the move
         if self.logging:
-            LOG = '\n'.join([LOG, self.__to_json()])
+            self.__log_move(move)
+
+        # down to a king and one piece the tables can call the game early
+        if not self.checkmate and len(self.piece_squares) <= 3:
+            self.__adjudicate()
 
         # wrap up if done...
         if self.checkmate or self.turns >= 200:
@@ -149,7 +224,55 @@ class Game(object):
                 move.checkmate = True
                 shout('game over, {0} team wins'.format(self.current_team))
             if self.logging:
-                write_log(LOG)
+                game_log.shared_log().flush()
+
+
+    def __pondered_move(self, piece, up, right, occupied, our_team, their_team):
+        """
+        Move object for the move if the ponderer found it among the legal
+        moves for this position, otherwise None (so it is validated).
+        """
+        records = self.ponderer.legal_moves(self) if self.ponderer else None
+        if not records:
+            return None
+        square = pos_to_square([piece.row + up, piece.col_no + right])
+        for record in records:
+            if record.piece is piece and record.square == square:
+                return record.to_move(self, occupied, our_team, their_team)
+        return None
+
+
+    def __adjudicate(self):
+        """
+        End the game if the endgame tables (see tablebase) know the result.
+        """
+        result = tablebase.shared_tablebase().adjudicate(self)
+        if result is None:
+            return
+        if result == 'draw':
+            self.draw = True
+            shout('nothing left to play for, lets call it a draw')
+        else:
+            self.winner = result
+            shout('{0} team wins (forced checkmate)'.format(result))
+        if self.logging:
+            game_log.shared_log().flush()
+
+
+    def __log_move(self, move):
+        """
+        Append the move just made to the (binary) game log, starting the
+        game in the log first if needed.
+        """
+        log = game_log.shared_log()
+        if self.log_id is None:
+            self.log_id = log.start_game(self.start_fen)
+            # any moves made before logging started (e.g. with make_move)
+            for ply, (from_square, to_square) in enumerate(self.move_history[:-1], 1):
+                log.log_move(self.log_id, ply, from_square, to_square, self.key_history[ply])
+        from_square, to_square = self.move_history[-1]
+        log.log_move(self.log_id, len(self.move_history), from_square, to_square,
+                     self.zobrist_key, move.take, self.check, self.checkmate)
 
 
     def __parse_prompt(self, prompt, our_team):
@@ -177,7 +300,7 @@ class Game(object):
             return piece, up, right, hold_move, user_feedback
         elif prompt.lower() == 'log':
             if self.logging:
-                write_log(LOG)
+                game_log.shared_log().flush()
                 user_feedback = "Log written to current working directory"
             else:
                 user_feedback = "Logging not currently enabled, change in literals.py"
@@ -215,8 +338,7 @@ class Game(object):
 
         up, right = new_row - cur_row, new_col_no - cur_col_no
 
-        debug('piece_ref: {0} | up: {1} | right: {2}'.format(piece.ref, up, right),
-              DebugLevel.mid)
+        debug('piece_ref: {0} | up: {1} | right: {2}', DebugLevel.mid, args=(piece.ref, up, right))
 
         # attempt to get destination...
         try:
@@ -251,29 +373,18 @@ class Game(object):
         """
         Execute and updates required as a result of a valid move.
         """
-        # update piece attributes
-        global taken_piece
+        # update piece attributes, board etc.
         occupied.remove(piece.pos)
-        piece.move_cnt += 1
-        piece.row += up
-        piece.col_no += right
+        taken_piece = self.__apply_move(piece, move.new_pos)
         occupied.append(piece.pos)
 
-        # check if anything was taken
-        if move.take:
-            # get ref of taken piece BEFORE board update
-            taken_piece_ref = self.board.get_piece_ref(move.new_row, move.new_col_no)
-            taken_piece = self.get_piece(taken_piece_ref)
-            taken_piece.taken = True
-            assert self.get_piece(taken_piece.ref).taken  # todo -replace with unit test
-            shout('taken piece: {0}'.format(taken_piece.ref))
-
-        # update board
-        self.board.update_board(move.pos, move.new_pos, piece.ref)
-
         assert our_team[piece.ref].pos == piece.pos  # todo -replace with unit test
-        if move.take:
+        if taken_piece:
+            shout('taken piece: {0}'.format(taken_piece.ref))
             assert their_team[taken_piece.ref].taken
+            # the taken piece should play no further part in the checks below
+            occupied.remove(taken_piece.pos)
+            del their_team[taken_piece.ref]
 
         # other player in check?
         self.check = self.__in_check(piece, occupied, our_team, their_team)
@@ -286,10 +397,217 @@ class Game(object):
             # other player in checkmate?
             self.checkmate = self.__in_checkmate(occupied, our_team, their_team)
 
+
+    def __apply_move(self, piece, new_pos):
+        """
+        Move piece to new_pos updating the piece, the board, any piece
+        taken and which piece was last to move. Returns the taken piece
+        (None if nothing was taken).
+        """
+        # get taken piece BEFORE board update
+        old_square, new_square = self.piece_squares[piece.ref], pos_to_square(new_pos)
+        taken_piece = self.get_piece(self.board.squares[new_square])
+        key = (self.zobrist_key ^ zobrist.BLACK_TO_MOVE_KEY ^ zobrist.en_passant_key(self) ^
+               zobrist.piece_key(piece, old_square))
+        if taken_piece:
+            taken_piece.taken = True
+            del self.piece_squares[taken_piece.ref]
+            key ^= zobrist.piece_key(taken_piece, new_square)
+            self.evaluation.remove_piece(taken_piece, new_square)
+        self.evaluation.move_piece(piece, old_square, new_square)
+        self.piece_squares[piece.ref] = new_square
+        self.move_history.append((old_square, new_square))
+
+        self.board.update_board(piece.pos, new_pos, piece.ref)
+        piece.row, piece.col_no = new_pos
+        piece.move_cnt += 1
+
         last_piece = self.get_piece(self.last_piece_to_move)
         if last_piece:
             last_piece.last_to_move = False
-        move.piece.last_to_move = True
+        piece.last_to_move = True
+        self.last_piece_to_move = piece.ref
+
+        self.team_to_move = 'black' if piece.team == 'white' else 'white'
+        self.halfmove_clock = 0 if taken_piece or piece.name == 'pawn' else self.halfmove_clock + 1
+        if piece.team == 'black':
+            self.fullmove_number += 1
+
+        self.zobrist_key = key ^ zobrist.piece_key(piece, new_square) ^ zobrist.en_passant_key(self)
+        self.key_history.append(self.zobrist_key)
+        return taken_piece
+
+
+    def is_in_check(self, team):
+        """
+        Whether the king of team is under attack (cached per position).
+        """
+        cache_key = (self.zobrist_key, team, 'check')
+        verdict = self.cache.get(cache_key)
+        if verdict is None:
+            verdict = in_check(self.bitboards or Bitboards(self.board.positions), team)
+            self.cache.put(cache_key, verdict)
+        return verdict
+
+
+    def is_checkmated(self, team):
+        """
+        Whether team is in check with no possible moves (cached per position).
+        """
+        cache_key = (self.zobrist_key, team, 'checkmate')
+        verdict = self.cache.get(cache_key)
+        if verdict is None:
+            verdict = False
+            if self.is_in_check(team):
+                verdict = not self.generate_moves(team)
+            self.cache.put(cache_key, verdict)
+        return verdict
+
+
+    def repetition_count(self):
+        """
+        Number of times the current position has come up in the game.
+        """
+        return self.key_history.count(self.zobrist_key)
+
+
+    def snapshot(self):
+        """
+        Compact, picklable copy of the position (e.g. to send to another
+        process) - see from_snapshot.
+        """
+        pieces = tuple((piece.ref, pos_to_square(piece.pos), piece.move_cnt)
+                       for ref, piece in sorted(self.pieces.items()) if not piece.taken)
+        black_to_move = self.team_to_move == 'black'
+        return self.current_team, self.turns, self.last_piece_to_move, black_to_move, pieces
+
+
+    @classmethod
+    def from_snapshot(cls, snapshot, **kwargs):
+        """
+        Create a game from the position saved by snapshot, any keyword
+        arguments are passed on to Game.
+        """
+        current_team, turns, last_piece_to_move, black_to_move, pieces = snapshot
+        start_pos = {row: {col_no_to_letter(col): False for col in range(1, 9)}
+                     for row in range(1, 9)}
+        for ref, square, move_cnt in pieces:
+            row, col = square_to_pos(square)
+            start_pos[row][col_no_to_letter(col)] = ref
+        game = cls(custom_start_positions=start_pos, **kwargs)
+
+        for ref, square, move_cnt in pieces:
+            game.pieces[ref].move_cnt = move_cnt
+        last_piece = game.get_piece(last_piece_to_move)
+        if last_piece:
+            last_piece.last_to_move = True
+        game.current_team, game.turns, game.last_piece_to_move = current_team, turns, last_piece_to_move
+        game.team_to_move = 'black' if black_to_move else 'white'
+        game.zobrist_key = zobrist.position_key(game, black_to_move)
+        game.key_history = [game.zobrist_key]
+        game.start_fen = game.to_fen()
+        return game
+
+
+    @classmethod
+    def from_fen(cls, fen_string, turn_limit=200, default_logging=LOGGING, use_bitboards=True,
+                 cache_size=DEFAULT_CACHE_SIZE):
+        """
+        Create a game from a FEN string, the other arguments are as for
+        Game. The pieces are placed straight from the FEN rather than
+        going through custom_start_positions. Pawns off their starting
+        row (and the pawn that can be taken en passant) count as having
+        moved, other pieces as having moved if off their default
+        starting cell.
+        """
+        placed, team_to_move, passed_pawn, halfmove_clock, fullmove_number = \
+            fen.read_fen(fen_string)
+        squares, pieces = [False] * 64, {}
+        for ref, square in placed:
+            squares[square] = ref
+            row = square // 8 + 1
+            name = PIECE_CODES[ref[1]]
+            if name == 'pawn':
+                moved = row != (2 if ref[0] == 'w' else 7) or ref == passed_pawn
+            else:
+                moved = fen.DEFAULT_REFS.get(square) != ref
+            pieces[ref] = Piece(ref, name, TEAMS[ref[0]], row, COL_LETTERS[square % 8],
+                                cls.move_dict[name], 1 if moved else 0)
+        if passed_pawn:
+            pieces[passed_pawn].last_to_move = True
+
+        # Board still keeps positions as {row: {col: ref}}, filled in from the squares
+        positions = {row: dict(zip(COL_LETTERS, squares[row * 8 - 8:row * 8])) for row in range(1, 9)}
+        game = cls.__new__(cls)
+        game.__set_up(Board(positions, use_bitboards=use_bitboards), pieces, turn_limit,
+                      default_logging, cache_size, team_to_move, halfmove_clock, fullmove_number,
+                      passed_pawn, start_fen=None)
+        return game
+
+
+    def to_fen(self):
+        """
+        FEN string for the current position.
+        """
+        return fen.game_fen(self)
+
+
+    def make_move(self, move):
+        """
+        Make a (valid) move for the current team and hand the turn to
+        the other team, recording what is needed to take the move back
+        with unmake_move. Used to explore lines of play without copying
+        the game.
+        """
+        piece = move.piece
+        old_pos, move_cnt, last_to_move = piece.pos, piece.move_cnt, piece.last_to_move
+        last_piece_to_move, zobrist_key = self.last_piece_to_move, self.zobrist_key
+        counters = self.team_to_move, self.halfmove_clock, self.fullmove_number
+
+        taken_piece = self.__apply_move(piece, move.new_pos)
+        self.undo_stack.append(UndoRecord(piece, old_pos, taken_piece, move_cnt, last_to_move,
+                                          last_piece_to_move, self.current_team, self.check,
+                                          self.checkmate, zobrist_key, *counters))
+
+        self.current_team = 'black' if piece.team == 'white' else 'white'
+        self.turns += 1
+        self.check = bool(self.bitboards) and in_check(self.bitboards, self.current_team)
+        self.checkmate = False
+
+
+    def unmake_move(self):
+        """
+        Take back the last move made with make_move.
+        """
+        undo = self.undo_stack.pop()
+        piece, taken_piece = undo.piece, undo.taken_piece
+
+        new_square, old_square = self.piece_squares[piece.ref], pos_to_square(undo.old_pos)
+        self.board.update_board(piece.pos, undo.old_pos, piece.ref)
+        self.evaluation.move_piece(piece, new_square, old_square)
+        self.piece_squares[piece.ref] = old_square
+        if taken_piece:
+            taken_piece.taken = False
+            self.board.restore_piece(piece.pos, taken_piece.ref)
+            self.evaluation.add_piece(taken_piece, new_square)
+            self.piece_squares[taken_piece.ref] = new_square
+        piece.row, piece.col_no = undo.old_pos
+        piece.move_cnt = undo.move_cnt
+
+        piece.last_to_move = undo.last_to_move
+        last_piece = self.get_piece(undo.last_piece_to_move)
+        if last_piece:
+            last_piece.last_to_move = True
+        self.last_piece_to_move = undo.last_piece_to_move
+
+        self.current_team = undo.current_team
+        self.turns -= 1
+        self.check, self.checkmate = undo.check, undo.checkmate
+        self.zobrist_key = undo.zobrist_key
+        self.key_history.pop()
+        self.move_history.pop()
+        self.team_to_move = undo.team_to_move
+        self.halfmove_clock, self.fullmove_number = undo.halfmove_clock, undo.fullmove_number
 
 
     def __in_check(self, piece, occupied, our_team, their_team):
@@ -299,21 +617,25 @@ class Game(object):
         position to their King's position to see if the move would be 
         valid.
         """
-        debug('Checking if other player is in check...', DebugLevel.mid)
+        if __debug__ and utils.debugging:
+            debug('Checking if other player is in check...', DebugLevel.mid)
 
         # work out move required to get to their king
         their_king = (self.get_piece('wK') if self.current_team == 'black'
                       else self.get_piece('bK'))
         up = their_king.row - piece.row
         right = their_king.col_no - piece.col_no
-        debug('..possible to move ' + piece.ref + ' from ' +
-              str(piece.pos) + ' to ' + str(their_king.pos) + '?', DebugLevel.mid)
+        if __debug__ and utils.debugging:
+            debug('..possible to move {0} from {1} to {2}?', DebugLevel.mid,
+                  args=(piece.ref, piece.pos, their_king.pos))
         theoretical_move = Move(piece, up, right, occupied, our_team,
-                                their_team, theoretical_move=True)
+                                their_team, theoretical_move=True, bitboards=self.bitboards,
+                                squares=self.board.squares, position_key=self.zobrist_key)
         if theoretical_move.possible:
             return True
         else:
-            debug('..invalid_reason: ' + theoretical_move.invalid_reason, DebugLevel.mid)
+            if __debug__ and utils.debugging:
+                debug('..invalid_reason: {0}', DebugLevel.mid, args=(theoretical_move.invalid_reason,))
             return False
 
 
@@ -324,16 +646,22 @@ class Game(object):
         opponents team to see if any are valid i.e. end with their 
         king not in check.
         """
-        for ref, piece in their_team.items():
+        if self.bitboards:
+            # a single pin / check aware pass over all of their pieces is cheapest
+            piece_dicts, mode = [their_team], Game.PIN_AWARE
+        else:
             # call one piece at a time to stop after first piece found with
             # possible moves
-            p_dict = {ref: piece}
+            piece_dicts = [{ref: piece} for ref, piece in their_team.items()]
+            mode = Game.VALIDATE_EACH_MOVE
+
+        for p_dict in piece_dicts:
             # intentionally reverse our team and their team params as 
             # we want to simulate all possible moves for opponent
             all_moves, cnt = self.get_all_possible_moves(occupied=occupied,
                                                          our_team=their_team,
                                                          their_team=our_team,
-                                                         pieces=p_dict)
+                                                         pieces=p_dict, mode=mode)
             if cnt > 0:
                 print("Not checkmate (type list at prompt if you want to " +
                       "display all possible moves)")
@@ -343,7 +671,7 @@ class Game(object):
 
     def get_all_possible_moves(self, occupied=None, our_team=None,
                                their_team=None, pieces=None,
-                               list_moves=False, team=None):
+                               list_moves=False, team=None, mode=VALIDATE_EACH_MOVE):
         """
         Try all of the valid moves for the pieces passed in, pieces
         arg should be a dictionary of piece objects with piece_ref as 
@@ -354,6 +682,10 @@ class Game(object):
         is made to self.get_occupied.
         If pieces is not supplied this is defaulted to our_team.
         Team param is picked up from game object when not supplied.
+        The PIN_AWARE mode gives the same moves as VALIDATE_EACH_MOVE
+        much faster, but needs the board to be keeping bitboards.
+        Results for a whole team are cached, so the move objects may be
+        shared with earlier calls for the same position.
         """
         # get defaults if args missing
         if team:
@@ -363,36 +695,123 @@ class Game(object):
         if not pieces:
             pieces = our_team
 
+        # moves for a whole team are cached against the position
+        cached, cache_key = None, None
+        if pieces is our_team and our_team:
+            cache_key = (self.zobrist_key, next(iter(our_team.values())).team, mode)
+            cached = self.cache.get(cache_key)
+
+        if cached:
+            all_possible_moves, cnt = dict(cached[0]), cached[1]
+        elif mode == Game.PIN_AWARE and self.bitboards:
+            all_possible_moves, cnt = self.__pin_aware_moves(occupied, our_team, their_team, pieces)
+        else:
+            all_possible_moves, cnt = self.__validated_moves(occupied, our_team, their_team, pieces)
+
+        if cache_key and not cached:
+            self.cache.put(cache_key, (dict(all_possible_moves), cnt))
+        if instrumentation.enabled:
+            instrumentation.count_moves('get_all_possible_moves', cnt)
+
+        if list_moves:
+            print('\nPossible moves:')
+            for ref, moves in iter(sorted(all_possible_moves.items())):
+                piece = self.get_piece(ref)
+                piece_text = "{0} in {1} to".format(piece.name, piece.cell_ref).rjust(17)
+                possible_destinations = sorted([pos_to_cell_ref(obj.new_pos) for obj in moves])
+                print("{0}:  {1}".format(piece_text, ', '.join(possible_destinations)))
+
+        return all_possible_moves, cnt
+
+
+    def __validated_moves(self, occupied, our_team, their_team, pieces):
+        """
+        Moves for each of the pieces found by creating a move object for
+        each candidate move (which validates the move).
+        """
         all_possible_moves, cnt = {}, 0
         for ref, piece in iter(sorted(pieces.items())):
             tmp_moves = []
-            for potential_move in piece.valid_moves:
-                [up, right] = potential_move[:2]
+            for up, right in self.__candidate_moves(piece):
                 try:
                     theoretical_move = Move(piece, up, right, occupied, our_team,
-                                            their_team, theoretical_move=True)
+                                            their_team, theoretical_move=True,
+                                            bitboards=self.bitboards,
+                                            squares=self.board.squares,
+                                            position_key=self.zobrist_key)
                     if theoretical_move.possible:
                         tmp_moves.append(theoretical_move)
                         cnt += 1
                 except KeyError:
                     pass
-                finally:
-                    del theoretical_move
 
             if len(tmp_moves) > 0:
                 all_possible_moves[ref] = tmp_moves
+        return all_possible_moves, cnt
 
-        if list_moves:
-            print('\nPossible moves:')
-            for ref, moves in iter(sorted(all_possible_moves.items())):
-                piece = self.get_piece(ref)
-                piece_text = "{0} in {1} to".format(piece.name, piece.cell_ref).rjust(17)
-                possible_destinations = sorted([pos_to_cell_ref(obj.new_pos) for obj in moves])
-                print("{0}:  {1}".format(piece_text, ', '.join(possible_destinations)))
 
+    def __pin_aware_moves(self, occupied, our_team, their_team, pieces):
+        """
+        Moves for each of the pieces from legal_moves, as prevalidated
+        move objects.
+        """
+        team = next(iter(pieces.values())).team
+        records = (self.generate_moves(team) if pieces is our_team else
+                   self.__legal_move_records(team, pieces))
+        all_possible_moves, cnt = {}, 0
+        for record in records:
+            move = record.to_move(self, occupied, our_team, their_team)
+            all_possible_moves.setdefault(record.piece.ref, []).append(move)
+            cnt += 1
         return all_possible_moves, cnt
 
 
+    def generate_moves(self, team, mode=PIN_AWARE):
+        """
+        All possible moves for team as a list of MoveRecord (much lighter
+        than the move objects from get_all_possible_moves), for
+        searching etc. Cached per position.
+        """
+        cache_key = (self.zobrist_key, team, 'records', mode)
+        records = self.cache.get(cache_key)
+        if records is None:
+            our_team = {ref: piece for ref, piece in self.pieces.items()
+                        if piece.team == team and not piece.taken}
+            if mode == Game.PIN_AWARE and self.bitboards:
+                records = self.__legal_move_records(team, our_team)
+            else:
+                current_team = self.current_team
+                moves, _ = self.get_all_possible_moves(team=team, mode=mode)
+                self.current_team = current_team
+                records = [MoveRecord(move.piece, pos_to_square(move.new_pos), move.take)
+                           for ref, piece_moves in sorted(moves.items()) for move in piece_moves]
+            self.cache.put(cache_key, records)
+        if instrumentation.enabled:
+            instrumentation.count_moves('generate_moves', len(records))
+        return records
+
+
+    def __legal_move_records(self, team, pieces):
+        return [MoveRecord(pieces[ref], target, take)
+                for ref, moves in sorted(legal_moves(self, team, pieces).items())
+                for target, take in moves]
+
+
+    def __candidate_moves(self, piece):
+        """
+        The [up, right] moves worth validating for a piece. With bitboards
+        these come from the precomputed attack tables, so moves off the
+        board, onto our own team or through another piece are never tried.
+        """
+        if not self.bitboards:
+            return [potential_move[:2] for potential_move in piece.valid_moves]
+
+        square = pos_to_square(piece.pos)
+        targets = destinations(piece.name, piece.team, square, self.bitboards.teams[piece.team],
+                               self.bitboards.occupied, first_move=(piece.move_cnt == 0))
+        return [[target // 8 - square // 8, target % 8 - square % 8] for target in targets]
+
+
     def get_piece(self, piece_ref):
         """
         Takes a piece_ref e.g. 'wp1' and returns the corresponding piece object
@@ -403,26 +822,35 @@ class Game(object):
             return None
 
 
-def main():
+def main(engine_team=None, level=1):
     """
-    Main entry point for program
+    Main entry point for program, to play the engine give the team it
+    plays and its level e.g. python3 game.py black 2
     """
     game = Game()  # create game object as new instance of Game class
+    if engine_team:
+        from ponder import Ponderer  # imports chess_engine, which imports this module
+        game.ponderer = Ponderer(engine_team, level)
 
     # add set up func for 1/2 player options etc
     print(MOVE_INSTRUCTIONS)
     # _ = input('\nPress enter to continue...')
 
-    while not game.checkmate:
-        game.take_turn('white')
-        game.take_turn('black')
+    while not (game.checkmate or game.draw or game.winner):
+        team = game.team_to_move
+        if team == engine_team:
+            move = game.ponderer.engine_move(game)
+            print('{0} moves {1} to {2}'.format(team, move.piece.cell_ref, move.new_cell_ref))
+            game.take_turn(team, move=move)
+        else:
+            game.take_turn(team)
 
     # pause         
     _ = input('\nPress enter to quit')
 
 
 if __name__ == '__main__':
-    main()
+    main(*[int(arg) if arg.isdigit() else arg for arg in sys.argv[1:3]])
 
 
     #  N O T E S :
@@ -436,4 +864,3 @@ if __name__ == '__main__':
     #        all possible moves had been pre-loaded (then just get moves for the
     #        piece they select) e.g.:
     #        http://stackoverflow.com/questions/7180914/pause-resume-a-python-script-in-middle
-    #    - LOGGING needs to be fully written (lazy implementation at present)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Append-only binary log of games. Each move is one fixed-size record
+(game id, ply, from square, to square, flags, zobrist key after the move)
+and each game starts with a record holding the FEN it started from, so
+logging costs a few bytes per move however long the game. Records are
+buffered and written whole, so several processes can append to the same
+file. Run as a script to decode a log back into PGN, e.g.
+python3 game_log.py log.bin
+"""
+import atexit
+import mmap
+import os
+import struct
+import sys
+from random import getrandbits
+from utils import LOG_FILE_PATH
+
+# game id, ply (or FEN length for a START record), from, to, flags, key
+RECORD = struct.Struct('<QHBBBxQ')
+START, TAKE, CHECK, CHECKMATE = 1, 2, 4, 8
+FLUSH_BYTES = 64 * 1024
+
+
+class GameLog(object):
+    """
+    Buffered writer appending game records to the file at path.
+    """
+
+
+    def __init__(self, path=LOG_FILE_PATH, flush_bytes=FLUSH_BYTES):
+        self.path = path
+        self.flush_bytes = flush_bytes
+        self.buffer = bytearray()
+        self.file_no = None
+        atexit.register(self.close)
+
+
+    def start_game(self, fen_string):
+        """
+        Record the position a game starts from, returns the game id to
+        log its moves against.
+        """
+        game_id = getrandbits(64)  # 32 bits would clash within some tens of thousands of games
+        fen_bytes = fen_string.encode('ascii')
+        self.buffer += RECORD.pack(game_id, len(fen_bytes), 0, 0, START, 0)
+        # the FEN follows in as many (zero padded) records as needed
+        self.buffer += fen_bytes.ljust(-(-len(fen_bytes) // RECORD.size) * RECORD.size, b'\0')
+        return game_id
+
+
+    def log_move(self, game_id, ply, from_square, to_square, zobrist_key,
+                 take=False, check=False, checkmate=False):
+        flags = (TAKE if take else 0) | (CHECK if check else 0) | (CHECKMATE if checkmate else 0)
+        self.buffer += RECORD.pack(game_id, ply, from_square, to_square, flags, zobrist_key)
+        if len(self.buffer) >= self.flush_bytes:
+            self.flush()
+
+
+    def flush(self):
+        """
+        Append the buffered records to the file (in a single write).
+        """
+        if not self.buffer:
+            return
+        if self.file_no is None:
+            self.file_no = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        os.write(self.file_no, bytes(self.buffer))
+        del self.buffer[:]
+
+
+    def close(self):
+        self.flush()
+        if self.file_no is not None:
+            os.close(self.file_no)
+            self.file_no = None
+
+
+__shared_logs = {}
+
+
+def shared_log(path=None):
+    """
+    The GameLog for path (default LOG_FILE_PATH) shared by every game in
+    this process.
+    """
+    path = path or LOG_FILE_PATH
+    if path not in __shared_logs:
+        __shared_logs[path] = GameLog(path)
+    return __shared_logs[path]
+
+
+def read_records(path=LOG_FILE_PATH):
+    """
+    Generator of (game_id, ply, from_square, to_square, flags, zobrist_key)
+    for each move in the log, and (game_id, 0, fen, None, START, 0) for the
+    start of each game. The file is memory mapped rather than read in.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as file_obj:
+        with mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+            while offset + RECORD.size <= len(data):
+                game_id, ply, from_square, to_square, flags, key = RECORD.unpack_from(data, offset)
+                offset += RECORD.size
+                if flags & START:
+                    fen_string = data[offset:offset + ply].decode('ascii')
+                    offset += -(-ply // RECORD.size) * RECORD.size
+                    yield game_id, 0, fen_string, None, START, 0
+                else:
+                    yield game_id, ply, from_square, to_square, flags, key
+
+
+def read_games(path=LOG_FILE_PATH):
+    """
+    The logged games as a list of (game_id, start FEN, [(from_square,
+    to_square), ...]) in the order they were started. Every START record
+    begins a new game, should an id come round again its moves go to the
+    latest game started with it.
+    """
+    games, latest = [], {}  # latest: game id => the last game started with it
+    for game_id, ply, from_square, to_square, flags, _ in read_records(path):
+        if flags & START:
+            latest[game_id] = (game_id, from_square, [])
+            games.append(latest[game_id])
+        elif game_id in latest:
+            latest[game_id][2].append((from_square, to_square))
+    return games
+
+
+def replay_games(path=LOG_FILE_PATH):
+    """
+    Generator of (game_id, game) with each logged game played through again.
+    """
+    from game import Game
+    for game_id, fen_string, moves in read_games(path):
+        game = Game.from_fen(fen_string, default_logging=False)
+        for from_square, to_square in moves:
+            piece_ref = game.board.squares[from_square]
+            game.make_move([move for move in game.generate_moves(game.team_to_move)
+                            if move.piece.ref == piece_ref and move.square == to_square][0])
+        yield game_id, game
+
+
+def main(path=LOG_FILE_PATH, out=sys.stdout):
+    """
+    Write each game in the log to out as PGN.
+    """
+    from pgn import write_game
+    for game_id, game in replay_games(path):
+        write_game(game, out, {'Event': 'Logged game {0:016x}'.format(game_id)})
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else LOG_FILE_PATH)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Opt-in counters for the move validation hot path: calls and time for
+each validation step, moves allowed / rejected (by the step rejecting
+them) and moves found per get_all_possible_moves / generate_moves call.
+Nothing is counted until enable() is called, the callers check the
+module level flag enabled once per move before doing any of the work.
+Results can be printed with report() or saved with dump_stats() to load
+into pstats like a cProfile run. Run as a script to instrument perft
+with every move validated, e.g.
+python3 instrumentation.py 2 validation.prof
+"""
+import marshal
+import sys
+from collections import defaultdict
+from time import perf_counter
+
+enabled = False
+
+step_calls = defaultdict(int)  # validation step class => calls to check
+step_time = defaultdict(float)  # validation step class => seconds, including nested moves
+step_own_time = defaultdict(float)  # as step_time less time in nested validation steps
+outcomes = defaultdict(int)  # 'allowed' / 'rejected by <step>' => moves
+# 'get_all_possible_moves' / 'generate_moves' => [calls, moves, most moves in a call]
+move_counts = defaultdict(lambda: [0, 0, 0])
+__nested_time = []  # time spent in steps run inside the step running at each level
+
+
+def enable(reset_counts=True):
+    global enabled
+    if reset_counts:
+        reset()
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    for counts in (step_calls, step_time, step_own_time, outcomes, move_counts):
+        counts.clear()
+
+
+def run_steps(move_obj, validation_steps):
+    """
+    Move.__check_move while enabled: run the validation steps (classes)
+    for move_obj in turn (stopping at the first to fail) counting and
+    timing each, returns (is valid, invalid reason).
+    """
+    for step_class in validation_steps:
+        __nested_time.append(0.0)
+        start = perf_counter()
+        invalid_reason = step_class.check(move_obj)
+        elapsed = perf_counter() - start
+        step_calls[step_class] += 1
+        step_time[step_class] += elapsed
+        step_own_time[step_class] += elapsed - __nested_time.pop()
+        if __nested_time:
+            __nested_time[-1] += elapsed
+        if invalid_reason is not None:
+            outcomes['rejected by ' + step_class.__name__] += 1
+            return False, invalid_reason
+    outcomes['allowed'] += 1
+    return True, None
+
+
+def count_moves(source, cnt):
+    """
+    Record a call to source (e.g. 'get_all_possible_moves') finding cnt moves.
+    """
+    counts = move_counts[source]
+    counts[0] += 1
+    counts[1] += cnt
+    counts[2] = max(counts[2], cnt)
+
+
+def stats():
+    """
+    Step timings in the form of pstats.Stats.stats: (file, line, function)
+    => (primitive calls, calls, own time, cumulative time, callers).
+    """
+    found = {}
+    for step_class, calls in step_calls.items():
+        code = step_class.check.__code__
+        found[(code.co_filename, code.co_firstlineno, step_class.__name__ + '.check')] = \
+            (calls, calls, step_own_time[step_class], step_time[step_class], {})
+    return found
+
+
+def dump_stats(path):
+    """
+    Save the step timings in the format cProfile uses, to read with
+    pstats.Stats(path).
+    """
+    with open(path, 'wb') as stats_file:
+        marshal.dump(stats(), stats_file)
+
+
+def report(print_func=print):
+    """
+    Print tables of the step timings, move outcomes and moves per call.
+    """
+    print_func('{0:<20} {1:>9} {2:>10} {3:>10} {4:>9}'.format(
+        'validation step', 'calls', 'total s', 'own s', 'own us'))
+    for step_class, calls in sorted(step_calls.items(), key=lambda item: -step_time[item[0]]):
+        print_func('{0:<20} {1:>9} {2:>10.3f} {3:>10.3f} {4:>9.1f}'.format(
+            step_class.__name__, calls, step_time[step_class], step_own_time[step_class],
+            step_own_time[step_class] / calls * 1e6))
+
+    print_func('\n{0:<32} {1:>9}'.format('moves', 'count'))
+    for outcome, cnt in sorted(outcomes.items(), key=lambda item: -item[1]):
+        print_func('{0:<32} {1:>9}'.format(outcome, cnt))
+
+    print_func('\n{0:<24} {1:>9} {2:>9} {3:>9} {4:>9}'.format(
+        'moves found by', 'calls', 'moves', 'per call', 'most'))
+    for source, (calls, cnt, most) in sorted(move_counts.items()):
+        print_func('{0:<24} {1:>9} {2:>9} {3:>9.1f} {4:>9}'.format(
+            source, calls, cnt, cnt / calls, most))
+
+
+def main(depth=2, stats_path=None):
+    """
+    Instrument perft (validating every move) from the start position.
+    """
+    # the counters the game updates, not __main__'s copy when run as a script
+    import instrumentation
+    from game import Game
+    from perft import perft
+    instrumentation.enable()
+    try:
+        perft(Game(default_logging=False), depth, mode=Game.VALIDATE_EACH_MOVE)
+    finally:
+        instrumentation.disable()
+    instrumentation.report()
+    if stats_path:
+        instrumentation.dump_stats(stats_path)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2, sys.argv[2] if len(sys.argv) > 2 else None)
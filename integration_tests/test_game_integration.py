@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 import unittest
+from random import Random
 from game import Game
+from bitboard import Bitboards
+import chess_engine
 
 class TestGame(unittest.TestCase):
 
@@ -17,7 +20,7 @@ class TestGame(unittest.TestCase):
     def test_full_game(self):
         self.helper_setup_checkmate()
         self.assertTrue(self.game.checkmate)
-        self.assertTrue(self.game.current_team, "white")
+        self.assertEqual(self.game.current_team, "black")
 
 
     def test_list_moves_for_pawn_first_move(self):
@@ -58,10 +61,49 @@ class TestGame(unittest.TestCase):
         self.assertEqual(found_cell_refs, expected_cell_refs)
 
 
+    def test_make_and_unmake_moves(self):
+        rnd = Random(11)
+        self.game.current_team = 'white'
+        start_state = self.helper_state()
+        for _ in range(3):
+            for _ in range(30):
+                moves, cnt = self.game.get_all_possible_moves(team=self.game.current_team,
+                                                              mode=Game.PIN_AWARE)
+                if cnt == 0:
+                    break
+                self.game.make_move(rnd.choice([mv for mvs in moves.values() for mv in mvs]))
+                self.assertEqual(self.game.bitboards.__dict__,
+                                 Bitboards(self.game.board.positions).__dict__)
+                for ref, square in self.game.piece_squares.items():
+                    self.assertEqual(self.game.board.squares[square], ref)
+                self.assertEqual(len(self.game.piece_squares),
+                                 len([ref for ref in self.game.board.squares if ref]))
+            while self.game.undo_stack:
+                self.game.unmake_move()
+            self.assertEqual(self.helper_state(), start_state)
+
+
+    def test_pick_move_leaves_game_unchanged(self):
+        self.helper_setup_check()
+        self.game.current_team = 'white'
+        start_state = self.helper_state()
+        move = chess_engine.pick_move(self.game, 'white', 2)
+        self.assertEqual(move.new_cell_ref, 'G3')
+        self.assertEqual(self.helper_state(), start_state)
+
+
     # ---------------------------------------------------------------------------------------
     # -------------------------   H E L P E R   F U N C T I O N S   -------------------------
     # ---------------------------------------------------------------------------------------
 
+    def helper_state(self):
+        pieces = sorted((ref, p.pos, p.move_cnt, p.taken, p.last_to_move)
+                        for ref, p in self.game.pieces.items())
+        return (pieces, str(self.game.board.positions), str(self.game.board.printable_positions),
+                self.game.board.squares[:], sorted(self.game.piece_squares.items()),
+                self.game.current_team, self.game.turns, self.game.last_piece_to_move)
+
+
     def helper_setup_check(self):
         # set up game to required position...
         self.game.take_turn('white', 'a2a4')
@@ -73,9 +115,10 @@ class TestGame(unittest.TestCase):
 
 
     def helper_setup_checkmate(self):
-        self.helper_setup_check()
-        self.game.take_turn('white', 'g2g3')
-        self.game.take_turn('black', 'h4g3')
+        self.game.take_turn('white', 'f2f3')
+        self.game.take_turn('black', 'e7e5')
+        self.game.take_turn('white', 'g2g4')
+        self.game.take_turn('black', 'd8h4')
 
 
 if __name__ == "__main__":
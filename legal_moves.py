@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Pin and check aware move generation. Works out the pieces giving check
+and the pieces pinned to the king once per position, then keeps only
+the candidate moves from the attack tables that pass a few cheap ray
+tests, rather than validating each move against every opposition piece.
+"""
+from attack_tables import SQUARE_BITS, BETWEEN, ORTHOGONAL_LINE, DIAGONAL_LINE, destinations
+from bitboard import iter_squares, lowest_square
+from move_validation.validate_conditions import en_passant_failure
+from utils import WRONG_ENTRY_POINT_MSG
+
+ALL_SQUARES = (1 << 64) - 1
+
+
+def other_team(team):
+    return 'black' if team == 'white' else 'white'
+
+
+def king_danger(bitboards, team):
+    """
+    For the king of team get its square, a bitboard of the pieces giving
+    check, the squares a non-king move must land on to deal with the
+    check(s) and a dict of pinned square => squares it may still move to.
+    """
+    king_square = bitboards.king_square(team)
+    if king_square < 0:
+        return king_square, 0, ALL_SQUARES, {}
+
+    their_team = other_team(team)
+    their_pieces = bitboards.pieces[their_team]
+    occupied, own = bitboards.occupied, bitboards.teams[team]
+    checkers = bitboards.attackers(king_square, their_team)
+
+    if not checkers:
+        check_mask = ALL_SQUARES
+    elif checkers & (checkers - 1):
+        check_mask = 0  # double check, only the king can move
+    else:
+        checker = lowest_square(checkers)
+        check_mask = checkers | BETWEEN[checker][king_square]
+
+    pins = {}
+    straight = their_pieces['rook'] | their_pieces['queen']
+    diagonal = their_pieces['bishop'] | their_pieces['queen']
+    for sliders, lines in [[straight, ORTHOGONAL_LINE], [diagonal, DIAGONAL_LINE]]:
+        for slider in iter_squares(sliders):
+            if not lines[slider][king_square]:
+                continue
+            between = BETWEEN[slider][king_square] & occupied
+            # exactly one piece in the way and it is ours
+            if between and not between & (between - 1) and between & own:
+                pins[lowest_square(between)] = BETWEEN[slider][king_square] | SQUARE_BITS[slider]
+
+    return king_square, checkers, check_mask, pins
+
+
+def in_check(bitboards, team):
+    king_square = bitboards.king_square(team)
+    return king_square >= 0 and bitboards.is_attacked(king_square, other_team(team))
+
+
+def __pawn_diagonal_allowed(game, piece, target, their_bitboard):
+    """
+    Pawns can only move diagonally when taking, or en passant.
+    """
+    if their_bitboard & SQUARE_BITS[target]:
+        return True
+    # the pawn to take en passant is alongside, on the row the pawn starts on
+    target_ref = game.board.squares[target - piece.forward * 8]
+    if not target_ref:
+        return False
+    target_piece = game.get_piece(target_ref)
+    return (target_piece.team != piece.team and target_piece.name == 'pawn' and
+            en_passant_failure(target_piece) is None)
+
+
+def legal_moves(game, team, pieces):
+    """
+    Legal destinations for each of the pieces (a dict of piece_ref =>
+    piece, all in team) as a dict of piece_ref => [(square, take), ...].
+    Requires the game board to be keeping bitboards.
+    """
+    bitboards = game.bitboards
+    occupied, own = bitboards.occupied, bitboards.teams[team]
+    their_team = other_team(team)
+    their_bitboard = bitboards.teams[their_team]
+    king_square, checkers, check_mask, pins = king_danger(bitboards, team)
+
+    found = {}
+    for ref, piece in pieces.items():
+        square = game.piece_squares[ref]
+        targets = destinations(piece.name, team, square, own, occupied,
+                               first_move=(piece.move_cnt == 0))
+        moves = []
+
+        if piece.name == 'king':
+            # look through the king, so it cannot step back along a line of attack
+            without_king = occupied & ~SQUARE_BITS[square]
+            for target in targets:
+                target_bit = SQUARE_BITS[target]
+                if not bitboards.attackers(target, their_team, without_king,
+                                           excluded=target_bit & their_bitboard):
+                    moves.append((target, bool(their_bitboard & target_bit)))
+        else:
+            allowed = check_mask & pins.get(square, ALL_SQUARES)
+            for target in targets:
+                target_bit = SQUARE_BITS[target]
+                if not allowed & target_bit:
+                    continue
+                if (piece.name == 'pawn' and (target - square) % 8 and
+                        not __pawn_diagonal_allowed(game, piece, target, their_bitboard)):
+                    continue
+                moves.append((target, bool(their_bitboard & target_bit)))
+
+        if moves:
+            found[ref] = moves
+    return found
+
+
+if __name__ == '__main__':
+    print(WRONG_ENTRY_POINT_MSG)
@@ -3,6 +3,9 @@
 Called from python_chess.game
 """
 from utils import (pos_to_cell_ref, col_no_to_letter, shout, debug, DebugLevel, WRONG_ENTRY_POINT_MSG)
+import instrumentation
+import utils
+from move_validation import registry
 
 
 class Move(object):
@@ -13,10 +16,18 @@ class Move(object):
 
 
     def __init__(self, piece, up, right, occupied, our_team, their_team,
-                 theoretical_move=False, stop_recursion=False):
+                 theoretical_move=False, stop_recursion=False, bitboards=None,
+                 prevalidated=False, position_key=None, squares=None):
         """
         Define move attributes, determine if move is possible and the 
         outcomes resulting from the move or an invalid_reason.
+        When bitboards (in step with occupied etc.) are supplied the
+        validation steps use them for occupancy, path and attack checks.
+        Pieces are looked up by square in squares (the board's list of
+        piece_refs for squares 0 to 63) when supplied.
+        Validation is skipped for prevalidated moves (already known to
+        be legal, the caller sets take). The position_key is the game's
+        zobrist key before the move, used to identify the move.
         """
         self.piece = piece  # store piece object against move
         self.up = up
@@ -31,24 +42,27 @@ class Move(object):
         self.our_team = our_team
         self.their_team = their_team
 
+        self.bitboards = bitboards
+        self.squares = squares
+        self.position_key = position_key
+
         self.theoretical_move = theoretical_move
         self.stop_recursion = stop_recursion
 
-        # REVIEW - convert to props if need to save ram (used twice so keeping for CPU for now)
-        self.our_team_cells = [our_team[piece_ref].pos for piece_ref in our_team]
-        self.their_team_cells = [their_team[piece_ref].pos for piece_ref in their_team]
+        # built on first use (not needed at all when validating with bitboards)
+        self._our_team_cells, self._their_team_cells = None, None
 
         # initialise variables to be set later...
         self.take, self.check, self.checkmate = False, False, False
 
         # validate move
+        if prevalidated:
+            self.possible, self.invalid_reason = True, None
+            return
         self.possible, self.invalid_reason = self.__check_move()
 
-        if not self.possible:
-            debug('move not allowed', print_func=shout,
-                  filter_func=lambda: not self.theoretical_move)
-        else:
-            debug('move allowed', print_func=shout,
+        if __debug__ and utils.debugging:
+            debug('move allowed' if self.possible else 'move not allowed', print_func=shout,
                   filter_func=lambda: not self.theoretical_move)
 
 
@@ -88,6 +102,19 @@ class Move(object):
     def new_cell_ref(self):
         return pos_to_cell_ref(self.new_pos)
 
+    @property
+    def our_team_cells(self):
+        if self._our_team_cells is None:
+            self._our_team_cells = [self.our_team[piece_ref].pos for piece_ref in self.our_team]
+        return self._our_team_cells
+
+    @property
+    def their_team_cells(self):
+        if self._their_team_cells is None:
+            self._their_team_cells = [self.their_team[piece_ref].pos
+                                      for piece_ref in self.their_team]
+        return self._their_team_cells
+
     @property
     def is_theoretical_move(self):
         return self.theoretical_move
@@ -95,42 +122,87 @@ class Move(object):
     @property
     def _id(self):
         """
-        Generate unique moveID based on piece_ref being moved and position of every other piece.
+        Generate unique moveID based on piece_ref being moved and position of every other piece
+        (given by the position_key when known), always a tuple of (position, piece_ref, cell_ref,
+        new_cell_ref) where position is the key or a tuple of (ref, cell_ref) for the others.
         """
-        _id = ('mv:' + self.piece.ref + "-" + str(self.row * self.col_no) + "-" +
-               str(self.new_row * self.new_col_no) + ",oth:")
-        for ref, piece in self.their_team.items():
-            if not piece.taken and ref != self.piece.ref:
-                _id = '+'.join([_id, (ref + '-' + str(piece.row * piece.col_no))])
-        return _id
+        if self.position_key is not None:
+            position = self.position_key
+        else:
+            position = tuple((ref, piece.cell_ref) for ref, piece in self.their_team.items()
+                             if not piece.taken and ref != self.piece.ref)
+        return position, self.piece.ref, self.cell_ref, self.new_cell_ref
 
 
     def __check_move(self):
         """
         Run checks to see whether a move is possible.
         """
-        # review - think about whether we could / should discover all
-        #          BaseMoveValidationStep subclasses dynamically
-        from move_validation.validate_piece import ValidatePiece
-        from move_validation.validate_boundaries import ValidateBoundaries
-        from move_validation.validate_path import ValidatePath
-        from move_validation.validate_conditions import ValidateConditions
-        from move_validation.validate_king import ValidateKing
-
-        validation_steps = [ValidatePiece(self),
-                            ValidateBoundaries(self),
-                            ValidatePath(self),
-                            ValidateConditions(self),
-                            ValidateKing(self)]
-
-        for validation_step in validation_steps:
-            validation_step.perform_check()
-            debug("{0} - is valid: {1}".format(validation_step.__doc__, validation_step.is_valid),
-                  level = DebugLevel.low, filter_func=lambda: not self.theoretical_move)
-            if not validation_step.is_valid:
-                # stop at first invalid reason for performance (most expensive checks last)
-                return validation_step.is_valid, validation_step.invalid_reason
-        return True, None
+        if instrumentation.enabled:
+            return instrumentation.run_steps(self, registry.pipeline(self.piece))
+        if __debug__ and utils.debugging:
+            return registry.validate(self, self.__debug_step)
+        return registry.validate(self)
+
+
+    def __debug_step(self, validation_step, invalid_reason):
+        debug("{0} - is valid: {1}", level=DebugLevel.low,
+              filter_func=lambda: not self.theoretical_move,
+              args=(validation_step.__doc__, invalid_reason is None))
+
+
+class MoveRecord(object):
+    """
+    Lightweight record of a move already known to be legal (the piece,
+    the square it moves to and whether it takes), used when generating
+    moves in bulk e.g. for searching. Use to_move for a full Move object.
+    """
+    __slots__ = ('piece', 'square', 'take')
+
+
+    def __init__(self, piece, square, take=False):
+        self.piece = piece
+        self.square = square
+        self.take = take
+
+    @property
+    def new_row(self):
+        return self.square // 8 + 1
+
+    @property
+    def new_col_no(self):
+        return self.square % 8 + 1
+
+    @property
+    def new_pos(self):
+        return [self.new_row, self.new_col_no]
+
+    @property
+    def new_col(self):
+        return col_no_to_letter(self.new_col_no)
+
+    @property
+    def new_cell_ref(self):
+        return pos_to_cell_ref(self.new_pos)
+
+
+    def to_move(self, game, occupied=None, our_team=None, their_team=None):
+        """
+        Full (prevalidated) Move object for the move in game's current
+        position, occupied etc. are worked out if not supplied.
+        """
+        if occupied is None:
+            occupied, our_team, their_team = [], {}, {}
+            for ref, piece in game.pieces.items():
+                if not piece.taken:
+                    occupied.append(piece.pos)
+                    (our_team if piece.team == self.piece.team else their_team)[ref] = piece
+        move = Move(self.piece, self.new_row - self.piece.row, self.new_col_no - self.piece.col_no,
+                    occupied, our_team, their_team, theoretical_move=True,
+                    bitboards=game.bitboards, squares=game.board.squares, prevalidated=True,
+                    position_key=game.zobrist_key)
+        move.take = self.take
+        return move
 
 
 if __name__ == '__main__':
@@ -8,6 +8,12 @@ from move import Move
 
 
 class BaseMoveValidationStep(metaclass=ABCMeta):
+    """
+    Subclasses are found by move_validation.registry, which runs their
+    check in order of cost for each move (skipping steps which do not
+    apply to the piece). An instance runs the check for one move.
+    """
+    cost = 0  # relative cost of the check, cheaper checks run first
 
 
     def __init__(self, move_obj):
@@ -24,17 +30,44 @@ class BaseMoveValidationStep(metaclass=ABCMeta):
         self._invalid_reason = "{0} - Validation not yet performed".format(self.__doc__)
 
 
+    @classmethod
     @abstractmethod
+    def check(cls, move_obj):
+        """
+        Performs the check for move_obj, keeping no state of its own
+        :return: None if the move passes, otherwise the invalid reason
+        """
+        raise NotImplementedError("This is an abstract base class")
+
+
+    @staticmethod
+    def applies_to(piece):
+        """
+        Whether the check could fail for a move of piece (or any piece of
+        the same name), steps which cannot are left out of its pipeline.
+        """
+        return True
+
+
     def perform_check(self):
         """
         Performs the check and sets up is_valid and invalid_reason properties
         :return: None
         """
-        raise NotImplementedError("This is an abstract base class")
+        invalid_reason = self.check(self.move_obj)
+        self._is_valid = invalid_reason is None
+        if invalid_reason is not None:
+            self._invalid_reason = invalid_reason
 
 
-    def debug(self, msg, debug_level=utils.DebugLevel.mid):
-        utils.debug(msg, level=debug_level, filter_func=not self.move_obj.theoretical_move)
+    @staticmethod
+    def debug(move_obj, msg, *args, debug_level=utils.DebugLevel.mid):
+        """
+        Debug message for a move actually being made (see utils.debug for
+        msg and args), callers check utils.debugging first.
+        """
+        utils.debug(msg, level=debug_level, args=args,
+                    filter_func=lambda: not move_obj.theoretical_move)
 
 
     @property
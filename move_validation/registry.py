@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+The move validation pipeline: every BaseMoveValidationStep subclass in
+the move_validation package (found on first use, so a new step only
+needs adding to the package) ordered by cost, with the steps which
+cannot fail for a piece left out of the pipeline for its moves. Run as
+a script to time validating moves through the pipeline against a new
+instance of every step per move, e.g.
+python3 -m move_validation.registry 20
+"""
+import importlib
+import inspect
+import pkgutil
+import sys
+from time import perf_counter
+
+__steps = []  # the validation step classes, cheapest first
+__pipelines = {}  # piece name => tuple of the steps to run for its moves
+
+
+def __subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from __subclasses(subclass)
+
+
+def steps():
+    """
+    All of the (concrete) validation step classes, in the order to run
+    them: by cost then name.
+    """
+    if not __steps:
+        # imported here as the steps import move, which uses this module
+        import move_validation
+        from move_validation.base_move_validation_step import BaseMoveValidationStep
+        for module_info in pkgutil.iter_modules(move_validation.__path__):
+            importlib.import_module('move_validation.' + module_info.name)
+        found = set(step for step in __subclasses(BaseMoveValidationStep)
+                    if not inspect.isabstract(step))
+        __steps.extend(sorted(found, key=lambda step: (step.cost, step.__name__)))
+    return __steps
+
+
+def pipeline(piece):
+    """
+    The validation steps to run for a move of piece, built once for
+    each kind of piece.
+    """
+    found = __pipelines.get(piece.name)
+    if found is None:
+        found = __pipelines[piece.name] = tuple(step for step in steps() if step.applies_to(piece))
+    return found
+
+
+def validate(move_obj, on_step=None):
+    """
+    Run the pipeline for move_obj stopping at the first step to fail
+    (most expensive checks last), returns (is valid, invalid reason).
+    on_step, if given, is called with each step and its invalid reason
+    (None if valid) e.g. for debugging.
+    """
+    for step in pipeline(move_obj.piece):
+        invalid_reason = step.check(move_obj)
+        if on_step is not None:
+            on_step(step, invalid_reason)
+        if invalid_reason is not None:
+            return False, invalid_reason
+    return True, None
+
+
+def benchmark(repeats=20, print_func=print):
+    """
+    Validate every candidate move (as Game.VALIDATE_EACH_MOVE tries)
+    for both teams in each of the perft positions repeats times, with a
+    new instance of every step for each move (as before the pipeline)
+    and through the pipeline. Returns the time per move for each.
+    """
+    from move import Move
+    from perft import POSITIONS, position
+
+    moves = []
+    for name in sorted(POSITIONS):
+        game, _ = position(name)
+        pieces = [piece for piece in game.pieces.values() if not piece.taken]
+        occupied = [piece.pos for piece in pieces]
+        for team in ('white', 'black'):
+            our_team = {piece.ref: piece for piece in pieces if piece.team == team}
+            their_team = {piece.ref: piece for piece in pieces if piece.team != team}
+            for piece in our_team.values():
+                moves.extend(Move(piece, up, right, occupied, our_team, their_team,
+                                  theoretical_move=True, bitboards=game.bitboards,
+                                  squares=game.board.squares, prevalidated=True)
+                             for up, right in [valid_move[:2] for valid_move in piece.valid_moves])
+
+    def every_step(move_obj):
+        for step in [step_class(move_obj) for step_class in steps()]:
+            step.perform_check()
+            if not step.is_valid:
+                return False, step.invalid_reason
+        return True, None
+
+    timings = []
+    for label, run in [('new steps per move', every_step), ('pipeline', validate)]:
+        start = perf_counter()
+        for _ in range(repeats):
+            for move_obj in moves:
+                run(move_obj)
+        per_move = (perf_counter() - start) / (repeats * len(moves))
+        timings.append(per_move)
+        print_func('{0:<20} {1:>8} moves {2:>8.2f} us per move'.format(
+            label, repeats * len(moves), per_move * 1e6))
+    print_func('speed up: {0:.2f}x'.format(timings[0] / timings[1]))
+    return timings
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -7,10 +7,10 @@ class ValidateBoundaries(BaseMoveValidationStep):
     """
     Check if move is possible within board boundaries
     """
+    cost = 2
 
 
-    def perform_check(self):
-        if self.move_obj.new_row in range(1, 9) and self.move_obj.new_col_no in range(1, 9):
-            self._is_valid = True
-        else:
-            self._invalid_reason = invalid_msg['boundaries'].format(self.move_obj.new_cell_ref)
+    @classmethod
+    def check(cls, move_obj):
+        if not (1 <= move_obj.new_row <= 8 and 1 <= move_obj.new_col_no <= 8):
+            return invalid_msg['boundaries'].format(move_obj.new_cell_ref)
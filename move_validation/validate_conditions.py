@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from move_validation.base_move_validation_step import BaseMoveValidationStep, utils
 from literals import INVALID_MOVE_MESSAGES as invalid_msg, DEFAULT_START_POSITIONS
+from utils import pos_to_square
 
 
 class ValidateConditions(BaseMoveValidationStep):
@@ -8,85 +9,117 @@ class ValidateConditions(BaseMoveValidationStep):
     Check if all conditions stored for the move are satisfied e.g. a pawn is only
     able to move diagonally if taking.
     """
+    cost = 4
 
 
-    def perform_check(self):
-        potential_moves = [mv for mv in self.move_obj.piece.valid_moves if mv[:2] == self.move_obj.move[:2]]
+    @staticmethod
+    def applies_to(piece):
+        """
+        Only pieces with conditional moves (pawns) can fail this check.
+        """
+        return any(ValidateConditions._move_has_a_condition(move) for move in piece.valid_moves)
+
+
+    @classmethod
+    def check(cls, move_obj):
+        potential_moves = [mv for mv in move_obj.piece.valid_moves if mv[:2] == move_obj.move[:2]]
+        invalid_reason = invalid_msg['piece']
 
         # attempt to find on valid move where there is condition or the condition is satisfied
         for move in potential_moves:
 
-            if self._move_has_a_condition(move):
+            if cls._move_has_a_condition(move):
                 condition = move[2]
-                self.debug('Checking condition: {0}'.format(condition), debug_level=utils.DebugLevel.low)
+                if __debug__ and utils.debugging:
+                    cls.debug(move_obj, 'Checking condition: {0}', condition,
+                              debug_level=utils.DebugLevel.low)
 
-                if self._condition_is_valid(condition):
-                    self._is_valid = True
-                    return
-                else:
-                    self._invalid_reason = invalid_msg["cond_{0}".format(condition)]
-                    self._is_valid = False
+                if cls._condition_is_valid(move_obj, condition):
+                    return None
+                invalid_reason = invalid_msg["cond_{0}".format(condition)]
 
             else:
-                self._is_valid = True
-                return
+                return None
+        return invalid_reason
 
 
-    def _condition_is_valid(self, condition):
-        condition_outcomes = {
-            'on_first': self._on_first_applies,
-            'on_take': self._on_take_applies,
-            'en_passant': self._en_passant_applies
+    @classmethod
+    def _condition_is_valid(cls, move_obj, condition):
+        # only the condition asked for is worked out
+        condition_checks = {
+            'on_first': cls._on_first_applies,
+            'on_take': cls._on_take_applies,
+            'en_passant': cls._en_passant_applies
         }
-        return condition_outcomes[condition]
+        return condition_checks[condition](move_obj)
 
 
-    @property
-    def _on_first_applies(self):
-        return self.move_obj.piece.move_cnt == 0
+    @staticmethod
+    def _on_first_applies(move_obj):
+        return move_obj.piece.move_cnt == 0
 
 
-    @property
-    def _on_take_applies(self):
-        return self.move_obj.new_pos in [pos for pos in self.move_obj.occupied]
+    @staticmethod
+    def _on_take_applies(move_obj):
+        if move_obj.bitboards:
+            return move_obj.bitboards.is_occupied(move_obj.new_pos)
+        return move_obj.new_pos in [pos for pos in move_obj.occupied]
 
 
-    @property
-    def _en_passant_applies(self):
+    @classmethod
+    def _en_passant_applies(cls, move_obj):
 
         #set up
-        target_pos = self.move_obj.piece.get_offset_pos(0, self.move_obj.right)
+        target_pos = move_obj.piece.get_offset_pos(0, move_obj.right)
         target_piece = None
-        for ref, piece in self.move_obj.their_team.items():
-            if piece.pos == target_pos and piece.name == "pawn":
-                target_piece = piece
+        if move_obj.squares is not None:
+            if 1 <= target_pos[1] <= 8:
+                piece = move_obj.their_team.get(move_obj.squares[pos_to_square(target_pos)])
+                if piece and piece.name == "pawn":
+                    target_piece = piece
+        else:
+            for ref, piece in move_obj.their_team.items():
+                if piece.pos == target_pos and piece.name == "pawn":
+                    target_piece = piece
 
         # an opponent pawn is directly to your side (in the direction you are trying to move)...
         if not target_piece:
-            self.debug('En Passant condition - no pawn in required position')
-            return False
-
-        # and was the last to move...
-        if not target_piece.last_to_move:
-            self.debug('En Passant condition - the opposition pawn was not the not last to move')
+            if __debug__ and utils.debugging:
+                cls.debug(move_obj, 'En Passant condition - no pawn in required position')
             return False
 
-        # and it was on their first move...
-        if target_piece.move_cnt > 1:
-            self.debug('En Passant condition - the opposition pawn had taken more than one move')
-            return False
-
-        # and is two squares up/down from where they started...
-        row_before_last_move = target_piece.row - (2 * target_piece.forward)
-        original_contents_of_cell = DEFAULT_START_POSITIONS[row_before_last_move][target_piece.col]
-        if original_contents_of_cell != target_piece.ref:
-            self.debug('En Passant condition - the opposition pawn moved two spaces forward')
+        failure = en_passant_failure(target_piece)
+        if failure:
+            if __debug__ and utils.debugging:
+                cls.debug(move_obj, failure)
             return False
 
         return True
 
 
-
     @staticmethod
     def _move_has_a_condition(move):
         return len(move) > 2
+
+
+def en_passant_failure(target_piece):
+    """
+    Reason an opposition pawn directly to the side of a pawn cannot be
+    taken en passant, or None if it can.
+    """
+    # the pawn was the last to move...
+    if not target_piece.last_to_move:
+        return 'En Passant condition - the opposition pawn was not the not last to move'
+
+    # and it was on their first move...
+    if target_piece.move_cnt > 1:
+        return 'En Passant condition - the opposition pawn had taken more than one move'
+
+    # and is two squares up/down from where they started...
+    row_before_last_move = target_piece.row - (2 * target_piece.forward)
+    original_contents_of_cell = DEFAULT_START_POSITIONS.get(row_before_last_move, {}).get(
+        target_piece.col)
+    if original_contents_of_cell != target_piece.ref:
+        return 'En Passant condition - the opposition pawn moved two spaces forward'
+
+    return None
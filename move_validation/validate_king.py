@@ -2,21 +2,25 @@
 from move_validation.base_move_validation_step import BaseMoveValidationStep
 from move import Move
 from literals import INVALID_MOVE_MESSAGES as invalid_msg
+from bitboard import pos_to_square, lowest_square, SQUARE_BITS
+from utils import pos_to_cell_ref
 
 
 class ValidateKing(BaseMoveValidationStep):
     """
     Check if a move would put your king in check
     """
+    cost = 5  # a single attack query with bitboards, otherwise a move for each of their pieces
 
 
-    def perform_check(self):
-        move_obj = self.move_obj
-        self._is_valid = True
-
+    @classmethod
+    def check(cls, move_obj):
         # define base case as the move object is created recursively below
         if move_obj.stop_recursion:
-            return
+            return None
+
+        if move_obj.bitboards:
+            return cls._check_with_bitboards(move_obj, move_obj.bitboards)
 
         # need to temporarily update piece object, so that all of the theoretical
         # moves checked below will recognise the new position (i.e. as if you had
@@ -25,8 +29,11 @@ class ValidateKing(BaseMoveValidationStep):
         move_obj.piece.row = move_obj.new_row
         move_obj.piece.col_no = move_obj.new_col_no
         if move_obj.take:
-            take_ref = [ref for ref in move_obj.their_team.keys()
-                        if move_obj.their_team[ref].pos == move_obj.new_pos][0]
+            if move_obj.squares is not None:
+                take_ref = move_obj.squares[pos_to_square(move_obj.new_pos)]
+            else:
+                take_ref = [ref for ref in move_obj.their_team.keys()
+                            if move_obj.their_team[ref].pos == move_obj.new_pos][0]
             taken_piece = move_obj.their_team[take_ref]
             if taken_piece.name != 'king':
                 del move_obj.their_team[take_ref]
@@ -40,6 +47,7 @@ class ValidateKing(BaseMoveValidationStep):
 
         # iterate through dictionary of their pieces creating theoretical moves
         # attempting to take king, if possible then move would put you in check.
+        invalid_reason = None
         for ref, their_piece in move_obj.their_team.items():
             up = our_king.row - their_piece.row
             right = our_king.col_no - their_piece.col_no
@@ -48,9 +56,8 @@ class ValidateKing(BaseMoveValidationStep):
                                     move_obj.their_team, move_obj.our_team,
                                     theoretical_move=True, stop_recursion=True)
             if theoretical_move.possible:
-                self._invalid_reason = invalid_msg['king'].format(their_piece.name,
-                                                                  theoretical_move.cell_ref)
-                self._is_valid = False
+                invalid_reason = invalid_msg['king'].format(their_piece.name,
+                                                            theoretical_move.cell_ref)
                 break  # cannot return here as need to revert position etc.
             del theoretical_move
 
@@ -63,3 +70,37 @@ class ValidateKing(BaseMoveValidationStep):
             if taken_piece.name != 'king':
                 # noinspection PyUnboundLocalVariable
                 move_obj.their_team[take_ref] = taken_piece
+        return invalid_reason
+
+
+    @classmethod
+    def _check_with_bitboards(cls, move_obj, bitboards):
+        """
+        Same check as above, answered with a single attack query on the
+        bitboards (adjusted for the move) rather than a theoretical move
+        for each of their pieces.
+        """
+        team = move_obj.piece.team
+        their_team = 'black' if team == 'white' else 'white'
+        old_bit = SQUARE_BITS[pos_to_square(move_obj.pos)]
+        new_bit = SQUARE_BITS[pos_to_square(move_obj.new_pos)]
+
+        if move_obj.piece.name == 'king':
+            king_square = pos_to_square(move_obj.new_pos)
+        else:
+            king_square = bitboards.king_square(team)
+            if king_square < 0:
+                return None
+
+        # a taken piece can no longer attack (kings are not removed, as above)
+        taken = new_bit & bitboards.teams[their_team] & ~bitboards.pieces[their_team]['king']
+        occupied = (bitboards.occupied & ~old_bit) | new_bit
+        attackers = bitboards.attackers(king_square, their_team, occupied, excluded=taken)
+
+        if attackers:
+            if move_obj.squares is not None:
+                their_piece = move_obj.their_team[move_obj.squares[lowest_square(attackers)]]
+            else:
+                their_piece = [piece for ref, piece in move_obj.their_team.items()
+                               if attackers & SQUARE_BITS[pos_to_square(piece.pos)]][0]
+            return invalid_msg['king'].format(their_piece.name, pos_to_cell_ref(their_piece.pos))
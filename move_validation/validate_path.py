@@ -1,19 +1,24 @@
 #!/usr/bin/env python3
-from move_validation.base_move_validation_step import BaseMoveValidationStep
+from move_validation.base_move_validation_step import BaseMoveValidationStep, utils
 from literals import INVALID_MOVE_MESSAGES as invalid_msg
 from utils import pos_to_cell_ref
+from bitboard import pos_to_square, square_to_pos, SQUARE_BITS
 
 
 class ValidatePath(BaseMoveValidationStep):
     """
     Check if move is blocked by another piece
     """
+    cost = 3
 
 
-    def perform_check(self):
+    @classmethod
+    def check(cls, move_obj):
         max_steps = 8
         current_step = 0
-        move_obj = self.move_obj
+
+        if move_obj.bitboards:
+            return cls._check_with_bitboards(move_obj, move_obj.bitboards)
 
         # take steps by taking min distance to destination after each
         # of the possible one step moves
@@ -27,29 +32,27 @@ class ValidatePath(BaseMoveValidationStep):
                     [tmp_pos[0] + up, tmp_pos[1] + right]
                     for up, right in [mv[:2] for mv in move_obj.piece.one_space_moves]
                     if tmp_pos[0] + up in range(1, 9) and tmp_pos[1] + right in range(1, 9)]
-                self.debug('Possible steps: {0}'.format(', '.join(str(i) for i in poss_steps)))
-
                 distances = [ValidatePath.distance(i, move_obj.new_pos) for i in poss_steps]
-                self.debug('Distances: {0}'.format(', '.join(str(i) for i in distances)))
-
                 correct_step = poss_steps[distances.index(min(distances))]
-                self.debug('Min dist: {0}\nCorrect step: {1}'.format(min(distances), correct_step))
+                if __debug__ and utils.debugging:
+                    cls.debug(move_obj,
+                              lambda: 'Possible steps: ' + ', '.join(str(i) for i in poss_steps))
+                    cls.debug(move_obj, lambda: 'Distances: ' + ', '.join(str(i) for i in distances))
+                    cls.debug(move_obj, 'Min dist: {0}\nCorrect step: {1}', min(distances),
+                              correct_step)
+                    cls.debug(move_obj, 'tmp_pos: {0}', correct_step)
 
                 tmp_pos = correct_step
-                self.debug('tmp_pos: {0}'.format(tmp_pos))
 
                 # check if cell on the way is occupied
                 if tmp_pos in move_obj.occupied:
                     final_step = (tmp_pos == move_obj.new_pos)
                     # if it's not the final position or they are in our team block
                     if (not final_step) or (tmp_pos in move_obj.our_team_cells):
-                        self._invalid_reason = invalid_msg['path_gen'].format(
-                            pos_to_cell_ref(tmp_pos))
-                        return
+                        return invalid_msg['path_gen'].format(pos_to_cell_ref(tmp_pos))
                     # also block if it is pawn going straight forward
                     elif (move_obj.piece.name == 'pawn') and (move_obj.right == 0):
-                        self._invalid_reason = invalid_msg['path_pawn']
-                        return
+                        return invalid_msg['path_pawn']
                     # if on final step and above two don't apply then you can take
                     elif tmp_pos == move_obj.new_pos:
                         move_obj.take = True
@@ -61,12 +64,32 @@ class ValidatePath(BaseMoveValidationStep):
         # allow for knights
         else:
             if move_obj.new_pos in move_obj.our_team_cells:
-                self._invalid_reason = invalid_msg['path_knight'].format(move_obj.new_cell_ref)
-                return
+                return invalid_msg['path_knight'].format(move_obj.new_cell_ref)
             elif move_obj.new_pos in move_obj.their_team_cells:
                 move_obj.take = True
 
-        self._is_valid = True
+
+    @classmethod
+    def _check_with_bitboards(cls, move_obj, bitboards):
+        """
+        Same check as above, answered from the bitboards instead of
+        stepping through each cell on the way.
+        """
+        new_square = pos_to_square(move_obj.new_pos)
+
+        if not move_obj.piece.allowed_to_jump:
+            blocker = bitboards.first_blocker(pos_to_square(move_obj.pos), new_square)
+            if blocker is not None:
+                return invalid_msg['path_gen'].format(pos_to_cell_ref(square_to_pos(blocker)))
+
+        new_bit = SQUARE_BITS[new_square]
+        if bitboards.occupied & new_bit:
+            if bitboards.teams[move_obj.piece.team] & new_bit:
+                msg_key = 'path_knight' if move_obj.piece.allowed_to_jump else 'path_gen'
+                return invalid_msg[msg_key].format(move_obj.new_cell_ref)
+            elif (move_obj.piece.name == 'pawn') and (move_obj.right == 0):
+                return invalid_msg['path_pawn']
+            move_obj.take = True
 
 
     @staticmethod
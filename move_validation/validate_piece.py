@@ -7,14 +7,16 @@ class ValidatePiece(BaseMoveValidationStep):
     """
     Check move against piece.valid_moves
     """
+    cost = 1  # cheap, and rejects most of the moves tried when validating every offset
+    _offsets = {}  # (name, team) => set of (up, right) in valid_moves, as Piece.moves_by_kind
 
 
-    def perform_check(self):
-        """
-        Performs the check and sets up is_valid and invalid_reason properties
-        :return: None
-        """
-        if self.move_obj.move in [move[:2] for move in self.move_obj.piece.valid_moves]:
-            self._is_valid = True
-        else:
-            self._invalid_reason = invalid_msg['piece']
+    @classmethod
+    def check(cls, move_obj):
+        piece = move_obj.piece
+        offsets = cls._offsets.get((piece.name, piece.team))
+        if offsets is None:
+            offsets = set(tuple(move[:2]) for move in piece.valid_moves)
+            cls._offsets[(piece.name, piece.team)] = offsets
+        if (move_obj.up, move_obj.right) not in offsets:
+            return invalid_msg['piece']
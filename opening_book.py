@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Opening book: the moves played from each position in the opening of a
+collection of games, stored as fixed-size entries (zobrist key, from
+square, to square, weight) sorted by key. Lookups binary search the
+memory mapped file, so a book can be shared read-only by many processes.
+Build one from a PGN file with e.g.
+python3 opening_book.py games.pgn book.bin
+"""
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left
+from collections import Counter
+from random import random as rnd
+from fen import START_FEN
+from game import Game
+import pgn
+
+ENTRY = struct.Struct('<QBBH')  # zobrist key, from square, to square, weight
+DEFAULT_BOOK_PLIES = 20
+MAX_WEIGHT = 0xFFFF
+
+
+def build_book(lines, path, max_plies=DEFAULT_BOOK_PLIES, min_count=1):
+    """
+    Write a book to path from the lines of a PGN file, taking the first
+    max_plies moves of each game and leaving out moves played fewer than
+    min_count times. Games stop counting at the first move that cannot
+    be played here (e.g. castling). Returns the number of entries.
+    """
+    counts = Counter()
+    for tags, sans in pgn.read_pgn(lines):
+        game = Game.from_fen(tags.get('FEN', START_FEN), default_logging=False)
+        for san in sans[:max_plies]:
+            try:
+                move = pgn.find_move(game, san)
+            except ValueError:
+                break
+            counts[(game.zobrist_key, game.piece_squares[move.piece.ref], move.square)] += 1
+            game.make_move(move)
+
+    entries = sorted((key, old, new, min(count, MAX_WEIGHT))
+                     for (key, old, new), count in counts.items() if count >= min_count)
+    with open(path, 'wb') as book_file:
+        for entry in entries:
+            book_file.write(ENTRY.pack(*entry))
+    return len(entries)
+
+
+class OpeningBook(object):
+    """
+    Read-only, memory mapped opening book.
+    """
+
+
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path) // ENTRY.size
+        self.data = None
+        if self.size:
+            with open(path, 'rb') as book_file:
+                self.data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __getitem__(self, i):
+        """
+        Key of the ith entry (so the book can be binary searched with bisect).
+        """
+        return ENTRY.unpack_from(self.data, i * ENTRY.size)[0]
+
+
+    def entries(self, key):
+        """
+        (from square, to square, weight) of each move in the book for key.
+        """
+        found = []
+        i = bisect_left(self, key) if self.size else 0
+        while i < self.size:
+            entry_key, old, new, weight = ENTRY.unpack_from(self.data, i * ENTRY.size)
+            if entry_key != key:
+                break
+            found.append((old, new, weight))
+            i += 1
+        return found
+
+
+    def moves(self, game, team):
+        """
+        (MoveRecord, weight) for each book move possible for team in game.
+        """
+        legal = {(game.piece_squares[move.piece.ref], move.square): move
+                 for move in game.generate_moves(team)}
+        return [(legal[(old, new)], weight) for old, new, weight in self.entries(game.zobrist_key)
+                if (old, new) in legal]
+
+
+    def pick(self, game, team):
+        """
+        A book move for team chosen at random in proportion to how often
+        it was played (None if the position is not in the book).
+        """
+        moves = self.moves(game, team)
+        if not moves:
+            return None
+        target = rnd() * sum(weight for _, weight in moves)
+        for move, weight in moves:
+            target -= weight
+            if target < 0:
+                return move
+        return moves[-1][0]
+
+
+    def close(self):
+        if self.data:
+            self.data.close()
+            self.data = None
+
+
+__open_books = {}
+
+
+def open_book(path):
+    """
+    The OpeningBook for path, opened once per process.
+    """
+    if path not in __open_books:
+        __open_books[path] = OpeningBook(path)
+    return __open_books[path]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print('usage: python3 opening_book.py games.pgn book.bin [max plies]')
+    else:
+        with open(sys.argv[1]) as pgn_file:
+            cnt = build_book(pgn_file, sys.argv[2],
+                             int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_BOOK_PLIES)
+        print('{0} book entries written to {1}'.format(cnt, sys.argv[2]))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Perft (performance test) - count every line of play to a given depth,
+to check move generation against known node counts and to time it.
+Run as a script for a benchmark of the stored positions, e.g.
+python3 perft.py 3
+"""
+import sys
+from time import perf_counter
+from game import Game
+from utils import cell_ref_to_pos, col_no_to_letter
+
+BENCHMARK_DEPTH = 3
+
+# name => (pieces by cell, prompts played to reach the position, team
+#          to move, expected node counts by depth)
+# counts follow the rules as implemented here (e.g. no castling, no
+# promotion), checked against both ways of generating moves
+POSITIONS = {
+    'start': (None, [], 'white', {1: 20, 2: 400, 3: 8902, 4: 197281}),
+    # rook and bishop pinned to the white king, black can check along the back row
+    'pins': ({'E1': 'wK', 'E2': 'wR1', 'D2': 'wB1', 'G2': 'wp7', 'B1': 'wN1',
+              'H8': 'bK', 'E8': 'bR1', 'A5': 'bB1', 'B7': 'bp2', 'A8': 'bR2'},
+             [], 'white', {1: 16, 2: 360, 3: 6606, 4: 161654}),
+    # black pawn has just moved two spaces, next to the white pawn on E5
+    'en_passant': ({'E1': 'wK', 'E5': 'wp5', 'B2': 'wp2', 'D1': 'wQ',
+                    'E8': 'bK', 'D7': 'bp4', 'F7': 'bp6', 'C8': 'bB1'},
+                   ['d7d5'], 'white', {1: 22, 2: 286, 3: 6705, 4: 81987}),
+}
+
+
+def position(name):
+    """
+    Set up a new game in one of the POSITIONS, returns (game, team to move).
+    """
+    cells, prompts, team, _ = POSITIONS[name]
+    start_pos = None
+    if cells:
+        start_pos = {row: {col_no_to_letter(col): False for col in range(1, 9)}
+                     for row in range(1, 9)}
+        for cell_ref, piece_ref in cells.items():
+            row, col = cell_ref_to_pos(cell_ref)
+            start_pos[row][col_no_to_letter(col)] = piece_ref
+    game = Game(custom_start_positions=start_pos, default_logging=False)
+    other = 'black' if team == 'white' else 'white'
+    mover = team if len(prompts) % 2 == 0 else other
+    for prompt in prompts:
+        game.take_turn(mover, prompt)
+        mover = 'black' if mover == 'white' else 'white'
+    return game, team
+
+
+def perft(game, depth, team='white', mode=Game.PIN_AWARE):
+    """
+    Number of lines of play depth moves long from the current position
+    with team to move.
+    """
+    if depth <= 0:
+        return 1
+    moves = game.generate_moves(team, mode)
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move_obj in moves:
+        game.make_move(move_obj)
+        nodes += perft(game, depth - 1, game.current_team, mode)
+        game.unmake_move()
+    return nodes
+
+
+def divide(game, depth, team='white', mode=Game.PIN_AWARE):
+    """
+    Perft split by first move, as {'e2e4': nodes, ...}, for tracking
+    down which line a wrong count comes from.
+    """
+    counts = {}
+    for move_obj in game.generate_moves(team, mode):
+        move_text = (move_obj.piece.cell_ref + move_obj.new_cell_ref).lower()
+        game.make_move(move_obj)
+        counts[move_text] = perft(game, depth - 1, game.current_team, mode)
+        game.unmake_move()
+    return counts
+
+
+def benchmark(depth=BENCHMARK_DEPTH, names=None, mode=Game.PIN_AWARE, print_func=print):
+    """
+    Run perft to depth for each position, reporting nodes per second and
+    whether the count matches the expected count. Returns a list of
+    (name, nodes, seconds, expected) tuples (expected is None if not known).
+    """
+    results = []
+    for name in names or sorted(POSITIONS):
+        game, team = position(name)
+        start = perf_counter()
+        nodes = perft(game, depth, team, mode)
+        secs = perf_counter() - start
+        expected = POSITIONS[name][3].get(depth)
+        results.append((name, nodes, secs, expected))
+
+        if expected is None:
+            verdict = 'no expected count'
+        else:
+            verdict = 'ok' if nodes == expected else 'WRONG (expected {0})'.format(expected)
+        print_func('{0:<12} depth {1}: {2:>9} nodes {3:>8.2f}s {4:>9.0f} nodes/s  {5}'.format(
+            name, depth, nodes, secs, nodes / secs if secs else 0, verdict))
+    return results
+
+
+if __name__ == '__main__':
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else BENCHMARK_DEPTH)
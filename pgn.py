@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Read and write games in Portable Game Notation (PGN). Games are read
+one at a time from any iterable of lines (e.g. an open file), so large
+archives can be worked through without loading them into memory.
+Castling and promotion are not part of this game, games using them
+raise a ValueError.
+"""
+import re
+from game import Game
+from fen import START_FEN
+from utils import WRONG_ENTRY_POINT_MSG
+
+TAG_PATTERN = re.compile(r'^\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]\s*$')
+SAN_PATTERN = re.compile(r'^([KQRBN])?([a-h])?([1-8])?x?([a-h][1-8])$')
+MOVE_NUMBER_PATTERN = re.compile(r'^\d+\.+')
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+# the seven tags every PGN game has, in order
+TAG_ROSTER = [('Event', '?'), ('Site', '?'), ('Date', '????.??.??'), ('Round', '?'),
+              ('White', '?'), ('Black', '?'), ('Result', '*')]
+LINE_LENGTH = 80
+
+
+def read_pgn(lines):
+    """
+    Generator of (tags, [san, ...]) for each game in the lines of a PGN
+    file. Comments, variations and annotations are skipped.
+    """
+    tags, tokens, in_moves = {}, [], False
+    comment, variation_depth = False, 0
+    for line in lines:
+        line = line.strip()
+        if not comment and variation_depth == 0:
+            tag = TAG_PATTERN.match(line)
+            if tag:
+                if in_moves:  # tags without a result after the moves start a new game
+                    yield tags, tokens
+                    tags, tokens, in_moves = {}, [], False
+                tags[tag.group(1)] = tag.group(2).replace('\\"', '"')
+                continue
+            if line.startswith('%'):
+                continue
+
+        for token in __movetext_tokens(line):
+            if comment:
+                comment = token != '}'
+            elif token == '{':
+                comment = True
+            elif token == ';':
+                break  # rest of line comment
+            elif token == '(':
+                variation_depth += 1
+            elif token == ')':
+                variation_depth -= 1
+            elif variation_depth:
+                continue
+            elif token in RESULTS:
+                tags.setdefault('Result', token)
+                yield tags, tokens
+                tags, tokens, in_moves = {}, [], False
+            elif not token.startswith('$'):
+                move = MOVE_NUMBER_PATTERN.sub('', token).rstrip('+#!?')
+                if move:
+                    tokens.append(move)
+                    in_moves = True
+
+    if tags or tokens:
+        yield tags, tokens
+
+
+def __movetext_tokens(line):
+    return re.findall(r'[{}();]|[^\s{}();]+', line)
+
+
+def read_games(lines, **kwargs):
+    """
+    Generator of (tags, game) for each game in the lines of a PGN file,
+    with the moves played through a Game (any keyword arguments are
+    passed on to Game).
+    """
+    for tags, sans in read_pgn(lines):
+        yield tags, replay(sans, tags.get('FEN', START_FEN), **kwargs)
+
+
+def replay(sans, fen_string=START_FEN, **kwargs):
+    """
+    Play a list of moves in standard algebraic notation from the position
+    in fen_string, returning the game.
+    """
+    kwargs.setdefault('default_logging', False)
+    game = Game.from_fen(fen_string, **kwargs)
+    for san in sans:
+        game.make_move(find_move(game, san))
+    return game
+
+
+def find_move(game, san):
+    """
+    The move (a MoveRecord) san describes for the team to move in game.
+    """
+    match = SAN_PATTERN.match(san.rstrip('+#!?'))
+    if not match:
+        raise ValueError("Move not supported: {0}".format(san))
+    code, from_col, from_row, cell_ref = match.groups()
+    code = code or 'p'
+    found = [move for move in game.generate_moves(game.team_to_move)
+             if move.piece.ref[1] == code and move.new_cell_ref == cell_ref.upper() and
+             (not from_col or move.piece.col == from_col.upper()) and
+             (not from_row or move.piece.row == int(from_row))]
+    if len(found) != 1:
+        raise ValueError("{0} {1} for {2} at move {3}".format(
+            'No move' if not found else 'Ambiguous move', san, game.team_to_move,
+            game.fullmove_number))
+    return found[0]
+
+
+def move_san(game, move):
+    """
+    Standard algebraic notation for move (for the team to move in game),
+    without any check / checkmate suffix.
+    """
+    piece = move.piece
+    if piece.name == 'pawn':
+        # pawns only move to another column when taking (or en passant)
+        return (piece.col.lower() + 'x' if move.new_col_no != piece.col_no else '') + \
+            move.new_cell_ref.lower()
+
+    rivals = [other.piece for other in game.generate_moves(piece.team)
+              if other.piece.ref[1] == piece.ref[1] and other.piece is not piece and
+              other.square == move.square]
+    disambiguation = ''
+    if rivals:
+        if all(rival.col_no != piece.col_no for rival in rivals):
+            disambiguation = piece.col.lower()
+        elif all(rival.row != piece.row for rival in rivals):
+            disambiguation = str(piece.row)
+        else:
+            disambiguation = piece.cell_ref.lower()
+    return piece.ref[1] + disambiguation + ('x' if move.take else '') + move.new_cell_ref.lower()
+
+
+def game_sans(game):
+    """
+    The moves made in game (from game.move_history) in standard algebraic
+    notation, worked out by replaying them from game.start_fen.
+    """
+    replayed = Game.from_fen(game.start_fen, default_logging=False)
+    sans = []
+    for old_square, new_square in game.move_history:
+        piece_ref = replayed.board.squares[old_square]
+        move = [move for move in replayed.generate_moves(replayed.team_to_move)
+                if move.piece.ref == piece_ref and move.square == new_square][0]
+        san = move_san(replayed, move)
+        replayed.make_move(move)
+        if replayed.check:
+            san += '#' if replayed.is_checkmated(replayed.team_to_move) else '+'
+        sans.append(san)
+    return sans
+
+
+def game_result(game):
+    """
+    Result of a game as a PGN result, '*' unless there is a checkmate.
+    """
+    if game.is_checkmated(game.team_to_move):
+        return '0-1' if game.team_to_move == 'white' else '1-0'
+    return '*'
+
+
+def write_game(game, out, tags=None):
+    """
+    Write game (its moves from game.move_history) to out (a file like
+    object) as PGN, with any extra / overriding tags.
+    """
+    tags = dict(tags or {})
+    tags.setdefault('Result', game_result(game))
+    if game.start_fen != START_FEN:
+        tags.setdefault('SetUp', '1')
+        tags.setdefault('FEN', game.start_fen)
+    roster = [name for name, _ in TAG_ROSTER]
+    for name, default in TAG_ROSTER + sorted((name, value) for name, value in tags.items()
+                                             if name not in roster):
+        out.write('[{0} "{1}"]\n'.format(name, str(tags.get(name, default)).replace('"', '\\"')))
+    out.write('\n')
+
+    words, number = [], int(game.start_fen.split()[-1])
+    black_first = game.start_fen.split()[1] == 'b'
+    for i, san in enumerate(game_sans(game)):
+        if (i + black_first) % 2 == 0:
+            words.append('{0}.'.format(number + (i + black_first) // 2))
+        elif i == 0:
+            words.append('{0}...'.format(number))
+        words.append(san)
+    words.append(tags['Result'])
+
+    line = ''
+    for word in words:
+        if line and len(line) + len(word) + 1 > LINE_LENGTH:
+            out.write(line + '\n')
+            line = word
+        else:
+            line = line + ' ' + word if line else word
+    out.write(line + '\n\n')
+
+
+if __name__ == '__main__':
+    print(WRONG_ENTRY_POINT_MSG)
@@ -11,6 +11,7 @@ class Piece(object):
     One instance created for each piece in the game containing all
     of the information and functionality pertaining to that piece.
     """
+    moves_by_kind = {}  # (name, team) => (piece_moves, valid_moves, one_space_moves)
 
 
     def __init__(self, ref, name, team, row, col, piece_moves, move_cnt=0):
@@ -22,17 +23,25 @@ class Piece(object):
         self.team = team
         self.row = int(row)
         self.col_no = col_letter_to_no(col)
-        self.valid_moves = self.get_valid_moves(piece_moves)
         self.move_cnt = move_cnt
         self.taken = False
         self.last_to_move = False
 
         # note knights ability to jump
-        if self.name.lower() == 'knight':
-            self.allowed_to_jump = True
+        self.allowed_to_jump = self.name.lower() == 'knight'
+
+        # the moves are the same for every piece of a kind, so work them out once
+        cached = Piece.moves_by_kind.get((name, team))
+        if cached and cached[0] is piece_moves:
+            self.valid_moves = cached[1]
+            if not self.allowed_to_jump:
+                self.one_space_moves = cached[2]
         else:
-            self.allowed_to_jump = False
-            self.one_space_moves = self.get_one_space_moves()
+            self.valid_moves = self.get_valid_moves(piece_moves)
+            if not self.allowed_to_jump:
+                self.one_space_moves = self.get_one_space_moves()
+            Piece.moves_by_kind[(name, team)] = (piece_moves, self.valid_moves,
+                                                 getattr(self, 'one_space_moves', None))
 
 
     @property
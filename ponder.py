@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Pondering for games against the engine: while the player is at the
+prompt a background thread finds the player's legal moves (so their
+move is validated at once) then the engine's reply to each of the
+player's likely moves, best first by the search's move ordering, so the
+reply can be played without waiting. The work is dropped as soon as the
+player's move comes in.
+"""
+import threading
+from game import Game
+from chess_engine import Search, pick_move, DEFAULT_TIME_LIMIT
+from utils import pos_to_square, WRONG_ENTRY_POINT_MSG
+
+DEFAULT_MAX_REPLIES = 8  # player moves to find a reply to, most likely first
+
+
+class Ponderer(object):
+    """
+    Thinks ahead for the engine playing engine_team at level (see
+    chess_engine.pick_move) while the other player chooses a move.
+    Call start when the player is prompted and stop once they answer.
+    """
+
+
+    def __init__(self, engine_team, level, time_limit=DEFAULT_TIME_LIMIT, node_limit=None,
+                 book=None, max_replies=DEFAULT_MAX_REPLIES):
+        self.engine_team = engine_team
+        self.level = level
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.book = book
+        self.max_replies = max_replies
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.position_key = None  # zobrist key of the position pondered
+        self.records = None  # the player's legal moves, once found
+        self.replies = {}  # zobrist key after a player's move => (piece_ref, square) to reply
+
+
+    def start(self, game, team):
+        """
+        Start thinking about the position in game with team (the player)
+        to move. The game must not be changed until stop is called.
+        """
+        self.stop()
+        self.stop_event = threading.Event()
+        self.position_key, self.records, self.replies = game.zobrist_key, None, {}
+        self.thread = threading.Thread(target=self.__ponder, args=(game, team, game.snapshot()),
+                                       daemon=True)
+        self.thread.start()
+
+
+    def stop(self):
+        """
+        Cancel any thinking still going on, keeping what has been found.
+        """
+        if self.thread:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+
+    def __ponder(self, game, team, snapshot):
+        # the game is waiting at the prompt, so its moves can be found on it directly
+        self.records = game.generate_moves(team)
+        if self.level == 0:
+            return  # random moves, nothing to gain
+
+        # replies are searched on a copy, leaving the game itself untouched
+        copy = Game.from_snapshot(snapshot, default_logging=False)
+        for record in Search(copy).ordered_moves(team, 0)[:self.max_replies]:
+            copy.current_team = team
+            copy.make_move(record)
+            reply = pick_move(copy, self.engine_team, self.level, self.time_limit,
+                              self.node_limit, book=self.book, stop=self.stop_event)
+            if self.stop_event.is_set():
+                return  # cut short, so may not be the reply a full search would find
+            if reply:
+                self.replies[copy.zobrist_key] = (reply.piece.ref, pos_to_square(reply.new_pos))
+            copy.unmake_move()
+
+
+    def legal_moves(self, game):
+        """
+        The legal moves (MoveRecords) found for the player in game's
+        position, None if they were not found in time.
+        """
+        if game.zobrist_key != self.position_key:
+            return None
+        return self.records
+
+
+    def reply(self, game):
+        """
+        The engine's reply (MoveRecord) found while pondering for game's
+        position, None if the player made a move it did not get to.
+        """
+        found = self.replies.get(game.zobrist_key)
+        if not found:
+            return None
+        piece_ref, square = found
+        for record in game.generate_moves(self.engine_team):
+            if record.piece.ref == piece_ref and record.square == square:
+                return record
+        return None
+
+
+    def engine_move(self, game):
+        """
+        Move (object) for the engine in game, the pondered reply when
+        there is one, otherwise searched for now.
+        """
+        record = self.reply(game)
+        if record:
+            return record.to_move(game)
+        return pick_move(game, self.engine_team, self.level, self.time_limit, self.node_limit,
+                         book=self.book)
+
+
+if __name__ == '__main__':
+    print(WRONG_ENTRY_POINT_MSG)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Bounded cache for results worked out for a position (e.g. the possible
+moves or whether a team is in check), keyed by the game's zobrist key.
+"""
+from collections import OrderedDict
+from utils import WRONG_ENTRY_POINT_MSG
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+class PositionCache(object):
+    """
+    Least recently used cache holding up to max_entries results, with
+    counts of hits, misses and evictions.
+    """
+
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+
+    def get(self, key, default=None):
+        """
+        Cached value for key (default if not cached).
+        """
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+    def clear(self):
+        self.entries.clear()
+
+
+    def stats(self):
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions}
+
+
+if __name__ == '__main__':
+    print(WRONG_ENTRY_POINT_MSG)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Headless self-play: play a batch of games between two engine levels
+across a pool of processes, with no drawing or pauses, writing each
+result as a line of JSON as soon as the game finishes. Used to check
+engine changes over many games, e.g.
+python3 self_play.py --games 100 --white 1 --black 0 --workers 4
+"""
+import argparse
+import json
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+from game import Game
+from chess_engine import pick_move
+from tablebase import shared_tablebase
+from utils import pos_to_cell_ref, square_to_pos
+
+DEFAULT_RESULTS_PATH = 'self_play.jsonl'
+DEFAULT_MOVE_TIME = 1.0  # seconds per move for levels above 0
+REPETITIONS_FOR_DRAW = 3
+
+
+def play_game(game_no, white_level, black_level, seed=None, turn_limit=200,
+              time_limit=DEFAULT_MOVE_TIME, node_limit=None, book=None):
+    """
+    Play one game between the two levels (see chess_engine.pick_move),
+    both playing from the opening book at path book if given,
+    returns a dict with the winner (None for a draw), the reason the game
+    ended, the number of turns and the moves made e.g. ['e2e4', ...].
+    """
+    random.seed(seed)
+    game = Game(turn_limit=turn_limit, default_logging=False)
+    levels = {'white': white_level, 'black': black_level}
+
+    ending = game_over(game, turn_limit)
+    while not ending:
+        team = game.team_to_move
+        game.current_team = team
+        game.make_move(pick_move(game, team, levels[team], time_limit, node_limit,
+                                 book=book))
+        ending = game_over(game, turn_limit)
+    winner, reason = ending
+
+    moves = [(pos_to_cell_ref(square_to_pos(old)) + pos_to_cell_ref(square_to_pos(new))).lower()
+             for old, new in game.move_history]
+    return {'game': game_no, 'white_level': white_level, 'black_level': black_level,
+            'seed': seed, 'winner': winner, 'reason': reason, 'turns': game.turns,
+            'moves': moves}
+
+
+def game_over(game, turn_limit=None):
+    """
+    (winning team or None for a draw, reason) if the game has ended with
+    game.team_to_move to play, otherwise None.
+    """
+    team = game.team_to_move
+    if turn_limit is not None and game.turns >= turn_limit:
+        return None, 'turn limit'
+    if not game.generate_moves(team):
+        if game.is_in_check(team):
+            return ('black' if team == 'white' else 'white'), 'checkmate'
+        return None, 'stalemate'
+    result = shared_tablebase().adjudicate(game)
+    if result:
+        return (None if result == 'draw' else result), 'tablebase'
+    if game.repetition_count() >= REPETITIONS_FOR_DRAW:
+        return None, 'repetition'
+    return None
+
+
+def run(games, white_level, black_level, workers=None, results_path=DEFAULT_RESULTS_PATH,
+        seed=0, turn_limit=200, time_limit=DEFAULT_MOVE_TIME, node_limit=None, book=None,
+        print_func=print):
+    """
+    Play games games (each seeded with seed + game number) over workers
+    processes (None for one per CPU, 1 to play in this process), appending
+    each result to results_path as it comes in. Returns a summary with
+    the number of wins for each side, draws and games per second.
+    """
+    summary = {'games': 0, 'white': 0, 'black': 0, 'draws': 0}
+    args = [(game_no, white_level, black_level, seed + game_no, turn_limit, time_limit,
+             node_limit, book) for game_no in range(games)]
+    start = perf_counter()
+
+    with open(results_path, 'a') as results_file:
+        if workers == 1:
+            results = (play_game(*game_args) for game_args in args)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = (future.result() for future in
+                       as_completed([executor.submit(play_game, *game_args) for game_args in args]))
+        try:
+            for result in results:
+                results_file.write(json.dumps(result) + '\n')
+                results_file.flush()
+                summary['games'] += 1
+                summary[result['winner'] or 'draws'] += 1
+                print_func('game {0}: {1} ({2}) after {3} turns'.format(
+                    result['game'], result['winner'] or 'draw', result['reason'], result['turns']))
+        finally:
+            if executor:
+                executor.shutdown()
+
+    summary['seconds'] = perf_counter() - start
+    summary['games_per_second'] = summary['games'] / summary['seconds'] if summary['seconds'] else 0
+    print_func('{games} games in {seconds:.1f}s ({games_per_second:.2f} games/s) - white {white}, '
+               'black {black}, draws {draws}'.format(**summary))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--white', type=int, default=1, help='level for white')
+    parser.add_argument('--black', type=int, default=0, help='level for black')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default one per CPU)')
+    parser.add_argument('--results', default=DEFAULT_RESULTS_PATH, help='file to append results to')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--turn-limit', type=int, default=200)
+    parser.add_argument('--move-time', type=float, default=DEFAULT_MOVE_TIME)
+    parser.add_argument('--nodes', type=int, default=None, help='node limit per move')
+    parser.add_argument('--book', default=None, help='opening book (see opening_book.py)')
+    args = parser.parse_args(argv)
+    return run(args.games, args.white, args.black, args.workers, args.results, args.seed,
+               args.turn_limit, args.move_time, args.nodes, args.book)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Asyncio server hosting many games of a player against the engine in one
+process, over a line based protocol on TCP or a Unix socket. Engine
+moves are worked out in a pool of processes, so a slow search never
+holds up the other games. Commands (one per line):
+new [white|black] [level]  start a game, playing the team given
+a2a4                       make a move (as at the game prompt)
+board / fen                show the position
+quit                       end the session
+Replies are lines starting: ok, move (the engine's move), check, end
+(the winner or draw and the reason), fen, error or bye. Run with e.g.
+python3 server.py --port 8765 --level 2
+"""
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from game import Game
+from move import Move
+from chess_engine import pick_move
+from self_play import game_over, DEFAULT_MOVE_TIME
+from utils import cell_ref_to_pos, pos_to_cell_ref, pos_to_square, square_to_pos
+
+DEFAULT_HOST, DEFAULT_PORT = '127.0.0.1', 8765
+DEFAULT_LEVEL = 1
+DEFAULT_TURN_LIMIT = 200
+
+
+def engine_move(snapshot, team, level, time_limit, node_limit=None, book=None):
+    """
+    (from square, to square) of the engine's move for team in a game
+    snapshot (see Game.snapshot), run in the server's process pool.
+    """
+    game = Game.from_snapshot(snapshot, default_logging=False)
+    move = pick_move(game, team, level, time_limit, node_limit, book=book)
+    return pos_to_square(move.pos), pos_to_square(move.new_pos)
+
+
+def square_text(from_square, to_square):
+    return (pos_to_cell_ref(square_to_pos(from_square)) +
+            pos_to_cell_ref(square_to_pos(to_square))).lower()
+
+
+class Session(object):
+    """
+    One connection, playing one game at a time against the engine.
+    """
+
+
+    def __init__(self, server):
+        self.server = server
+        self.game = None
+        self.team = None  # the player's team
+        self.level = server.level
+        self.over = False
+
+
+    async def command(self, line):
+        """
+        Carry out a command, returns the lines to reply with.
+        """
+        words = line.strip().lower().split()
+        if not words:
+            return []
+        if words[0] == 'new':
+            return await self.new_game(words[1:])
+        if words[0] == 'quit':
+            return ['bye']
+        if self.game is None:
+            return ['error no game, start one with: new [white|black] [level]']
+        if words[0] == 'board':
+            return self.game.board.draw_board().strip('\n').split('\n') + ['ok board']
+        if words[0] == 'fen':
+            return ['fen ' + self.game.to_fen()]
+        return await self.player_move(words[0])
+
+
+    async def new_game(self, args):
+        team = args[0] if args else 'white'
+        if team not in ('white', 'black') or (len(args) > 1 and not args[1].isdigit()):
+            return ['error usage: new [white|black] [level]']
+        self.team, self.over = team, False
+        self.level = int(args[1]) if len(args) > 1 else self.server.level
+        self.game = Game(turn_limit=self.server.turn_limit, default_logging=False)
+        replies = ['ok new {0} {1}'.format(self.team, self.level)]
+        if team == 'black':
+            replies += await self.engine_reply()
+        return replies
+
+
+    async def player_move(self, text):
+        if self.over:
+            return ['error game over, start another with: new [white|black] [level]']
+        game = self.game
+        if game.team_to_move != self.team:
+            return ['error not your move']
+        try:
+            old_pos, new_pos = cell_ref_to_pos(text[:2]), cell_ref_to_pos(text[2:4])
+        except (IndexError, ValueError):
+            return ['error moves are given as the cell to move from then to e.g. a2a4']
+        if len(text) != 4 or not all(1 <= i <= 8 for i in old_pos + new_pos):
+            return ['error moves are given as the cell to move from then to e.g. a2a4']
+        piece = game.get_piece(game.board.squares[pos_to_square(old_pos)])
+        if not piece or piece.team != self.team:
+            return ['error a piece in your team could not be found in cell: ' + text[:2]]
+
+        game.current_team = self.team
+        occupied, our_team, their_team = game.get_occupied()
+        move = Move(piece, new_pos[0] - old_pos[0], new_pos[1] - old_pos[1], occupied,
+                    our_team, their_team, bitboards=game.bitboards,
+                    squares=game.board.squares, position_key=game.zobrist_key)
+        if not move.possible:
+            return ['error ' + move.invalid_reason.replace('\n', ' ')]
+        game.make_move(move)
+        replies = ['ok ' + text] + self.status()
+        if not self.over:
+            replies += await self.engine_reply()
+        return replies
+
+
+    async def engine_reply(self):
+        game, team = self.game, self.game.team_to_move
+        # even random moves (level 0) need the legal moves found, so go to the pool
+        from_square, to_square = await asyncio.get_running_loop().run_in_executor(
+            self.server.executor, engine_move, game.snapshot(), team, self.level,
+            self.server.time_limit, self.server.node_limit, self.server.book)
+        piece_ref = game.board.squares[from_square]
+        game.current_team = team
+        game.make_move([move for move in game.generate_moves(team)
+                        if move.piece.ref == piece_ref and move.square == to_square][0])
+        return ['move ' + square_text(from_square, to_square)] + self.status()
+
+
+    def status(self):
+        """
+        Lines for check / the end of the game after a move.
+        """
+        ending = game_over(self.game, self.server.turn_limit)
+        if ending:
+            self.over = True
+            winner, reason = ending
+            return ['end {0} {1}'.format(winner or 'draw', reason)]
+        return ['check'] if self.game.is_in_check(self.game.team_to_move) else []
+
+
+class GameServer(object):
+    """
+    Accepts connections (on TCP and / or Unix sockets), each a Session.
+    """
+
+
+    def __init__(self, level=DEFAULT_LEVEL, time_limit=DEFAULT_MOVE_TIME, node_limit=None,
+                 workers=None, book=None, turn_limit=DEFAULT_TURN_LIMIT):
+        self.level = level
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.book = book
+        self.turn_limit = turn_limit
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.servers = []
+        self.sessions = {}  # writer => task handling it, for each connection
+
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        """
+        Listen on host / port, or the Unix socket at path if given.
+        Returns the asyncio server.
+        """
+        if path:
+            server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        self.servers.append(server)
+        return server
+
+
+    async def handle(self, reader, writer):
+        session = Session(self)
+        self.sessions[writer] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                replies = await session.command(line.decode('ascii', 'replace'))
+                writer.write(''.join(reply + '\n' for reply in replies).encode('ascii'))
+                await writer.drain()
+                if replies == ['bye']:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            del self.sessions[writer]
+            writer.close()
+
+
+    async def close(self):
+        for server in self.servers:
+            server.close()
+        # closing the connections ends each session at its next read
+        tasks = list(self.sessions.values())
+        for writer in list(self.sessions):
+            writer.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for server in self.servers:
+            await server.wait_closed()
+        self.executor.shutdown()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, **kwargs):
+    game_server = GameServer(**kwargs)
+    server = await game_server.start(host, port, path)
+    print('serving on {0}'.format(path or '{0}:{1}'.format(host, port)))
+    try:
+        await server.serve_forever()
+    finally:
+        await game_server.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', default=None, help='listen on this Unix socket instead')
+    parser.add_argument('--level', type=int, default=DEFAULT_LEVEL, help='default engine level')
+    parser.add_argument('--move-time', type=float, default=DEFAULT_MOVE_TIME)
+    parser.add_argument('--nodes', type=int, default=None, help='node limit per move')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default one per CPU)')
+    parser.add_argument('--book', default=None, help='opening book (see opening_book.py)')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, level=args.level,
+                          time_limit=args.move_time, node_limit=args.nodes,
+                          workers=args.workers, book=args.book))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Endgame tablebases for a king and one other piece against a lone king
+(KQK, KRK, KPK...). Tables are built by retrograde analysis: starting
+from every checkmate, positions are worked back a ply at a time so each
+one gets the number of plies to mate with best play, anything never
+reached being a draw (there is no promotion, so KPK is drawn). A table
+is one byte per position, with the stronger side's king folded into a
+quarter of the board (half with a pawn) by mirroring. Build the default
+tables into TABLEBASE_DIR with
+python3 tablebase.py
+"""
+import os
+import sys
+
+TABLEBASE_DIR = 'tablebases'
+DEFAULT_TABLES = ('KQK', 'KRK', 'KPK')
+FILE_EXTENSION = '.tb'
+# table entries, anything else is plies to mate + 1
+DRAW, ILLEGAL = 0, 255
+
+KING_STEPS = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+KNIGHT_STEPS = [(2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)]
+SLIDES = {'Q': KING_STEPS, 'R': KING_STEPS[::2], 'B': KING_STEPS[1::2]}
+
+
+def __offset(square, up, right):
+    row, col = (square >> 3) + up, (square & 7) + right
+    return row * 8 + col if 0 <= row < 8 and 0 <= col < 8 else None
+
+
+def __rays(square, code):
+    """
+    Squares a (white) piece on square could move to if the board were
+    empty, as lists in order along each line of movement.
+    """
+    if code in SLIDES:
+        rays = []
+        for up, right in SLIDES[code]:
+            ray, target = [], __offset(square, up, right)
+            while target is not None:
+                ray.append(target)
+                target = __offset(target, up, right)
+            rays.append(ray)
+        return [ray for ray in rays if ray]
+    steps = KNIGHT_STEPS if code == 'N' else KING_STEPS
+    return [[target] for target in (__offset(square, up, right) for up, right in steps)
+            if target is not None]
+
+
+def __pawn_attacks(square):
+    return [target for target in (__offset(square, 1, -1), __offset(square, 1, 1))
+            if target is not None]
+
+
+KING_MOVES = [[ray[0] for ray in __rays(square, 'K')] for square in range(64)]
+KING_AREAS = [frozenset(moves) for moves in KING_MOVES]
+RAYS = {code: [__rays(square, code) for square in range(64)] for code in ('Q', 'R', 'B', 'N')}
+# code => [{attacked square: squares that would block the attack}] per square
+ATTACKS = {code: [{target: tuple(ray[:i]) for ray in rays for i, target in enumerate(ray)}
+                  for rays in RAYS[code]] for code in RAYS}
+ATTACKS['P'] = [{target: () for target in __pawn_attacks(square)} for square in range(64)]
+
+
+def index(white_king, black_king, square, black_to_move):
+    """
+    Position in an unfolded table of white king, black king and white
+    piece squares (0 = A1 ... 63 = H8) and side to move.
+    """
+    return (((white_king << 6 | black_king) << 6 | square) << 1) | black_to_move
+
+
+def build_table(code):
+    """
+    Table (a bytearray over index()) for a white king and piece (code
+    e.g. 'Q', 'P' for a pawn) against a black king.
+    """
+    size = index(63, 63, 63, 1) + 1
+    table = bytearray(size)
+    counts = [0] * size  # black moves not yet known to lose, per position
+    attacks = ATTACKS[code]
+    mated = []
+
+    for white_king in range(64):
+        for black_king in range(64):
+            for square in range(64):
+                i = index(white_king, black_king, square, 0)
+                if (black_king == white_king or black_king in KING_AREAS[white_king] or
+                        square in (white_king, black_king) or (code == 'P' and square < 8)):
+                    table[i] = table[i + 1] = ILLEGAL
+                    continue
+                blockers = attacks[square].get(black_king)
+                in_check = blockers is not None and white_king not in blockers
+                if in_check:
+                    table[i] = ILLEGAL  # black can't be in check with white to move
+
+                moves = 0
+                for target in KING_MOVES[black_king]:
+                    if target in KING_AREAS[white_king]:
+                        continue
+                    if target == square:
+                        moves += 1  # take the piece, leaving a draw
+                        continue
+                    blockers = attacks[square].get(target)
+                    if blockers is None or white_king in blockers:
+                        moves += 1
+                counts[i + 1] = moves
+                if not moves and in_check:
+                    table[i + 1] = 1
+                    mated.append(i + 1)
+
+    plies, lost = 0, mated
+    while lost:
+        won = []
+        for i in lost:
+            for j in __white_unmoves(i, code, table):
+                table[j] = plies + 2
+                won.append(j)
+        lost = []
+        for j in won:
+            rest = (j & ~8191) | (j & 126) | 1  # white king and piece squares, black to move
+            for target in KING_MOVES[j >> 7 & 63]:
+                k = rest | target << 7
+                if not table[k] and counts[k]:
+                    counts[k] -= 1
+                    if not counts[k]:
+                        table[k] = plies + 3
+                        lost.append(k)
+        plies += 2
+    return table
+
+
+def __white_unmoves(i, code, table):
+    """
+    Positions (white to move, not yet decided) that white could have
+    moved from to reach position i.
+    """
+    white_king, black_king, square = i >> 13, i >> 7 & 63, i >> 1 & 63
+    rest = i & 8190  # black king and piece squares, white to move
+    found = [origin << 13 | rest for origin in KING_MOVES[white_king]]
+    base = i & ~127
+    if code == 'P':
+        behind = square - 8
+        if behind >= 8 and behind not in (white_king, black_king):
+            found.append(base | behind << 1)
+            if square >> 3 == 3:  # two spaces from its first move
+                found.append(base | (square - 16) << 1)
+    else:
+        for ray in RAYS[code][square]:
+            for origin in ray:
+                if origin == white_king or origin == black_king:
+                    break
+                found.append(base | origin << 1)
+    return [j for j in found if not table[j]]
+
+
+def fold(white_king, black_king, square, black_to_move, pawn=False):
+    """
+    Index into a stored table, mirroring the board so the white king is
+    in columns A-D (and rows 1-4 unless there is a pawn).
+    """
+    flip = (7 if white_king & 7 > 3 else 0) | (56 if white_king > 31 and not pawn else 0)
+    white_king, black_king, square = white_king ^ flip, black_king ^ flip, square ^ flip
+    wing = (white_king >> 3) * 4 + (white_king & 7)
+    return ((wing << 6 | black_king) << 6 | square) << 1 | black_to_move
+
+
+def compact(table, pawn=False):
+    """
+    The stored form of a table from build_table.
+    """
+    kings = [white_king for white_king in range(64)
+             if white_king & 7 < 4 and (pawn or white_king < 32)]
+    stored = bytearray(len(kings) * 8192)
+    for white_king in kings:
+        start, offset = index(white_king, 0, 0, 0), fold(white_king, 0, 0, 0, pawn)
+        stored[offset:offset + 8192] = table[start:start + 8192]
+    return stored
+
+
+def table_path(name, directory=TABLEBASE_DIR):
+    return os.path.join(directory, name + FILE_EXTENSION)
+
+
+def write_tables(names=DEFAULT_TABLES, directory=TABLEBASE_DIR, print_func=print):
+    """
+    Build and save the tables for material names e.g. 'KQK'.
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    for name in names:
+        code = name[1].upper()
+        table = compact(build_table(code), code == 'P')
+        with open(table_path(name, directory), 'wb') as table_file:
+            table_file.write(table)
+        mates = [value - 1 for value in table if value not in (DRAW, ILLEGAL)]
+        print_func('{0}: {1} bytes, {2}'.format(name, len(table), 'longest mate {0} plies'.format(
+            max(mates)) if mates else 'all draws'))
+
+
+class Tablebase(object):
+    """
+    The tables saved in a directory, probed for games down to a king and
+    at most one other piece against a lone king.
+    """
+
+
+    def __init__(self, directory=TABLEBASE_DIR):
+        self.tables = {}  # piece code (as in piece refs) => table
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.endswith(FILE_EXTENSION) and len(name) == 3 + len(FILE_EXTENSION):
+                    with open(os.path.join(directory, name), 'rb') as table_file:
+                        code = name[1] if name[1] != 'P' else 'p'
+                        self.tables[code] = table_file.read()
+
+
+    def __len__(self):
+        return len(self.tables)
+
+
+    def probe(self, game):
+        """
+        ('win' / 'loss' / 'draw', plies to mate) for the team to move in
+        game, or None if the position is not covered.
+        """
+        refs = list(game.piece_squares)
+        if len(refs) == 2:
+            return 'draw', None  # only the kings left
+        others = [ref for ref in refs if ref[1] != 'K']
+        if len(refs) != 3 or len(others) != 1 or others[0][1] not in self.tables:
+            return None
+
+        strong = others[0][0]
+        flip = 0 if strong == 'w' else 56  # turn the board round for black
+        kings = {ref[0]: game.piece_squares[ref] ^ flip for ref in refs if ref[1] == 'K'}
+        strong_to_move = game.team_to_move[0] == strong
+        value = self.tables[others[0][1]][fold(
+            kings[strong], kings['b' if strong == 'w' else 'w'],
+            game.piece_squares[others[0]] ^ flip, 0 if strong_to_move else 1,
+            others[0][1] == 'p')]
+        if value == DRAW or value == ILLEGAL:
+            return 'draw', None
+        return ('win' if strong_to_move else 'loss'), value - 1
+
+
+    def best_move(self, game, team):
+        """
+        The move (a MoveRecord) for team that keeps the best result
+        (quickest win / slowest loss), or None if not covered.
+        """
+        if not self.tables or len(game.piece_squares) > 3 or self.probe(game) is None:
+            return None
+
+        def outcome(move):
+            game.make_move(move)
+            result, plies = self.probe(game)
+            game.unmake_move()
+            if result == 'loss':
+                return 2, -plies
+            return (0, plies) if result == 'win' else (1, 0)
+
+        moves = game.generate_moves(team)
+        return max(moves, key=outcome) if moves else None
+
+
+    def adjudicate(self, game):
+        """
+        The team the tables say will win ('draw' if drawn), or None if
+        the position is not covered.
+        """
+        found = self.probe(game) if len(game.piece_squares) <= 3 else None
+        if found is None:
+            return None
+        if found[0] == 'draw':
+            return 'draw'
+        other_team = 'black' if game.team_to_move == 'white' else 'white'
+        return game.team_to_move if found[0] == 'win' else other_team
+
+
+__shared_tablebases = {}
+
+
+def shared_tablebase(directory=None):
+    """
+    The Tablebase for directory (default TABLEBASE_DIR), loaded once per
+    process.
+    """
+    directory = directory or TABLEBASE_DIR
+    if directory not in __shared_tablebases:
+        __shared_tablebases[directory] = Tablebase(directory)
+    return __shared_tablebases[directory]
+
+
+if __name__ == '__main__':
+    write_tables(sys.argv[1:] or DEFAULT_TABLES)
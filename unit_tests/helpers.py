@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the unit tests.
+"""
+
+
+def helper_play(game, prompts):
+    """
+    Play prompts (e.g. 'e2e4') in game, white first then alternating.
+    """
+    for i, prompt in enumerate(prompts):
+        game.take_turn('white' if i % 2 == 0 else 'black', prompt)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+import unittest
+from random import Random
+from game import Game
+from utils import pos_to_square, pos_to_cell_ref
+from attack_tables import (KNIGHT_DESTINATIONS, KING_DESTINATIONS, QUEEN_RAYS, PAWN_PUSHES,
+                           PAWN_CAPTURES, destinations)
+
+
+class TestAttackTables(unittest.TestCase):
+
+
+    def test_table_sizes(self):
+        a1, d4 = pos_to_square([1, 1]), pos_to_square([4, 4])
+        self.assertEqual(len(KNIGHT_DESTINATIONS[a1]), 2)
+        self.assertEqual(len(KNIGHT_DESTINATIONS[d4]), 8)
+        self.assertEqual(len(KING_DESTINATIONS[a1]), 3)
+        self.assertEqual(sum(len(ray) for ray in QUEEN_RAYS[d4]), 27)
+        self.assertEqual(PAWN_PUSHES['white'][pos_to_square([2, 5])], [20, 28])
+        self.assertEqual(PAWN_PUSHES['black'][pos_to_square([1, 5])], [])
+        self.assertEqual(len(PAWN_CAPTURES['black'][pos_to_square([7, 8])]), 1)
+
+
+    def test_sliding_destinations_stop_at_blockers(self):
+        a1 = pos_to_square([1, 1])
+        own, their = 1 << pos_to_square([1, 3]), 1 << pos_to_square([4, 1])
+        targets = sorted(pos_to_cell_ref([t // 8 + 1, t % 8 + 1])
+                         for t in destinations('rook', 'white', a1, own, own | their))
+        self.assertEqual(targets, ['A2', 'A3', 'A4', 'B1'])
+
+
+    def test_generated_moves_match_move_lists(self):
+        """
+        Play a few random games checking the moves found from the attack
+        tables are the same as those found by trying every piece move.
+        """
+        rnd = Random(7)
+        for _ in range(2):
+            games = [Game(default_logging=False), Game(default_logging=False, use_bitboards=False)]
+            for turn in range(30):
+                team = 'white' if turn % 2 == 0 else 'black'
+                found = []
+                for game in games:
+                    game.current_team = team
+                    moves, _ = game.get_all_possible_moves()
+                    found.append(sorted(set((ref, mv.new_cell_ref)
+                                            for ref, mvs in moves.items() for mv in mvs)))
+                self.assertEqual(found[0], found[1])
+                if not found[0] or games[0].checkmate:
+                    break
+                ref, new_cell_ref = rnd.choice(found[0])
+                prompt = games[0].get_piece(ref).cell_ref + new_cell_ref
+                for game in games:
+                    game.take_turn(team, prompt)
+
+
+if __name__ == "__main__":
+    unittest.main()
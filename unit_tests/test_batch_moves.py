@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+import unittest
+from random import Random
+from unittest import mock
+from game import Game
+import batch_moves
+import perft
+
+
+@unittest.skipIf(batch_moves.np is None, 'NumPy is not installed')
+class TestBatchMoves(unittest.TestCase):
+
+
+    @staticmethod
+    def helper_random_games(seed=5, games=4, turns=80):
+        """
+        Games at each turn of some random games, favouring takes (and so
+        reaching checks, pins etc.) as in test_legal_moves.
+        """
+        rnd, found = Random(seed), []
+        for _ in range(games):
+            game = Game(default_logging=False)
+            for turn in range(turns):
+                records = game.generate_moves(game.team_to_move)
+                if not records:
+                    break
+                found.append(Game.from_snapshot(game.snapshot(), default_logging=False))
+                takes = [record for record in records if record.take]
+                game.current_team = game.team_to_move
+                game.make_move(rnd.choice(takes if takes and rnd.random() < 0.7 else records))
+        return found
+
+
+    def test_matches_generate_moves(self):
+        games = self.helper_random_games()
+        found = batch_moves.batch_moves(*batch_moves.boards_from_games(games))
+        for i, game in enumerate(games):
+            team = game.team_to_move
+            expected = sorted((game.piece_squares[record.piece.ref], record.square)
+                              for record in game.generate_moves(team))
+            self.assertEqual(batch_moves.move_list(found.moves[i]), expected)
+            self.assertEqual(found.counts[i], len(expected))
+            self.assertEqual(found.check[i], game.is_in_check(team))
+            for team_no, attacking in enumerate(['white', 'black']):
+                attacked = sum(1 << square for square in range(64)
+                               if game.bitboards.is_attacked(square, attacking))
+                self.assertEqual(int(found.attacks[i, team_no]), attacked)
+
+
+    def test_perft_positions(self):
+        """
+        Move counts for the positions one move before the end of a perft
+        add up to the perft count.
+        """
+        for name in sorted(perft.POSITIONS):
+            game, team = perft.position(name)
+            found = batch_moves.batch_moves(*batch_moves.positions_ahead(game, 2, team))
+            self.assertEqual(found.counts.sum(), perft.POSITIONS[name][3][3], name)
+
+
+    def test_counts_without_bitwise_count(self):
+        """
+        NumPy before 2.0 has no bitwise_count, the counts still add up.
+        """
+        games = self.helper_random_games(games=1, turns=20)
+        expected = batch_moves.batch_moves(*batch_moves.boards_from_games(games)).counts
+        with mock.patch.object(batch_moves.np, 'bitwise_count', None):
+            found = batch_moves.batch_moves(*batch_moves.boards_from_games(games)).counts
+        self.assertEqual(found.tolist(), expected.tolist())
+
+
+    def test_no_kings(self):
+        boards = batch_moves.np.zeros((1, 64), dtype=batch_moves.np.int8)
+        boards[0, 0], boards[0, 63] = batch_moves.ROOK, -batch_moves.KNIGHT
+        found = batch_moves.batch_moves(boards, [True])
+        self.assertEqual(found.counts[0], 14)
+        self.assertFalse(found.check[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
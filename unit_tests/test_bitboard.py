@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import unittest
+from game import Game, TEAMS
+from move import Move
+from bitboard import Bitboards, pos_to_square, square_to_pos, iter_squares, BETWEEN
+from unit_tests import test_move
+
+switch_cells = test_move.TestMove.helper_switch_cells
+
+
+class TestBitboard(unittest.TestCase):
+
+
+    def test_square_conversions(self):
+        self.assertEqual(pos_to_square([1, 1]), 0)
+        self.assertEqual(pos_to_square([8, 8]), 63)
+        for square in range(64):
+            self.assertEqual(pos_to_square(square_to_pos(square)), square)
+
+
+    def test_between(self):
+        a1, a4, d4 = pos_to_square([1, 1]), pos_to_square([4, 1]), pos_to_square([4, 4])
+        self.assertEqual(sorted(iter_squares(BETWEEN[a1][a4])), [8, 16])
+        self.assertEqual(sorted(iter_squares(BETWEEN[a1][d4])), [9, 18])
+        self.assertEqual(BETWEEN[a4][pos_to_square([2, 2])], 0)
+
+
+    def test_board_keeps_bitboards_in_step(self):
+        game = Game(default_logging=False)
+        for team, prompt in [('white', 'e2e4'), ('black', 'd7d5'), ('white', 'e4d5')]:
+            game.take_turn(team, prompt)
+        self.assertEqual(game.bitboards.__dict__, Bitboards(game.board.positions).__dict__)
+        self.assertEqual(bin(game.bitboards.occupied).count('1'), 31)
+
+
+    def test_validation_matches_move_lists(self):
+        """
+        Every candidate move should get the same outcome whether it is
+        validated with bitboards or with the occupied / team lists.
+        """
+        start_positions = [
+            None,
+            switch_cells(["A2", "C7", "C2", "D8"], ["A4", "C5", "C4", "A5"]),
+            switch_cells(["E2", "D7", "F1", "E1"], ["E4", "D5", "B5", "E3"])]
+
+        for start_pos in start_positions:
+            for team in TEAMS.values():
+                game = Game(custom_start_positions=start_pos, default_logging=False)
+                game.current_team = team
+                occupied, our_team, their_team = game.get_occupied()
+                for piece in list(our_team.values()):
+                    for up, right in [mv[:2] for mv in piece.valid_moves]:
+                        outcomes = []
+                        for bitboards in [None, game.bitboards]:
+                            try:
+                                move = Move(piece, up, right, occupied, our_team, their_team,
+                                            theoretical_move=True, bitboards=bitboards)
+                                outcomes.append((move.possible, move.invalid_reason, move.take))
+                            except KeyError:
+                                outcomes.append(KeyError)
+                        self.assertEqual(outcomes[0], outcomes[1],
+                                         msg="{0} {1} {2}".format(piece.ref, up, right))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import unittest
+from game import Game
+from unit_tests.helpers import helper_play
+
+
+class TestBoard(unittest.TestCase):
+
+
+    def setUp(self):
+        self.game = Game(default_logging=False)
+        self.board = self.game.board
+
+
+    def test_redrawn_cells_match_full_draw(self):
+        self.board.draw_board()
+        helper_play(self.game, ['e2e4', 'd7d5', 'e4d5', 'd8d5'])
+
+        fresh = Game(default_logging=False)
+        helper_play(fresh, ['e2e4', 'd7d5', 'e4d5', 'd8d5'])
+        self.assertEqual(self.board.draw_board(), fresh.board.draw_board())
+
+        lines = self.board.draw_board().split('\n')
+        self.assertEqual(lines[19], '  5  |        |        |        |   bQ   |' +
+                         '        |        |        |        |')
+        self.assertEqual(len(lines), 39)
+
+
+    def test_diff_only_has_changed_lines(self):
+        self.board.draw_board()
+        self.assertEqual(self.board.draw_board(diff=True), '')
+
+        helper_play(self.game, ['e2e4'])
+        changes = self.board.draw_board(diff=True).split('\x1b[K')
+        self.assertEqual(changes[0], '\x1b[24;1H  4  |        |        |        |        |' +
+                         '   wp   |        |        |        |')
+        self.assertTrue(changes[1].startswith('\x1b[32;1H  2  |'))
+        self.assertEqual(changes[2:], [''])
+        self.assertEqual(self.board.draw_board(diff=True), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
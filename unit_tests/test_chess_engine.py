@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import unittest
+from game import Game
+from unit_tests.helpers import helper_play
+import chess_engine
+
+
+class TestChessEngine(unittest.TestCase):
+
+
+    def setUp(self):
+        self.game = Game(default_logging=False)
+
+
+    def test_finds_checkmate(self):
+        helper_play(self.game, ['f2f3', 'e7e5', 'g2g4'])
+        move = chess_engine.pick_move(self.game, 'black', 3)
+        self.assertEqual((move.piece.ref, move.new_cell_ref), ('bQ', 'H4'))
+
+
+    def test_takes_undefended_queen(self):
+        helper_play(self.game, ['e2e4', 'd7d5', 'd1g4'])
+        move = chess_engine.pick_move(self.game, 'black', 2)
+        self.assertEqual((move.piece.ref, move.new_cell_ref), ('bB1', 'G4'))
+
+
+    def test_search_limits(self):
+        search = chess_engine.Search(self.game, node_limit=50)
+        move, _ = search.run('white', 4)
+        self.assertIsNotNone(move)
+        self.assertLess(search.depth_reached, 4)
+        self.assertEqual(self.game.undo_stack, [])
+        self.assertEqual(self.game.turns, 0)
+
+        search = chess_engine.Search(self.game, time_limit=0)
+        self.assertIsNotNone(search.run('white', 5)[0])
+        self.assertLess(search.depth_reached, 5)
+
+
+    def test_parallel_search(self):
+        helper_play(self.game, ['f2f3', 'e7e5', 'g2g4'])
+        copy = Game.from_snapshot(self.game.snapshot())
+        self.assertEqual(copy.zobrist_key, self.game.zobrist_key)
+        self.assertEqual(copy.evaluation.score('white'), self.game.evaluation.score('white'))
+
+        move = chess_engine.pick_move(self.game, 'black', 3, workers=3)
+        self.assertEqual((move.piece.ref, move.new_cell_ref), ('bQ', 'H4'))
+        picks = [chess_engine.pick_move(self.game, 'black', 3, node_limit=200, workers=2)
+                 for _ in range(2)]
+        picks = [chess_engine.Search.move_id(move_obj) for move_obj in picks]
+        self.assertEqual(picks[0], picks[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+import unittest
+from random import Random
+from game import Game
+from evaluation import Evaluation
+
+
+class TestEvaluation(unittest.TestCase):
+
+
+    def setUp(self):
+        self.game = Game(default_logging=False)
+
+
+    def helper_assert_matches_recount(self):
+        recount = Evaluation(self.game.pieces)
+        self.assertEqual(self.game.evaluation.material, recount.material)
+        self.assertEqual(self.game.evaluation.positional, recount.positional)
+
+
+    def test_start_position_is_level(self):
+        self.assertEqual(self.game.evaluation.score('white'), 0)
+        self.assertEqual(self.game.evaluation.material['white'], 4040)
+
+
+    def test_totals_follow_moves_and_undo(self):
+        rnd = Random(11)
+        team = 'white'
+        for _ in range(60):
+            moves, cnt = self.game.get_all_possible_moves(team=team, mode=Game.PIN_AWARE)
+            if cnt == 0:
+                break
+            self.game.make_move(rnd.choice([mv for mvs in moves.values() for mv in mvs]))
+            team = self.game.current_team
+            self.helper_assert_matches_recount()
+        while self.game.undo_stack:
+            self.game.unmake_move()
+            self.helper_assert_matches_recount()
+        self.assertEqual(self.game.evaluation.score('black'), 0)
+
+
+    def test_take_turn_updates_score(self):
+        for team, prompt in [('white', 'e2e4'), ('black', 'd7d5'), ('white', 'e4d5')]:
+            self.game.take_turn(team, prompt)
+        self.helper_assert_matches_recount()
+        self.assertGreater(self.game.evaluation.score('white'), 1)
+        self.assertEqual(self.game.evaluation.score('black'), -self.game.evaluation.score('white'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+import unittest
+from game import Game
+from unit_tests.helpers import helper_play
+from fen import START_FEN, parse_fen
+
+
+class TestFen(unittest.TestCase):
+
+
+    def setUp(self):
+        self.game = Game(default_logging=False)
+
+
+    @staticmethod
+    def helper_moves(game, team):
+        return sorted((mv.piece.ref, mv.new_cell_ref, mv.take) for mv in game.generate_moves(team))
+
+
+    def test_start_position(self):
+        self.assertEqual(self.game.to_fen(), START_FEN)
+        game = Game.from_fen(START_FEN, default_logging=False)
+        self.assertEqual(game.zobrist_key, self.game.zobrist_key)
+        self.assertEqual(game.board.positions, self.game.board.positions)
+
+
+    def test_round_trip_with_en_passant_and_counters(self):
+        helper_play(self.game, ['e2e4', 'c7c5', 'g1f3', 'c5c4', 'd2d4'])
+        fen_string = self.game.to_fen()
+        self.assertEqual(fen_string, 'rnbqkbnr/pp1ppppp/8/8/2pPP3/5N2/PPP2PPP/RNBQKB1R b - d3 0 3')
+
+        game = Game.from_fen(fen_string, default_logging=False)
+        self.assertEqual(game.to_fen(), fen_string)
+        self.assertEqual(game.zobrist_key, self.game.zobrist_key)
+        self.assertEqual(self.helper_moves(game, 'black'), self.helper_moves(self.game, 'black'))
+        self.assertIn(('bp3', 'D3', False), self.helper_moves(game, 'black'))  # en passant
+
+
+    def test_pieces_placed_as_start_positions(self):
+        fen_string = '4k3/1P6/8/3Pp3/8/8/R5PR/4K3 w - e6 0 1'
+        game = Game.from_fen(fen_string, default_logging=False)
+        start_pos = parse_fen(fen_string)[0]
+        expected = Game(custom_start_positions=start_pos, default_logging=False)
+        self.assertEqual(game.board.positions, start_pos)
+        self.assertEqual(game.board.squares, expected.board.squares)
+        self.assertEqual(game.bitboards.__dict__, expected.bitboards.__dict__)
+        self.assertEqual(game.piece_squares, expected.piece_squares)
+        self.assertEqual({ref: piece.move_cnt for ref, piece in game.pieces.items()},
+                         {'wK': 0, 'bK': 0, 'wR1': 1, 'wR2': 1, 'wp7': 0, 'wp2': 1, 'wp4': 1, 'bp5': 1})
+        self.assertEqual(game.last_piece_to_move, 'bp5')
+        self.assertEqual(game.start_fen, fen_string)
+
+
+    def test_counters_follow_make_and_unmake(self):
+        helper_play(self.game, ['g1f3', 'g8f6', 'f3g1'])
+        self.assertEqual(self.game.to_fen()[-9:], 'b - - 3 2')
+        fen_string = self.game.to_fen()
+        move = [mv for mv in self.game.generate_moves('black') if mv.piece.ref == 'bp5'][0]
+        self.game.make_move(move)
+        self.assertTrue(self.game.to_fen().endswith('w - - 0 3'))
+        self.game.unmake_move()
+        self.assertEqual(self.game.to_fen(), fen_string)
+
+
+    def test_invalid_fen(self):
+        for fen_string in ['', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w',
+                           START_FEN.replace('8/8/8/8', '9/8/8/8'),
+                           START_FEN.replace(' w ', ' x '), START_FEN.replace('K', 'X')]:
+            with self.assertRaises(ValueError):
+                Game.from_fen(fen_string, default_logging=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
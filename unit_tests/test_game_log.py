@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+import os
+import unittest
+from io import StringIO
+from tempfile import mkdtemp
+from unittest.mock import patch
+from game import Game
+import game_log
+
+
+class TestGameLog(unittest.TestCase):
+
+
+    def setUp(self):
+        self.path = os.path.join(mkdtemp(), 'test_log.bin')
+
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+
+    def test_records_round_trip(self):
+        log = game_log.GameLog(self.path, flush_bytes=40)
+        game_id = log.start_game('8/8/8/8/8/8/8/K6k w - - 0 1')
+        log.log_move(game_id, 1, 0, 8, 123, take=True, check=True)
+        other_id = log.start_game('8/8/8/8/8/8/8/K6k b - - 0 1')
+        log.log_move(other_id, 1, 7, 15, 456)
+        log.close()
+
+        self.assertEqual(os.path.getsize(self.path) % game_log.RECORD.size, 0)
+        records = list(game_log.read_records(self.path))
+        self.assertEqual(records[1], (game_id, 1, 0, 8, game_log.TAKE | game_log.CHECK, 123))
+        self.assertEqual(game_log.read_games(self.path),
+                         [(game_id, '8/8/8/8/8/8/8/K6k w - - 0 1', [(0, 8)]),
+                          (other_id, '8/8/8/8/8/8/8/K6k b - - 0 1', [(7, 15)])])
+
+
+    def test_shared_id_starts_new_game(self):
+        log = game_log.GameLog(self.path)
+        with patch('game_log.getrandbits', return_value=7):
+            first_id = log.start_game('8/8/8/8/8/8/8/K6k w - - 0 1')
+            log.log_move(first_id, 1, 0, 8, 123)
+            second_id = log.start_game('8/8/8/8/8/8/8/K6k b - - 0 1')
+            log.log_move(second_id, 1, 7, 15, 456)
+        log.close()
+
+        self.assertEqual(first_id, second_id)
+        self.assertEqual(game_log.read_games(self.path),
+                         [(7, '8/8/8/8/8/8/8/K6k w - - 0 1', [(0, 8)]),
+                          (7, '8/8/8/8/8/8/8/K6k b - - 0 1', [(7, 15)])])
+
+
+    def test_logging_off(self):
+        game = Game(default_logging=False)
+        with patch('game_log.LOG_FILE_PATH', self.path):
+            game.take_turn('white', 'e2e4')
+            game_log.shared_log().close()
+        self.assertFalse(game.logging)
+        self.assertIsNone(game.log_id)
+        self.assertFalse(os.path.exists(self.path))
+
+
+    def test_logged_game_replays(self):
+        game = Game(default_logging=True)
+        with patch('game_log.LOG_FILE_PATH', self.path):
+            for team, prompt in [('white', 'f2f3'), ('black', 'e7e5'), ('white', 'g2g4'),
+                                 ('black', 'd8h4')]:
+                game.take_turn(team, prompt)
+            game_log.shared_log().close()
+
+        (game_id, replayed), = game_log.replay_games(self.path)
+        self.assertEqual(game_id, game.log_id)
+        self.assertEqual(replayed.to_fen(), game.to_fen())
+        self.assertEqual(list(game_log.read_records(self.path))[-1][4],
+                         game_log.CHECK | game_log.CHECKMATE)
+
+        out = StringIO()
+        game_log.main(self.path, out)
+        self.assertIn('1. f3 e5 2. g4 Qh4# 0-1', out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import os
+import pstats
+import unittest
+from tempfile import mkdtemp
+from game import Game
+import instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+
+    def validate_all(self):
+        game = Game(default_logging=False)
+        return game.get_all_possible_moves(team='white', mode=Game.VALIDATE_EACH_MOVE)[1]
+
+
+    def test_disabled_by_default(self):
+        self.validate_all()
+        self.assertFalse(instrumentation.step_calls)
+        self.assertFalse(instrumentation.outcomes)
+        self.assertFalse(instrumentation.move_counts)
+
+
+    def test_counts_steps_and_outcomes(self):
+        instrumentation.enable()
+        cnt = self.validate_all()
+        instrumentation.disable()
+
+        calls = {step_class.__name__: calls
+                 for step_class, calls in instrumentation.step_calls.items()}
+        tried = sum(instrumentation.outcomes.values())
+        self.assertEqual(instrumentation.outcomes['allowed'], cnt)
+        self.assertEqual(calls['ValidatePiece'], tried)
+        self.assertEqual(calls['ValidateKing'], cnt)
+        self.assertEqual(instrumentation.move_counts['get_all_possible_moves'], [1, cnt, cnt])
+
+        lines = []
+        instrumentation.report(print_func=lines.append)
+        self.assertTrue(any(line.startswith('ValidatePath') for line in lines))
+
+
+    def test_dump_stats(self):
+        instrumentation.enable()
+        self.validate_all()
+        instrumentation.disable()
+        path = os.path.join(mkdtemp(), 'validation.prof')
+        try:
+            instrumentation.dump_stats(path)
+            stats = pstats.Stats(path)
+            self.assertEqual(sorted(func for _, _, func in stats.stats),
+                             [name + '.check' for name in (
+                                 'ValidateBoundaries', 'ValidateConditions', 'ValidateKing',
+                                 'ValidatePath', 'ValidatePiece')])
+        finally:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
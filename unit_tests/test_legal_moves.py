@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+import unittest
+from random import Random
+from game import Game
+from legal_moves import king_danger
+from utils import pos_to_square
+from unit_tests import test_move
+
+switch_cells = test_move.TestMove.helper_switch_cells
+
+
+class TestLegalMoves(unittest.TestCase):
+
+
+    @staticmethod
+    def helper_found_moves(game, team, mode):
+        game.current_team = team
+        moves, cnt = game.get_all_possible_moves(mode=mode)
+        found = sorted((ref, mv.new_cell_ref, mv.take) for ref, mvs in moves.items() for mv in mvs)
+        assert len(found) == cnt
+        return found
+
+
+    def test_pinned_piece_stays_on_pin_line(self):
+        # white queen on A5 pins the pawn on D2 to the king
+        start_pos = switch_cells(["A2", "C7", "C2", "D8"], ["A4", "C5", "C4", "A5"])
+        game = Game(custom_start_positions=start_pos, default_logging=False)
+        king_square, checkers, _, pins = king_danger(game.bitboards, 'white')
+        self.assertEqual(checkers, 0)
+        self.assertEqual(list(pins.keys()), [pos_to_square([2, 4])])
+        found = self.helper_found_moves(game, 'white', Game.PIN_AWARE)
+        self.assertNotIn('wp4', [ref for ref, _, _ in found])
+
+
+    def test_en_passant_found(self):
+        start_pos = switch_cells(["A2", "D7", "A4", "B7"], ["A4", "D5", "A5", "B5"])
+        game = Game(custom_start_positions=start_pos, default_logging=False)
+        game.last_piece_to_move = 'bp2'
+        game.get_piece('bp2').last_to_move = True
+        found = self.helper_found_moves(game, 'white', Game.PIN_AWARE)
+        self.assertIn(('wp1', 'B6', False), found)
+        self.assertEqual(found, self.helper_found_moves(game, 'white', Game.VALIDATE_EACH_MOVE))
+
+
+    def test_pin_aware_matches_validating_each_move(self):
+        """
+        Play random games (favouring takes and checks to reach more
+        interesting positions) comparing the two ways of finding moves.
+        """
+        rnd = Random(3)
+        for _ in range(4):
+            game = Game(default_logging=False)
+            for turn in range(80):
+                team = 'white' if turn % 2 == 0 else 'black'
+                found = self.helper_found_moves(game, team, Game.PIN_AWARE)
+                self.assertEqual(found, self.helper_found_moves(game, team, Game.VALIDATE_EACH_MOVE))
+                if not found or game.checkmate:
+                    break
+                takes = [mv for mv in found if mv[2]]
+                ref, new_cell_ref, _ = rnd.choice(takes if takes and rnd.random() < 0.7 else found)
+                game.take_turn(team, game.get_piece(ref).cell_ref + new_cell_ref)
+
+
+    def test_move_records(self):
+        game = Game(default_logging=False)
+        game.take_turn('white', 'e2e4')
+        records = game.generate_moves('black')
+        found = sorted((mv.piece.ref, mv.new_cell_ref, mv.take) for mv in records)
+        self.assertEqual(found, self.helper_found_moves(game, 'black', Game.VALIDATE_EACH_MOVE))
+        self.assertFalse(hasattr(records[0], '__dict__'))
+
+        move = records[0].to_move(game)
+        self.assertTrue(move.possible)
+        self.assertEqual((move.piece, move.new_pos), (records[0].piece, records[0].new_pos))
+
+
+if __name__ == "__main__":
+    unittest.main()
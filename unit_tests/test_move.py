@@ -31,6 +31,18 @@ class TestMove(unittest.TestCase):
         self.move = Move(self.piece, up, right, occupied, our_team, their_team)
 
 
+    def test_id_is_tuple_with_and_without_position_key(self):
+        self.custom_set_up('wN1', 2, 1)
+        occupied, our_team, their_team = self.game.get_occupied()
+        keyed = Move(self.piece, 2, 1, occupied, our_team, their_team,
+                     position_key=self.game.zobrist_key)
+        self.assertIsInstance(self.move._id, tuple)
+        self.assertIsInstance(keyed._id, tuple)
+        self.assertEqual(self.move._id[1:], keyed._id[1:])
+        self.assertEqual(keyed._id[0], self.game.zobrist_key)
+        self.assertIn(('bK', 'E8'), self.move._id[0])
+
+
     def test_invalid_move_for_piece(self):
         self.custom_set_up('wp7', 5, -2)
         self.assertFalse(self.move.possible)
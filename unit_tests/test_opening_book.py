@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import os
+import unittest
+from io import StringIO
+from tempfile import mkdtemp
+from game import Game
+from chess_engine import pick_move
+import opening_book
+
+PGN_TEXT = '''[Event "One"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+
+[Event "Two"]
+
+1. e4 c5 2. Nf3 d6 0-1
+
+[Event "Three"]
+
+1. e4 e5 2. Bc4 Nc6 3. O-O Nf6 1/2-1/2
+
+[Event "Four"]
+
+1. d4 d5 *
+'''
+
+
+class TestOpeningBook(unittest.TestCase):
+
+
+    def setUp(self):
+        self.path = os.path.join(mkdtemp(), 'book.bin')
+        self.cnt = opening_book.build_book(StringIO(PGN_TEXT), self.path, max_plies=3)
+        self.book = opening_book.OpeningBook(self.path)
+
+
+    def tearDown(self):
+        self.book.close()
+        os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+
+    def test_build_book(self):
+        # e4 / d4, e5 / c5 after e4, d5 after d4, Nf3 / Bc4 after e4 e5 and Nf3 after e4 c5
+        self.assertEqual(self.cnt, 8)
+        self.assertEqual(os.path.getsize(self.path), 8 * opening_book.ENTRY.size)
+        keys = [self.book[i] for i in range(len(self.book))]
+        self.assertEqual(keys, sorted(keys))
+
+
+    def test_moves_weighted_by_games(self):
+        game = Game(default_logging=False)
+        moves = {(move.piece.ref, move.new_cell_ref): weight
+                 for move, weight in self.book.moves(game, 'white')}
+        self.assertEqual(moves, {('wp5', 'E4'): 3, ('wp4', 'D4'): 1})
+
+        game.make_move(self.book.pick(game, 'white'))
+        self.assertIn(game.to_fen().split()[0], ('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR',
+                                                 'rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR'))
+
+
+    def test_position_not_in_book(self):
+        game = Game.from_fen('4k3/8/8/8/8/8/8/R3K2R w - - 0 1', default_logging=False)
+        self.assertEqual(self.book.entries(game.zobrist_key), [])
+        self.assertIsNone(self.book.pick(game, 'white'))
+
+
+    def test_pick_move_plays_from_book(self):
+        game = Game(default_logging=False)
+        for _ in range(2):
+            team = game.team_to_move
+            game.current_team = team
+            move = pick_move(game, team, 1, node_limit=1, book=self.path)
+            self.assertIn(move.new_cell_ref, ('E4', 'D4', 'E5', 'C5', 'D5'))
+            game.make_move(move)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+import unittest
+from game import Game
+import perft
+
+
+class TestPerft(unittest.TestCase):
+
+
+    def test_expected_counts(self):
+        for name, (_, _, _, expected) in perft.POSITIONS.items():
+            game, team = perft.position(name)
+            key = game.zobrist_key
+            for depth in (1, 2, 3):
+                self.assertEqual(perft.perft(game, depth, team), expected[depth], name)
+            self.assertEqual(game.zobrist_key, key)
+
+
+    def test_modes_agree(self):
+        for name, (_, _, _, expected) in perft.POSITIONS.items():
+            game, team = perft.position(name)
+            self.assertEqual(perft.perft(game, 2, team, Game.VALIDATE_EACH_MOVE), expected[2], name)
+
+
+    def test_divide(self):
+        game, team = perft.position('en_passant')
+        counts = perft.divide(game, 2, team)
+        self.assertEqual(sum(counts.values()), perft.POSITIONS['en_passant'][3][2])
+        self.assertIn('e5d6', counts)  # en passant
+
+
+    def test_benchmark(self):
+        lines = []
+        results = perft.benchmark(2, names=['start'], print_func=lines.append)
+        self.assertEqual([(name, nodes) for name, nodes, _, _ in results], [('start', 400)])
+        self.assertTrue(lines[0].endswith('ok'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+import unittest
+from io import StringIO
+import pgn
+
+PGN_TEXT = '''[Event "Test"]
+[White "A"]
+[Black "B"]
+[Result "0-1"]
+
+1. f3 {weak} e5 2. g4 $4 (2. e4 Nc6) Qh4# 0-1
+
+[Event "Second"]
+[SetUp "1"]
+[FEN "4k3/8/8/8/8/8/8/R3K2R w - - 0 1"]
+
+1. Rad1 Kf7 2. Rh7+ ; rest of line
+Kg6 *
+'''
+
+
+class TestPgn(unittest.TestCase):
+
+
+    def test_read_games(self):
+        games = list(pgn.read_games(StringIO(PGN_TEXT)))
+        self.assertEqual(len(games), 2)
+
+        tags, game = games[0]
+        self.assertEqual((tags['Event'], tags['Result']), ('Test', '0-1'))
+        self.assertTrue(game.is_checkmated('white'))
+        self.assertEqual(pgn.game_sans(game), ['f3', 'e5', 'g4', 'Qh4#'])
+
+        tags, game = games[1]
+        self.assertEqual(tags['Result'], '*')
+        self.assertEqual(pgn.game_sans(game), ['Rd1', 'Kf7', 'Rh7+', 'Kg6'])
+        self.assertEqual(game.to_fen(), '8/7R/6k1/8/8/8/8/3RK3 w - - 4 3')
+
+
+    def test_write_and_read_back(self):
+        game = pgn.replay(['e4', 'd5', 'exd5', 'Nf6', 'Nc3', 'Nbd7', 'Nf3', 'Nb6', 'Ne5', 'Nbxd5'])
+        out = StringIO()
+        pgn.write_game(game, out, {'White': 'Someone "quoted"'})
+        text = out.getvalue()
+        self.assertIn('[White "Someone \\"quoted\\""]', text)
+        self.assertIn('1. e4 d5 2. exd5 Nf6 3. Nc3 Nbd7 4. Nf3 Nb6 5. Ne5 Nbxd5 *', text)
+
+        tags, read_back = next(pgn.read_games(StringIO(text)))
+        self.assertEqual(tags['White'], 'Someone "quoted"')
+        self.assertEqual(read_back.to_fen(), game.to_fen())
+
+
+    def test_unsupported_or_illegal_moves(self):
+        for sans in [['O-O'], ['e8=Q'], ['e5'], ['Nd2']]:
+            with self.assertRaises(ValueError):
+                pgn.replay(sans)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+import unittest
+from time import perf_counter
+from unittest import mock
+from game import Game
+import chess_engine
+from ponder import Ponderer
+
+
+class TestPonder(unittest.TestCase):
+
+
+    def setUp(self):
+        self.game = Game(default_logging=False)
+        self.game.ponderer = Ponderer('black', 2, time_limit=None, node_limit=200, max_replies=3)
+
+
+    def test_replies_found_while_player_thinks(self):
+        ponderer = self.game.ponderer
+        ponderer.start(self.game, 'white')
+        ponderer.thread.join()  # let it finish rather than cutting it short
+        ponderer.stop()
+        self.assertEqual(len(ponderer.legal_moves(self.game)), 20)
+        self.assertEqual(len(ponderer.replies), 3)
+
+        # the most likely move, which a reply was found for
+        likely = chess_engine.Search(Game()).ordered_moves('white', 0)[0]
+        self.game.take_turn('white', likely.piece.cell_ref + likely.new_cell_ref)
+        self.assertIsNone(ponderer.legal_moves(self.game))
+        record = ponderer.reply(self.game)
+        searched = chess_engine.pick_move(self.game, 'black', 2, None, 200)
+        self.assertEqual((record.piece.ref, record.new_cell_ref),
+                         (searched.piece.ref, searched.new_cell_ref))
+        self.assertEqual(ponderer.engine_move(self.game).new_pos, searched.new_pos)
+
+
+    def test_take_turn_ponders_at_prompt(self):
+        ponderer = self.game.ponderer
+        ponderer.level = 4
+        ponderer.node_limit = None
+
+        def player_move(prompt):
+            # wait for the legal moves, then answer while replies are being searched
+            while ponderer.legal_moves(self.game) is None:
+                pass
+            return 'e2e4'
+
+        start = perf_counter()
+        with mock.patch('builtins.input', player_move), mock.patch('builtins.print'):
+            self.game.take_turn('white')
+        self.assertLess(perf_counter() - start, 5)
+        self.assertIsNone(ponderer.thread)
+        self.assertEqual(self.game.pieces['wp5'].cell_ref, 'E4')
+        self.assertEqual(self.game.team_to_move, 'black')
+        self.assertEqual(self.game.undo_stack, [])  # replies are searched on a copy
+
+
+    def test_unknown_reply_is_searched(self):
+        self.game.take_turn('white', 'a2a3')
+        self.assertIsNone(self.game.ponderer.reply(self.game))
+        self.assertEqual(self.game.ponderer.engine_move(self.game).piece.team, 'black')
+
+
+if __name__ == "__main__":
+    unittest.main()
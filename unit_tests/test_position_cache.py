@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+import unittest
+from game import Game
+from position_cache import PositionCache
+
+
+class TestPositionCache(unittest.TestCase):
+
+
+    def test_least_recently_used_evicted(self):
+        cache = PositionCache(max_entries=2)
+        cache.put(1, 'a')
+        cache.put(2, 'b')
+        self.assertEqual(cache.get(1), 'a')
+        cache.put(3, 'c')
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(3), 'c')
+        self.assertEqual(cache.stats(), {'entries': 2, 'hits': 2, 'misses': 1, 'evictions': 1})
+
+
+    def test_possible_moves_cached_per_position(self):
+        game = Game(default_logging=False)
+        moves, cnt = game.get_all_possible_moves(team='white', mode=Game.PIN_AWARE)
+        self.assertEqual(game.cache.hits, 0)
+        again, cnt_again = game.get_all_possible_moves(team='white', mode=Game.PIN_AWARE)
+        self.assertEqual(game.cache.hits, 1)
+        self.assertEqual((again, cnt_again), (moves, cnt))
+
+        game.take_turn('white', 'e2e4')
+        black_moves, _ = game.get_all_possible_moves(team='black', mode=Game.PIN_AWARE)
+        self.assertEqual(game.cache.hits, 1)
+        self.assertIn('bN1', black_moves)
+
+
+    def test_check_and_checkmate_verdicts(self):
+        game = Game(default_logging=False)
+        for team, prompt in [('white', 'f2f3'), ('black', 'e7e5'), ('white', 'g2g4')]:
+            game.take_turn(team, prompt)
+        self.assertFalse(game.is_in_check('white'))
+        self.assertFalse(game.is_checkmated('white'))
+        game.take_turn('black', 'd8h4')
+        self.assertTrue(game.is_in_check('white'))
+        self.assertTrue(game.is_checkmated('white'))
+        self.assertEqual(game.current_team, 'black')
+        hits = game.cache.hits
+        self.assertTrue(game.is_checkmated('white'))
+        self.assertEqual(game.cache.hits, hits + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
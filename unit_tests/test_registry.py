@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+import unittest
+from game import Game
+from move import Move
+from move_validation import registry
+
+
+class TestRegistry(unittest.TestCase):
+
+
+    def test_steps_ordered_by_cost(self):
+        self.assertEqual([step.__name__ for step in registry.steps()],
+                         ['ValidatePiece', 'ValidateBoundaries', 'ValidatePath',
+                          'ValidateConditions', 'ValidateKing'])
+
+
+    def test_pipeline_skips_steps_which_cannot_fail(self):
+        game = Game(default_logging=False)
+        pawn_steps = [step.__name__ for step in registry.pipeline(game.pieces['wp1'])]
+        knight_steps = [step.__name__ for step in registry.pipeline(game.pieces['wN1'])]
+        self.assertIn('ValidateConditions', pawn_steps)
+        self.assertNotIn('ValidateConditions', knight_steps)
+        self.assertIs(registry.pipeline(game.pieces['bN2']), registry.pipeline(game.pieces['wN1']))
+
+
+    def test_validate_reports_each_step(self):
+        game = Game(default_logging=False)
+        game.current_team = 'white'
+        occupied, our_team, their_team = game.get_occupied()
+        move_obj = Move(game.pieces['wN1'], 2, 1, occupied, our_team, their_team, prevalidated=True)
+        seen = []
+        self.assertEqual(registry.validate(move_obj, lambda step, reason: seen.append((step, reason))),
+                         (True, None))
+        self.assertEqual(seen, [(step, None) for step in registry.pipeline(game.pieces['wN1'])])
+
+
+    def test_validate_matches_move(self):
+        game = Game(default_logging=False)
+        pieces = [piece for piece in game.pieces.values() if not piece.taken]
+        occupied = [piece.pos for piece in pieces]
+        our_team = {piece.ref: piece for piece in pieces if piece.team == 'white'}
+        their_team = {piece.ref: piece for piece in pieces if piece.team == 'black'}
+        for piece in our_team.values():
+            for up, right in [valid_move[:2] for valid_move in piece.valid_moves]:
+                move_obj = Move(piece, up, right, occupied, our_team, their_team,
+                                theoretical_move=True, bitboards=game.bitboards,
+                                squares=game.board.squares, prevalidated=True)
+                checked = Move(piece, up, right, occupied, our_team, their_team,
+                               theoretical_move=True, bitboards=game.bitboards,
+                               squares=game.board.squares)
+                self.assertEqual(registry.validate(move_obj)[0], checked.possible)
+
+
+if __name__ == "__main__":
+    unittest.main()
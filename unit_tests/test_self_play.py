@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import json
+import os
+import unittest
+from tempfile import mkdtemp
+import self_play
+
+
+class TestSelfPlay(unittest.TestCase):
+
+
+    def setUp(self):
+        self.path = os.path.join(mkdtemp(), 'results.jsonl')
+
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+
+    def test_play_game_is_repeatable(self):
+        results = [self_play.play_game(0, 1, 0, seed=7, turn_limit=30, node_limit=100)
+                   for _ in range(2)]
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0]['turns'], len(results[0]['moves']))
+        self.assertEqual(results[0]['reason'], 'turn limit')
+
+
+    def test_run_streams_results(self):
+        lines = []
+        summary = self_play.run(3, 0, 0, workers=2, results_path=self.path, turn_limit=16,
+                                print_func=lines.append)
+        self.assertEqual(summary['games'], 3)
+        self.assertEqual(summary['white'] + summary['black'] + summary['draws'], 3)
+        with open(self.path) as results_file:
+            results = [json.loads(line) for line in results_file]
+        self.assertEqual(sorted(result['game'] for result in results), [0, 1, 2])
+        self.assertEqual(len(lines), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import unittest
+from tempfile import mkdtemp
+import server
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+
+
+    async def asyncSetUp(self):
+        self.game_server = server.GameServer(level=1, node_limit=50, workers=1)
+
+
+    async def asyncTearDown(self):
+        await self.game_server.close()
+
+
+    async def connect(self):
+        tcp_server = await self.game_server.start('127.0.0.1', 0)
+        return await asyncio.open_connection('127.0.0.1', tcp_server.sockets[0].getsockname()[1])
+
+
+    async def send(self, reader, writer, line, replies=1):
+        writer.write((line + '\n').encode('ascii'))
+        return [(await asyncio.wait_for(reader.readline(), 30)).decode('ascii').rstrip('\n')
+                for _ in range(replies)]
+
+
+    async def test_play_against_engine(self):
+        reader, writer = await self.connect()
+        self.assertEqual(await self.send(reader, writer, 'e2e4'),
+                         ['error no game, start one with: new [white|black] [level]'])
+        self.assertEqual(await self.send(reader, writer, 'new white'), ['ok new white 1'])
+        self.assertEqual(await self.send(reader, writer, 'e2e5'),
+                         ['error Move is not allowed for this piece.'])
+
+        ok, reply = await self.send(reader, writer, 'e2e4', 2)
+        self.assertEqual(ok, 'ok e2e4')
+        self.assertRegex(reply, '^move [a-h][78][a-h][56]$')
+        self.assertRegex((await self.send(reader, writer, 'fen'))[0], '^fen [^ ]+ w - [^ ]+ [01] 2$')
+
+        board = await self.send(reader, writer, 'board', 37)
+        self.assertEqual(board[-1], 'ok board')
+        self.assertEqual(await self.send(reader, writer, 'quit'), ['bye'])
+        writer.close()
+
+
+    async def test_sessions_over_unix_socket(self):
+        path = os.path.join(mkdtemp(), 'chess.sock')
+        try:
+            await self.game_server.start(path=path)
+            first, second = [await asyncio.open_unix_connection(path) for _ in range(2)]
+
+            # the engine plays first for a player on black
+            new, move = await self.send(*first, 'new black 0', 2)
+            self.assertEqual(new, 'ok new black 0')
+            self.assertRegex(move, '^move [a-h][12][a-h][34]$')
+
+            self.assertEqual(await self.send(*second, 'new white 2'), ['ok new white 2'])
+            self.assertEqual(len(self.game_server.sessions), 2)
+            self.assertEqual((await self.send(*second, 'a2a3', 2))[0], 'ok a2a3')
+            self.assertEqual((await self.send(*first, 'a7a6', 2))[0], 'ok a7a6')
+            for _, writer in (first, second):
+                writer.close()
+        finally:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+
+
+    async def test_checkmate_ends_game(self):
+        session = server.Session(self.game_server)
+        self.assertEqual(await session.command('new white 1'), ['ok new white 1'])
+        # the node limit keeps the engine's replies the same every time
+        for prompt, reply in [('e2e4', 'b8c6'), ('d1f3', 'g8f6'), ('f1c4', 'f6e4')]:
+            self.assertEqual(await session.command(prompt), ['ok ' + prompt, 'move ' + reply])
+        self.assertEqual(await session.command('f3f7'), ['ok f3f7', 'end white checkmate'])
+        self.assertEqual(await session.command('a2a3'),
+                         ['error game over, start another with: new [white|black] [level]'])
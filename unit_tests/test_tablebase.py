@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import unittest
+from random import Random
+from tempfile import mkdtemp
+from unittest.mock import patch
+from game import Game
+from chess_engine import pick_move
+import tablebase
+
+
+def fen_for(white_king, black_king, code, square, black_to_move):
+    """
+    FEN for a white king and piece against a black king (squares 0 - 63).
+    """
+    letters = {white_king: 'K', black_king: 'k', square: code}
+    rows = []
+    for row in range(7, -1, -1):
+        row_text, empty = '', 0
+        for col in range(8):
+            letter = letters.get(row * 8 + col)
+            if letter:
+                row_text += (str(empty) if empty else '') + letter
+                empty = 0
+            else:
+                empty += 1
+        rows.append(row_text + (str(empty) if empty else ''))
+    return '{0} {1} - - 0 1'.format('/'.join(rows), 'b' if black_to_move else 'w')
+
+
+class TestTablebase(unittest.TestCase):
+
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = mkdtemp()
+        cls.rook_table = tablebase.build_table('R')
+        for name, table in (('KRK', cls.rook_table), ('KPK', tablebase.build_table('P'))):
+            with open(tablebase.table_path(name, cls.directory), 'wb') as table_file:
+                table_file.write(tablebase.compact(table, name == 'KPK'))
+        cls.tables = tablebase.Tablebase(cls.directory)
+
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+
+    def probe(self, fen_string):
+        return self.tables.probe(Game.from_fen(fen_string, default_logging=False))
+
+
+    def test_longest_mate(self):
+        # king and rook mate in at most 16 moves
+        self.assertEqual(max(value for value in self.rook_table if value != tablebase.ILLEGAL), 33)
+        self.assertEqual(os.path.getsize(tablebase.table_path('KRK', self.directory)), 16 * 8192)
+
+
+    def test_probe(self):
+        self.assertEqual(self.probe('R6k/8/7K/8/8/8/8/8 b - - 0 1'), ('loss', 0))
+        self.assertEqual(self.probe('7k/R7/7K/8/8/8/8/8 w - - 0 1'), ('win', 1))
+        # the same positions with the colours swapped
+        self.assertEqual(self.probe('8/8/8/8/8/7k/8/r6K w - - 0 1'), ('loss', 0))
+        self.assertEqual(self.probe('8/8/8/8/8/7k/r7/7K b - - 0 1'), ('win', 1))
+        # no promotion, so a pawn can't win
+        self.assertEqual(self.probe('8/4P3/8/4K3/8/8/8/k7 w - - 0 1'), ('draw', None))
+        self.assertEqual(self.probe('8/8/8/4K3/8/8/8/k7 w - - 0 1'), ('draw', None))
+        self.assertIsNone(self.probe('Q6k/8/7K/8/8/8/8/8 b - - 0 1'))
+
+
+    def test_agrees_with_game(self):
+        rnd = Random(3)
+        checked = 0
+        while checked < 10:
+            i = rnd.randrange(len(self.rook_table)) & ~1  # white to move
+            value = self.rook_table[i]
+            if value in (tablebase.DRAW, tablebase.ILLEGAL):
+                continue
+            game = Game.from_fen(fen_for(i >> 13, i >> 7 & 63, 'R', i >> 1 & 63, False),
+                                 default_logging=False)
+            self.assertEqual(self.tables.probe(game), ('win', value - 1))
+            game.make_move(self.tables.best_move(game, 'white'))
+            self.assertEqual(self.tables.probe(game), ('loss', value - 2))
+            if value == 2:
+                self.assertTrue(game.is_checkmated('black'))
+            else:
+                # every reply loses, none faster than the table says
+                for move in game.generate_moves('black'):
+                    game.make_move(move)
+                    result, plies = self.tables.probe(game)
+                    game.unmake_move()
+                    self.assertEqual(result, 'win')
+                    self.assertLessEqual(plies, value - 3)
+            checked += 1
+
+
+    def test_engine_and_game_use_tables(self):
+        with patch('tablebase.TABLEBASE_DIR', self.directory):
+            game = Game.from_fen('7k/R7/7K/8/8/8/8/8 w - - 0 1', default_logging=False)
+            move = pick_move(game, 'white', 1)
+            self.assertEqual(move.new_cell_ref, 'A8')
+
+            game.take_turn('white', move=move)
+            self.assertTrue(game.checkmate)
+            self.assertIsNone(game.winner)
+
+            game = Game.from_fen('8/8/8/4K3/8/8/2R5/k7 w - - 0 1', default_logging=False)
+            game.take_turn('white', 'e5e4')
+            self.assertEqual(game.winner, 'white')
+            self.assertFalse(game.draw)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -35,5 +35,33 @@ class TestUtils(unittest.TestCase):
             self.assertEqual(utils.pos_to_cell_ref(list(pos)), expected_cell_ref)
 
 
+    def test_debug_is_lazy(self):
+        """
+        Test that debug messages are only built when they will be printed.
+        """
+        printed, built = [], []
+
+        def message():
+            built.append(True)
+            return 'built'
+
+        try:
+            utils.set_debugging_level(utils.DebugLevel.none)
+            self.assertFalse(utils.debugging)
+            utils.debug(message, print_func=printed.append)
+            utils.debug('{0} {1}', print_func=printed.append, args=(1, 2))
+            self.assertEqual((printed, built), ([], []))
+
+            utils.set_debugging_level('mid')
+            self.assertTrue(utils.debugging)
+            utils.debug(message, print_func=printed.append)
+            utils.debug('{0} {1}', print_func=printed.append, args=(1, 2))
+            utils.debug(message, utils.DebugLevel.high, print_func=printed.append)
+            self.assertEqual(printed, ['built', '1 2'])
+            self.assertEqual(len(built), 1)
+        finally:
+            utils.set_debugging_level(utils.DebugLevel.none)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+import unittest
+from random import Random
+from game import Game
+import zobrist
+
+
+class TestZobrist(unittest.TestCase):
+
+
+    def setUp(self):
+        self.game = Game(default_logging=False)
+
+
+    def helper_black_to_move(self):
+        return len(self.game.key_history) % 2 == 0
+
+
+    def test_key_matches_recalculated_key(self):
+        rnd = Random(5)
+        team = 'white'
+        for _ in range(40):
+            moves, cnt = self.game.get_all_possible_moves(team=team, mode=Game.PIN_AWARE)
+            if cnt == 0:
+                break
+            self.game.make_move(rnd.choice([mv for mvs in moves.values() for mv in mvs]))
+            team = self.game.current_team
+            self.assertEqual(self.game.zobrist_key,
+                             zobrist.position_key(self.game, self.helper_black_to_move()))
+        while self.game.undo_stack:
+            self.game.unmake_move()
+            self.assertEqual(self.game.zobrist_key,
+                             zobrist.position_key(self.game, self.helper_black_to_move()))
+
+
+    def test_take_turn_updates_key(self):
+        for team, prompt in [('white', 'e2e4'), ('black', 'd7d5'), ('white', 'e4d5')]:
+            self.game.take_turn(team, prompt)
+        self.assertEqual(self.game.zobrist_key, zobrist.position_key(self.game, True))
+
+
+    def test_transposition_and_repetition(self):
+        start_key = self.game.zobrist_key
+        for team, prompt in [('white', 'g1f3'), ('black', 'g8f6'), ('white', 'f3g1')]:
+            self.game.take_turn(team, prompt)
+        self.assertNotEqual(self.game.zobrist_key, start_key)
+        self.game.take_turn('black', 'f6g8')
+        self.assertEqual(self.game.zobrist_key, start_key)
+        self.assertEqual(self.game.repetition_count(), 2)
+
+
+    def test_first_move_and_en_passant_change_key(self):
+        start_key = self.game.zobrist_key
+        self.game.get_piece('wp1').move_cnt = 1
+        self.assertNotEqual(zobrist.position_key(self.game), start_key)
+        self.game.get_piece('wp1').move_cnt = 0
+
+        self.game.take_turn('white', 'a2a4')
+        self.assertNotEqual(zobrist.en_passant_key(self.game), 0)
+        self.game.take_turn('black', 'h7h6')
+        self.assertEqual(zobrist.en_passant_key(self.game), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
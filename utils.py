@@ -28,31 +28,37 @@ class DebugLevel(Enum):
         return DebugLevel.high.value
 
 
-LOG_FILE_PATH = 'log.json'
+LOG_FILE_PATH = 'log.bin'
 ASCII_OFFSET = 64  # used to convert numbers to ascii letter codes
+COL_LETTERS = 'ABCDEFGH'  # column letters in order, col_no 1 to 8
 WRONG_ENTRY_POINT_MSG = "This module is not intended to be the main entry point for the" + \
                         "program, call python_chess.game to start a new game."
 current_debug_level = DebugLevel.none
+# False while current_debug_level is none, check it before building a message on
+# a hot path with: if __debug__ and utils.debugging: (python3 -O compiles these out)
+debugging = False
 
 
 def _no_filter():
     return True
 
 
-def debug(msg, level=DebugLevel.low, print_func=print, filter_func=_no_filter):
+def debug(msg, level=DebugLevel.low, print_func=print, filter_func=_no_filter, args=()):
     """
     Use like the print function, messages will only be printed if debug_level
-    is less than or equal to the constant DEBUG_LEVEL.
+    is less than or equal to the constant DEBUG_LEVEL. msg can be a format
+    string for args or a function returning the message, so the message is
+    only built once it is known that it will be printed.
     """
     if level.value <= current_debug_level.value and filter_func():
-        print_func(msg)
+        print_func(msg() if callable(msg) else msg.format(*args) if args else msg)
 
 
 def set_debugging_level(level, feedback_required=False):
     """
     Set the current debug level. Use a DebugLevel or a string.
     """
-    global current_debug_level
+    global current_debug_level, debugging
 
     if isinstance(level, DebugLevel):
         current_debug_level = level
@@ -74,6 +80,7 @@ def set_debugging_level(level, feedback_required=False):
             current_debug_level = DebugLevel.toggle(current_debug_level)
             print("unable to interpret debug level requested ({0}), toggled to {1}".format(
                 level, current_debug_level.name))
+    debugging = current_debug_level != DebugLevel.none
 
     if feedback_required:
         return "Debugging level set to {0}".format(current_debug_level.name)
@@ -88,6 +95,21 @@ def pos_to_cell_ref(pos):
     return "{0}{1}".format(col_no_to_letter(pos[1]), str(pos[0]))
 
 
+def pos_to_square(pos):
+    """
+    Converts a [row, col] list into a square index counting from 0 for
+    A1 along each row up to 63 for H8 e.g. [2, 1] => 8.
+    """
+    return (pos[0] - 1) * 8 + pos[1] - 1
+
+
+def square_to_pos(square):
+    """
+    Converts a square index into a [row, col] list e.g. 63 => [8, 8].
+    """
+    return [square // 8 + 1, square % 8 + 1]
+
+
 def col_no_to_letter(col_no):
     return chr(col_no + ASCII_OFFSET)
 
@@ -104,15 +126,6 @@ def col_letter_to_no(col_letter):
     return ord(col_letter.upper()) - ASCII_OFFSET
 
 
-def write_log(log):
-    """
-    Write json log data to a file.
-    """
-    print('\nLogging game data...')
-    with  open(LOG_FILE_PATH, 'w') as file_obj:
-        file_obj.writelines(log)
-
-
 def shout(msg, suffix=' !!!', print_output=True, return_output=False):
     """
     Output message in all caps with spaces between and a suffix.
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Zobrist hashing, a 64 bit key for the state of a game made by XOR-ing
+together a random number for each feature of the position. As XOR is
+its own inverse the key can be updated as pieces move rather than being
+rebuilt from every piece.
+"""
+from random import Random
+from literals import PIECE_CODES, TEAMS
+from move_validation.validate_conditions import en_passant_failure
+from utils import pos_to_square, WRONG_ENTRY_POINT_MSG
+
+# fixed seed so keys are the same in every process (and can be stored)
+__random = Random(20160514)
+
+PIECE_KEYS = {team: {name: [__random.getrandbits(64) for _ in range(64)]
+                     for name in PIECE_CODES.values()}
+              for team in TEAMS.values()}
+# pawns yet to move (so able to move two spaces), per square
+UNMOVED_PAWN_KEYS = [__random.getrandbits(64) for _ in range(64)]
+# column (1-8) of a pawn that can be taken en passant
+EN_PASSANT_KEYS = [0] + [__random.getrandbits(64) for _ in range(8)]
+BLACK_TO_MOVE_KEY = __random.getrandbits(64)
+
+
+def piece_key(piece, square):
+    """
+    Key for a piece standing on square (including whether a pawn has moved).
+    """
+    key = PIECE_KEYS[piece.team][piece.name][square]
+    if piece.name == 'pawn' and piece.move_cnt == 0:
+        key ^= UNMOVED_PAWN_KEYS[square]
+    return key
+
+
+def en_passant_key(game):
+    """
+    Key for the pawn last to move if it could be taken en passant
+    (0 if there is no such pawn).
+    """
+    last_piece = game.get_piece(game.last_piece_to_move)
+    if last_piece and last_piece.name == 'pawn' and en_passant_failure(last_piece) is None:
+        return EN_PASSANT_KEYS[last_piece.col_no]
+    return 0
+
+
+def position_key(game, black_to_move=False):
+    """
+    Build the key for a game from scratch.
+    """
+    key = BLACK_TO_MOVE_KEY if black_to_move else 0
+    for piece in game.pieces.values():
+        if not piece.taken:
+            key ^= piece_key(piece, pos_to_square(piece.pos))
+    return key ^ en_passant_key(game)
+
+
+if __name__ == '__main__':
+    print(WRONG_ENTRY_POINT_MSG)